@@ -3,6 +3,7 @@ from logging.config import valid_ident
 import socket
 import random
 import time
+from packet_checksum import Create_checksum
 # ************ function definitions ************
 
 def Make_packet(file_to_read):
@@ -20,10 +21,6 @@ def Make_packet(file_to_read):
 
     return packets_to_send
 
-def Create_checksum(packet, sequence_number):
-                            
-    return (sum(packet) + sequence_number) % 65536
-
 def Udt_send_packet(packet):
     server_name = socket.gethostname()
     clientPort = 12000
@@ -1,15 +1,14 @@
 import socket
 import random
+from packet_checksum import Create_checksum
 
 server_port = 12000
 server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 server_socket.bind(("",server_port))
 print("The server is ready to receive.\n")
 
-image_reconstruct = []
-
-def Create_checksum(data, sequence_number): 
-    return (sum(data) + sequence_number) % 65536
+#write each accepted packet straight to disk instead of holding the whole image in memory
+image_file = open("received_image.jpg", "wb")
 
 def Corrupt_data(data, seq_num):
     percent_check = random.randint(0,9)
@@ -111,11 +110,10 @@ while True: # continuous loop to read data from the client
             else:
                 expected_seg_num = 0
 
-            # add the packet and sequence number to our imageReconstruct list
-            #image_reconstruct.append((seq_num, data))
+            # append the packet to the image file
             input_coount += 1
             print("packets added to image: ", input_coount)
-            image_reconstruct.append((data))
+            image_file.write(data)
 
             # print out the packet and sequence number
             print(f"Packet {packet_num} has been received from the client.")
@@ -127,10 +125,8 @@ while True: # continuous loop to read data from the client
             server_socket.sendto(message, client_address)
 
 
-#put together our fixed image
-print("Now process the packets and construct the new image file\n")
-with open("received_image.jpg", "wb") as file:
-    for packet in image_reconstruct:
-        file.write(packet)
+#the image has been written as it arrived, just finish the file
+print("Image written to received_image.jpg\n")
+image_file.close()
 
 server_socket.close()
\ No newline at end of file
@@ -0,0 +1,11 @@
+import zlib
+
+#shared by ClientServer.py and ImageServer.py so both ends agree on the checksum
+
+def Create_checksum(data, sequence_number):
+    #byte sum 256 bytes at a time: adler32's low half is 1 + the block's byte sum
+    view = memoryview(data)
+    total = 0
+    for i in range(0, len(view), 256):
+        total += (zlib.adler32(view[i:i+256]) & 0xFFFF) - 1
+    return (total + sequence_number) % 65536
@@ -16,6 +16,8 @@ Example:
 """
 
 import socket, sys, struct, time, random, os, csv
+import fsm_log, telemetry
+from packet_checksum import compute_checksum
 
 # Configuration
 INITIAL_PACKET_SIZE = 1024
@@ -41,9 +43,6 @@ try:
 except Exception:
     option = 1
 
-def compute_checksum(data):
-    return sum(data) % 256
-
 def make_packet(seq_num, data):
     checksum = compute_checksum(data)
     header = struct.pack("!I B I", seq_num, checksum, len(data))
@@ -66,19 +65,17 @@ def record_performance_data(option, loss_rate, completion_time, throughput, data
         writer = csv.writer(csvfile)
         writer.writerow([option, loss_rate, completion_time, throughput, data_retx, ack_retx, ack_efficiency])
 
-def update_stats_file(sent, acked, retrans):
-    try:
-        with open("stats.txt", "w") as f:
-            f.write(f"sent:{sent} acked:{acked} retrans:{retrans}")
-    except Exception:
-        pass
+# Live counters for the GUI and telemetry.py, in shared memory
+live_stats = telemetry.Telemetry()
 
-def log_sender_fsm(message):
-    try:
-        with open("sender_fsm.txt", "a") as f:
-            f.write(f"[{time.time()}] {message}\n")
-    except Exception:
-        pass
+def update_stats(sent, acked, retrans, rtt=0.0, throughput=0.0):
+    live_stats.update_sender(sent, acked, retrans, rtt, throughput)
+
+# FSM events are queued and written in batches by a background thread
+sender_log = fsm_log.BatchedLogger("sender_fsm.txt")
+
+def log_sender_fsm(message, level=fsm_log.INFO):
+    sender_log.log(message, level)
 
 def send_file(filename, server_addr, mode="sender_driven", option=1):
     global data_retransmissions, ack_retransmissions
@@ -109,6 +106,16 @@ def send_file(filename, server_addr, mode="sender_driven", option=1):
         packets.append(make_packet(seq_num, chunk))
         seq_num += 1
     total_packets = len(packets)
+
+    # Publishes the live counters (read by gui.py and telemetry.py)
+    def report_stats():
+        elapsed = time.time() - start_time
+        acked_bytes = min(base * packet_size, len(file_data))
+        update_stats(base + data_retransmissions, base, data_retransmissions + ack_retransmissions,
+                     estimated_rtt, acked_bytes / elapsed if elapsed > 0 else 0.0)
+
+    base = 0
+    report_stats()
     print(f"Total packets to send: {total_packets}")
     log_sender_fsm(f"Total packets to send: {total_packets}")
 
@@ -118,7 +125,6 @@ def send_file(filename, server_addr, mode="sender_driven", option=1):
     log_sender_fsm("Header packet sent.")
     time.sleep(0.1)
 
-    base = 0
     while base < total_packets:
         packet = packets[base]
         send_time = time.time()
@@ -132,22 +138,22 @@ def send_file(filename, server_addr, mode="sender_driven", option=1):
             rtt = time.time() - send_time
             if ack_seq is None or ack_seq != base:
                 ack_retransmissions += 1
-                log_sender_fsm(f"Packet {base}: ACK error. Retransmitting.")
-                update_stats_file(base + data_retransmissions, base, data_retransmissions + ack_retransmissions)
+                log_sender_fsm(f"Packet {base}: ACK error. Retransmitting.", fsm_log.WARNING)
+                report_stats()
                 continue
             estimated_rtt = (1 - ALPHA) * estimated_rtt + ALPHA * rtt
             dev_rtt = (1 - BETA) * dev_rtt + BETA * abs(rtt - estimated_rtt)
             current_timeout = estimated_rtt + 4 * dev_rtt
             sock.settimeout(current_timeout)
-            log_sender_fsm(f"Packet {base} ACK received. RTT: {rtt:.3f}s")
+            log_sender_fsm(f"Packet {base} ACK received. RTT: {rtt:.3f}s", fsm_log.DEBUG)
             base += 1
-            update_stats_file(base + data_retransmissions, base, data_retransmissions + ack_retransmissions)
+            report_stats()
         except socket.timeout:
             data_retransmissions += 1
             current_timeout = min(0.2, current_timeout + 0.01)
             sock.settimeout(current_timeout)
-            log_sender_fsm(f"Packet {base}: Timeout. Retransmitting.")
-            update_stats_file(base + data_retransmissions, base, data_retransmissions + ack_retransmissions)
+            log_sender_fsm(f"Packet {base}: Timeout. Retransmitting.", fsm_log.WARNING)
+            report_stats()
 
     completion_time = time.time() - start_time
     file_size = len(file_data)
@@ -161,6 +167,7 @@ def send_file(filename, server_addr, mode="sender_driven", option=1):
     print("ACK retransmissions:", ack_retransmissions)
     print(f"Throughput: {throughput:.2f} bytes/s")
     log_sender_fsm(f"File transfer complete. Time: {completion_time:.2f}s, Data retrans: {data_retransmissions}, ACK retrans: {ack_retransmissions}")
+    sender_log.flush()
     record_performance_data(option, int(sim_rate*100), completion_time, throughput,
                             data_retransmissions, ack_retransmissions, ack_efficiency)
     sock.close()
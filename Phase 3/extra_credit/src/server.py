@@ -4,7 +4,8 @@ Author: Joseph Nguyen
 Description: Receiver side implementation for sender-driven RDT 3.0 with error simulation.
 The receiver:
   • Waits for a header packet and then for data packets.
-  • Updates live progress in "progress.txt" and writes the received file ("received_file.jpg") incrementally.
+  • Publishes live progress through the telemetry channel ("telemetry.bin") and writes the
+    received file ("received_file.jpg") incrementally.
   • Logs FSM events to "receiver_fsm.txt".
   • For Options 3, 4, 5, simulates errors as follows:
        Option 3: Simulate data packet bit-error (corrupt incoming data).
@@ -18,6 +19,8 @@ Example:
 """
 
 import socket, sys, struct, time, random, os
+import fsm_log, telemetry
+from packet_checksum import compute_checksum
 
 try:
     SIM_LOSS_RATE = float(sys.argv[3]) / 100.0
@@ -30,9 +33,6 @@ except Exception:
 
 HEADER_SEQ = 0xFFFFFFFF
 
-def compute_checksum(data):
-    return sum(data) % 256
-
 def parse_packet(packet):
     header_size = struct.calcsize("!I B I")
     header = packet[:header_size]
@@ -40,43 +40,62 @@ def parse_packet(packet):
     data = packet[header_size:header_size+data_len]
     return seq, checksum, data
 
-def save_file(filename, packets):
-    with open(filename, "wb") as f:
-        for seq in sorted(packets.keys()):
-            f.write(packets[seq])
-
-def update_live_image(filename, packets):
+LIVE_IMAGE = "received_file.jpg"
+
+# Writes in-order packets to the live preview file at their offset. Only the
+# new bytes reach the disk and nothing is written past the data received so
+# far, so the file's size is its valid-prefix length: preview readers can use
+# valid_length here or live_valid_length() from another process.
+class LiveFileWriter:
+    def __init__(self, filename=LIVE_IMAGE):
+        self.filename = filename
+        self.fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+        self.valid_length = 0
+
+    def write(self, data):
+        if hasattr(os, "pwrite"):
+            os.pwrite(self.fd, data, self.valid_length)
+        else:
+            os.lseek(self.fd, self.valid_length, os.SEEK_SET)
+            os.write(self.fd, data)
+        self.valid_length += len(data)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def live_valid_length(filename=LIVE_IMAGE):
+    # Bytes of the live file that hold received data (0 before it exists)
     try:
-        with open(filename, "wb") as f:
-            for seq in sorted(packets.keys()):
-                f.write(packets[seq])
-    except Exception as e:
-        print("Error updating live image:", e)
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
 
-def update_progress_file(current, total):
-    try:
-        with open("progress.txt", "w") as f:
-            f.write(f"{current} {total}")
-    except Exception:
-        pass
+# Live progress for the GUI and telemetry.py, in shared memory
+live_stats = telemetry.Telemetry()
 
-def log_receiver_fsm(message):
-    try:
-        with open("receiver_fsm.txt", "a") as f:
-            # If message is bytes or contains bytes objects, convert to hex representation
-            if isinstance(message, bytes):
-                message = f"Binary data: {message.hex()}"
-            f.write(f"[{time.time()}] {message}\n")
-    except Exception:
-        pass
+def update_progress(current, total, valid_length=0):
+    live_stats.update_receiver(current, total, valid_length)
+
+# FSM events are queued and written in batches by a background thread;
+# bytes messages are logged as hex
+receiver_log = fsm_log.BatchedLogger("receiver_fsm.txt")
+
+def log_receiver_fsm(message, level=fsm_log.INFO):
+    receiver_log.log(message, level)
 
 def receive_file(save_filename, mode="sender_driven"):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind(('', 20000))
     sock.settimeout(2)
     print("Receiver ready. Waiting for data...")
-    received_packets = {}
     expected_seq = 0
+    # Only in-order packets are accepted, so they are written out as they
+    # arrive, to the output file and to the live preview file
+    live = LiveFileWriter(LIVE_IMAGE)
+    same_file = os.path.abspath(save_filename) == os.path.abspath(LIVE_IMAGE)
+    out = None if same_file else open(save_filename, "wb")
     total_packets_value = None
     start_time = time.time()
     last_packet_time = time.time()
@@ -101,23 +120,23 @@ def receive_file(save_filename, mode="sender_driven"):
                 # Expected format: "REQ <total_packets>"
                 parts = header_message.split()
                 if len(parts) != 2 or parts[0] != "REQ" or not parts[1].isdigit():
-                    log_receiver_fsm("Header packet error: invalid header format")
+                    log_receiver_fsm("Header packet error: invalid header format", fsm_log.WARNING)
                     # Not a valid header: fall through to binary processing
                 else:
                     total_packets_value = int(parts[1])
                     print(f"Header received: total packets = {total_packets_value}")
                     log_receiver_fsm(f"Header received: total packets = {total_packets_value}")
-                    update_progress_file(0, total_packets_value)
+                    update_progress(0, total_packets_value)
                     continue  # Skip further processing for header packet
             except Exception as e:
-                log_receiver_fsm(f"Header packet decode error: {e}")
+                log_receiver_fsm(f"Header packet decode error: {e}", fsm_log.WARNING)
                 continue
 
         # Otherwise, treat the packet as a binary data packet:
         try:
             seq, checksum, data = parse_packet(packet)
         except Exception as e:
-            log_receiver_fsm(f"Error processing packet header: {e}")
+            log_receiver_fsm(f"Error processing packet header: {e}", fsm_log.WARNING)
             continue
 
         # For options 3 and 5, simulate errors at the receiver.
@@ -127,33 +146,37 @@ def receive_file(save_filename, mode="sender_driven"):
                 corrupted_byte = data[index] ^ 0xFF
                 data = data[:index] + bytes([corrupted_byte]) + data[index+1:]
         if option == 5 and random.random() < SIM_LOSS_RATE:
-            log_receiver_fsm(f"Packet {seq} dropped (simulated data loss).")
+            log_receiver_fsm(f"Packet {seq} dropped (simulated data loss).", fsm_log.WARNING)
             continue
 
         if compute_checksum(data) != checksum:
-            log_receiver_fsm(f"Packet {seq} discarded (checksum error).")
+            log_receiver_fsm(f"Packet {seq} discarded (checksum error).", fsm_log.WARNING)
             continue
 
         if seq == expected_seq:
-            received_packets[seq] = data
-            log_receiver_fsm(f"Packet {seq} received successfully.")
+            if out is not None:
+                out.write(data)
+            live.write(data)
+            log_receiver_fsm(f"Packet {seq} received successfully.", fsm_log.DEBUG)
             expected_seq += 1
             if total_packets_value is not None:
-                update_progress_file(expected_seq, total_packets_value)
-            update_live_image("received_file.jpg", received_packets)
+                update_progress(expected_seq, total_packets_value, live.valid_length)
 
         # For option 4, simulate ACK loss.
         if option == 4 and random.random() < SIM_LOSS_RATE:
-            log_receiver_fsm(f"ACK for packet {seq} dropped (simulated ACK loss).")
+            log_receiver_fsm(f"ACK for packet {seq} dropped (simulated ACK loss).", fsm_log.WARNING)
             continue
 
         ack_msg = f"ACK {seq}".encode()
         sock.sendto(ack_msg, addr)
     end_time = time.time()
-    save_file(save_filename, received_packets)
+    if out is not None:
+        out.close()
+    live.close()
     print("File received successfully.")
     print(f"Total time: {end_time - start_time:.2f} seconds")
     log_receiver_fsm("File received successfully.")
+    receiver_log.flush()
     sock.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Description: Shared-memory telemetry channel for live transfer state.
+The receiver and the sender publish their counters into a small fixed-layout
+file ("telemetry.bin") that every process maps with mmap, so an update is a
+struct.pack_into into shared memory instead of an open/truncate/write of
+progress.txt or stats.txt. The receiver block holds progress (packets in
+order, total packets, valid bytes written); the sender block holds packets
+sent, acked, retransmitted, the smoothed RTT and the throughput. Each block
+has its own writer and a sequence counter that is odd while an update is in
+progress, so readers retry instead of seeing a half-written block.
+Usage:
+    telemetry = Telemetry()
+    telemetry.update_receiver(current, total, valid_length)
+    telemetry.update_sender(sent, acked, retrans, rtt, throughput)
+    print(telemetry.read())
+    python telemetry.py [--watch]
+"""
+
+import mmap, os, struct, sys, time
+
+TELEMETRY_FILE = "telemetry.bin"
+
+MAGIC = b"RDT3"
+VERSION = 1
+HEADER = struct.Struct("<4sI")  # magic, version
+# Each block is a sequence number followed by its fields
+SEQ = struct.Struct("<Q")
+RECEIVER = struct.Struct("<qqqd")  # current, total, valid_length, updated
+SENDER = struct.Struct("<qqqddd")  # sent, acked, retrans, rtt, throughput, updated
+RECEIVER_OFFSET = HEADER.size
+SENDER_OFFSET = RECEIVER_OFFSET + SEQ.size + RECEIVER.size
+SIZE = SENDER_OFFSET + SEQ.size + SENDER.size
+READ_SPINS = 100
+READ_RETRIES = 10000
+
+class Telemetry:
+    def __init__(self, path=TELEMETRY_FILE):
+        self.path = os.path.abspath(path)
+        self.last = {}  # block offset -> last consistent values read
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        try:
+            # Only ever grown, never shrunk, so other processes' maps stay valid
+            if os.fstat(fd).st_size < SIZE:
+                os.ftruncate(fd, SIZE)
+            self.map = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        if HEADER.unpack_from(self.map, 0) != (MAGIC, VERSION):
+            self.reset()
+
+    def reset(self):
+        # Zeroes both blocks, e.g. when a monitor starts
+        self.map[:] = bytes(SIZE)
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION)
+
+    def _write(self, block, offset, *values):
+        # Odd while the fields change, even again once they are all written.
+        # `| 1` also recovers from a writer that died halfway (left it odd).
+        seq = SEQ.unpack_from(self.map, offset)[0] | 1
+        SEQ.pack_into(self.map, offset, seq)
+        block.pack_into(self.map, offset + SEQ.size, *values)
+        SEQ.pack_into(self.map, offset, seq + 1)
+
+    def _read(self, block, offset):
+        # Retries while a write is in progress or happened during the read.
+        # The writer may be descheduled halfway, so after a few spins give it
+        # the CPU; if it never finishes, return the last consistent values.
+        for attempt in range(READ_RETRIES):
+            before = SEQ.unpack_from(self.map, offset)[0]
+            values = block.unpack_from(self.map, offset + SEQ.size)
+            if before % 2 == 0 and SEQ.unpack_from(self.map, offset)[0] == before:
+                self.last[offset] = values
+                return values
+            if attempt >= READ_SPINS:
+                time.sleep(0)
+        return self.last.get(offset, block.unpack(bytes(block.size)))
+
+    def update_receiver(self, current, total, valid_length=0):
+        self._write(RECEIVER, RECEIVER_OFFSET, current, total, valid_length, time.time())
+
+    def update_sender(self, sent, acked, retrans, rtt=0.0, throughput=0.0):
+        self._write(SENDER, SENDER_OFFSET, sent, acked, retrans, rtt, throughput, time.time())
+
+    def read(self):
+        current, total, valid_length, receiver_updated = self._read(RECEIVER, RECEIVER_OFFSET)
+        sent, acked, retrans, rtt, throughput, sender_updated = self._read(SENDER, SENDER_OFFSET)
+        return {
+            "current": current, "total": total, "valid_length": valid_length,
+            "percent": int(current * 100 / total) if total > 0 else 0,
+            "sent": sent, "acked": acked, "retrans": retrans, "rtt": rtt, "throughput": throughput,
+            "receiver_updated": receiver_updated, "sender_updated": sender_updated,
+        }
+
+    def close(self):
+        if not self.map.closed:
+            self.map.close()
+
+def format_stats(state):
+    return (f"sent:{state['sent']}  acked:{state['acked']}  retrans:{state['retrans']}  "
+            f"rtt:{state['rtt'] * 1000:.1f}ms  throughput:{state['throughput'] / 1024:.1f} KB/s")
+
+def format_state(state):
+    return (f"progress:{state['current']}/{state['total']} ({state['percent']}%)  "
+            f"bytes:{state['valid_length']}  " + format_stats(state))
+
+if __name__ == "__main__":
+    watch = "--watch" in sys.argv[1:]
+    telemetry = Telemetry()
+    try:
+        while True:
+            print(format_state(telemetry.read()), flush=True)
+            if not watch:
+                break
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    telemetry.close()
@@ -5,7 +5,13 @@ Receiver-Driven RDT 3.0 Sender Implementation
 Role: Sender
 This script reads the file to be transmitted, segments it into packets,
 and then waits for requests from the receiver. When a request arrives,
-it responds with the requested packet.
+it responds with the requested packets. A request names one packet
+("REQ 7") or ranges of them ("REQ 4-9,12 BASE 4 AT 12.5", BASE being the
+first packet the receiver still lacks and AT the receiver's clock when it
+sent the request). A packet requested again less than one RTT after the
+request it was sent for is not sent twice. Its counters (packets sent, packets the
+receiver has confirmed, re-sent packets, RTT) are published through the
+telemetry channel ("telemetry.bin").
 ------------------------------------------------
 Usage:
     python3 client_rd.py <filename> <receiver_ip> <loss_rate> <option>
@@ -18,6 +24,8 @@ Arguments:
 """
 
 import socket, sys, struct, time, random, os
+import telemetry
+from packet_checksum import compute_checksum
 
 # Optional simulation parameters
 try:
@@ -29,9 +37,6 @@ try:
 except Exception:
     option = 1
 
-def compute_checksum(data):
-    return sum(data) % 256
-
 def make_packet(seq_num, data):
     checksum = compute_checksum(data)
     header = struct.pack("!I B I", seq_num, checksum, len(data))
@@ -51,6 +56,63 @@ def load_packets(filename, packet_size=1024):
         seq_num += 1
     return packets
 
+ALPHA = 0.125
+
+def parse_request(message):
+    # "REQ 7" -> ([(7, 7)], 7, None)
+    # "REQ 4-9,12 BASE 4 AT 12.5" -> ([(4, 9), (12, 12)], 4, 12.5)
+    # Returns None for anything else. Without BASE the receiver is pulling one
+    # packet at a time, so everything below the requested one has arrived.
+    parts = message.split()
+    if (len(parts) not in (2, 4, 6) or parts[0] != "REQ" or parts[2:3] not in ([], ["BASE"])
+            or parts[4:5] not in ([], ["AT"])):
+        return None
+    try:
+        ranges = []
+        for item in parts[1].split(","):
+            first, _, last = item.partition("-")
+            first = int(first)
+            last = int(last) if last else first
+            if last < first:
+                return None
+            ranges.append((first, last))
+        base = int(parts[3]) if len(parts) >= 4 else ranges[0][0]
+        stamp = float(parts[5]) if len(parts) == 6 else None
+    except ValueError:
+        return None
+    return ranges, base, stamp
+
+class TransferState:
+    # Per-transfer counters, replaced whenever a receiver asks for the header.
+    # Requests are timed by their stamp: the receiver's clock when it sent the
+    # request (AT), or our arrival time if it has none. A request that waited
+    # in our socket buffer then counts neither towards the RTT nor against
+    # the duplicate check.
+    def __init__(self):
+        self.sent = self.acked = self.retrans = self.suppressed = 0
+        self.answered = {}  # seq -> stamp of the request it was last sent for
+        self.sent_once = set()  # seqs sent exactly once, usable as RTT samples (Karn)
+        self.srtt = 0.0  # smoothed time from a request to the one showing its packet arrived
+        self.min_rtt = 0.0  # the shortest such time: a request stamped sooner than this
+                            # after the one a copy answered cannot mean the copy was missed
+        self.start_time = time.time()
+
+    def advance(self, base, stamp, total_packets):
+        # The receiver has everything below base
+        if base <= self.acked:
+            return
+        if base - 1 in self.sent_once:
+            sample = stamp - self.answered[base - 1]
+            self.srtt = sample if self.srtt == 0.0 else (1 - ALPHA) * self.srtt + ALPHA * sample
+            self.min_rtt = sample if self.min_rtt == 0.0 else min(self.min_rtt, sample)
+        self.acked = min(base, total_packets)
+
+    def is_duplicate(self, seq, stamp):
+        return seq in self.answered and stamp - self.answered[seq] < self.min_rtt
+
+# Live counters for the GUI and telemetry.py, in shared memory
+live_stats = telemetry.Telemetry()
+
 def sender(receiver_addr, filename):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     # Set socket options to allow port reuse
@@ -68,38 +130,62 @@ def sender(receiver_addr, filename):
     total_packets = len(packets)
     
     print(f"Loaded {total_packets} packets from {filename}.")
-    
+    state = TransferState()
+    live_stats.update_sender(0, 0, 0)
+
     # FSM for Sender:
     #   - If "REQ HEADER" is received, send header: "HEADER <total_packets>"
-    #   - If "REQ <seq>" is received, send packet[seq]
+    #   - If "REQ <ranges> [BASE <seq>]" is received, send the packets in the ranges
+    #     (or END for a sequence past the last packet)
     while True:
         try:
             message, addr = sock.recvfrom(1024)
-            message = message.decode().strip()
+            message = message.decode(errors="ignore").strip()
             if message == "REQ HEADER":
+                state = TransferState()
+                live_stats.update_sender(0, 0, 0)
                 header_msg = f"HEADER {total_packets}".encode()
                 sock.sendto(header_msg, addr)
                 print("Sent header info to receiver.")
             elif message.startswith("REQ"):
-                parts = message.split()
-                if len(parts) != 2:
-                    continue
-                try:
-                    req_seq = int(parts[1])
-                except:
+                request = parse_request(message)
+                if request is None:
                     continue
-                if req_seq < total_packets:
-                    # (Optional: simulate packet loss/error for simulation option 2)
-                    if option == 2 and random.random() < SIM_LOSS_RATE:
-                        print(f"Simulating error for packet {req_seq} (not sending).")
-                        continue
-                    packet = packets[req_seq]
-                    sock.sendto(packet, addr)
-                    print(f"Sent packet {req_seq}")
-                else:
-                    # End-of-transmission: if requested sequence exceeds available packets
-                    sock.sendto(b"END", addr)
-                    print("Sent END signal.")
+                ranges, base, stamp = request
+                now = time.time()
+                if stamp is None:
+                    stamp = now
+                state.advance(base, stamp, total_packets)
+                for first, last in ranges:
+                    for req_seq in range(first, min(last, total_packets - 1) + 1):
+                        if req_seq < state.acked:
+                            continue
+                        if state.is_duplicate(req_seq, stamp):
+                            # The receiver asked before the copy sent for its earlier request could arrive
+                            state.suppressed += 1
+                            continue
+                        # (Optional: simulate packet loss/error for simulation option 2)
+                        if option == 2 and random.random() < SIM_LOSS_RATE:
+                            print(f"Simulating error for packet {req_seq} (not sending).")
+                            state.answered[req_seq] = stamp
+                            state.sent_once.discard(req_seq)
+                            continue
+                        sock.sendto(packets[req_seq], addr)
+                        state.sent += 1
+                        if req_seq in state.answered:
+                            state.retrans += 1
+                            state.sent_once.discard(req_seq)
+                        else:
+                            state.sent_once.add(req_seq)
+                        state.answered[req_seq] = stamp
+                        print(f"Sent packet {req_seq}")
+                    if last >= total_packets:
+                        # End-of-transmission: if requested sequence exceeds available packets
+                        sock.sendto(b"END", addr)
+                        print("Sent END signal.")
+                elapsed = now - state.start_time
+                live_stats.update_sender(state.sent, state.acked, state.retrans, state.srtt,
+                                         state.acked * 1024 / elapsed if elapsed > 0 else 0.0)
             else:
                 print("Received unknown request:", message)
         except socket.timeout:
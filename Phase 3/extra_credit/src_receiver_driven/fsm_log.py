@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Description: Batched asynchronous writer for the FSM and packet logs.
+Records go into a bounded queue and a background thread appends them to the
+log file in batches, so logging a packet event costs a queue put instead of
+an open/write/close of the file. When the queue is full a record is either
+dropped (policy "drop", counted in .dropped) or the caller waits for room
+(policy "block"). Records below the logger's level are discarded before they
+are formatted. Call flush() at the end of a transfer; close() also runs at
+interpreter exit. LogTail is the reading side: it follows a log file from
+the last offset it read, so a monitor only handles the new lines.
+Usage:
+    log = BatchedLogger("sender_fsm.txt")
+    log.debug("Packet 3 ACK received.")
+    log.warning("Packet 4: Timeout. Retransmitting.")
+    log.flush()
+    tail = LogTail("sender_fsm.txt")
+    new_lines, reset = tail.poll()
+"""
+
+import atexit, collections, os, queue, threading, time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+MAX_QUEUE = 10000
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 0.2  # seconds a partial batch may wait before it is written
+TAIL_HISTORY = 2000  # lines a LogTail keeps
+TAIL_MAX_READ = 1 << 20  # bytes a LogTail reads per poll; older backlog is skipped
+TAIL_HEAD = 64  # leading bytes compared to notice a file replaced under the same inode
+
+_STOP = object()
+
+class BatchedLogger:
+    def __init__(self, path, level=DEBUG, max_queue=MAX_QUEUE, policy="drop",
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, timestamps=True):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy '{policy}', choose drop or block")
+        self.path = os.path.abspath(path)
+        self.level = level
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timestamps = timestamps  # prefix "[<time.time()>] " like the old log lines
+        self.queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def log(self, message, level=INFO):
+        if level < self.level or self.closed:
+            return
+        if isinstance(message, bytes):
+            message = f"Binary data: {message.hex()}"
+        line = f"[{time.time()}] {message}\n" if self.timestamps else f"{message}\n"
+        if self.policy == "block":
+            self.queue.put(line)
+            return
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def debug(self, message):
+        self.log(message, DEBUG)
+
+    def info(self, message):
+        self.log(message, INFO)
+
+    def warning(self, message):
+        self.log(message, WARNING)
+
+    def error(self, message):
+        self.log(message, ERROR)
+
+    def flush(self):
+        # Returns once everything logged so far is in the file
+        if self.closed:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            lines = []
+            deadline = time.monotonic() + self.flush_interval
+            # Collect a batch: stop at batch_size, a flush/stop marker, or the deadline
+            while isinstance(item, str):
+                lines.append(item)
+                if len(lines) >= self.batch_size:
+                    item = None
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+            if lines:
+                self._write(lines)
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, lines):
+        # One open per batch, so a reader that truncates or rotates the file
+        # gets a fresh one on the next batch
+        try:
+            with open(self.path, "a") as f:
+                f.write("".join(lines))
+            self.written += len(lines)
+        except OSError:
+            self.dropped += len(lines)
+
+class LogTail:
+    def __init__(self, path, history=TAIL_HISTORY, max_read=TAIL_MAX_READ):
+        self.path = path
+        self.max_read = max_read
+        self.lines = collections.deque(maxlen=history)  # the most recent lines
+        self.offset = 0
+        self.identity = None  # (device, inode) of the file being followed
+        self.partial = b""  # a last line that has no newline yet
+        self.head = b""  # the file's first bytes as last read
+
+    def _restart(self, identity):
+        self.offset = 0
+        self.identity = identity
+        self.partial = b""
+        self.head = b""
+        self.lines.clear()
+
+    def poll(self):
+        # Returns (new complete lines, reset). reset is True when the file was
+        # truncated, replaced (rotated) or removed, and the view should be cleared
+        # before the new lines are shown.
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            reset = self.identity is not None
+            if reset:
+                self._restart(None)
+            return [], reset
+        identity = (st.st_dev, st.st_ino)
+        reset = False
+        if identity != self.identity or st.st_size < self.offset:
+            reset = self.identity is not None
+            self._restart(identity)
+        if st.st_size == self.offset:
+            return [], reset
+        try:
+            with open(self.path, "rb") as f:
+                if self.head and f.read(len(self.head)) != self.head:
+                    # Removed and recreated with a reused inode
+                    reset = True
+                    self._restart(identity)
+                if len(self.head) < TAIL_HEAD:
+                    f.seek(0)
+                    self.head = f.read(TAIL_HEAD)
+                skip = st.st_size - self.offset > self.max_read
+                start = st.st_size - self.max_read if skip else self.offset
+                f.seek(start)
+                data = f.read(st.st_size - start)
+        except OSError:
+            return [], reset
+        self.offset = start + len(data)
+        if skip:
+            # Only the tail is shown anyway; drop the cut line
+            self.partial = b""
+            data = data[data.find(b"\n") + 1:]
+        chunks = (self.partial + data).split(b"\n")
+        self.partial = chunks.pop()
+        new_lines = [chunk.decode("utf-8", errors="replace").rstrip("\r") for chunk in chunks]
+        new_lines = new_lines[-self.lines.maxlen:]
+        self.lines.extend(new_lines)
+        return new_lines, reset
@@ -3,20 +3,24 @@
 Author: Joseph Nguyen
 Description: This module defines the ServerFileTransferGUI class, which provides an advanced, UI/UX-friendly
 graphical interface for monitoring the RDT 3.0 file transfer process. It displays:
-  - A progress bar (updated from "progress.txt")
-  - Real-time stats from "stats.txt" (packets sent, acknowledged, retransmitted)
-  - Sender and receiver FSM logs (from "sender_fsm.txt" and "receiver_fsm.txt") with color-coded entries
-  - A live image preview (updated from "received_file.jpg") using Pillow to decode partial JPEG data
+  - A progress bar and real-time stats (packets sent, acknowledged, retransmitted, RTT, throughput)
+    read from the shared-memory telemetry channel ("telemetry.bin", see telemetry.py)
+  - Sender and receiver FSM logs (followed from "sender_fsm.txt" and "receiver_fsm.txt") with color-coded
+    entries; only new lines are read and the last fsm_log.TAIL_HISTORY lines are kept
+  - A live image preview (updated from "received_file.jpg") using Pillow to decode partial JPEG data;
+    it is decoded off the UI thread, only when the file has grown, at about the preview's size
   - A button to plot performance graphs (from "performance_data.csv")
 Usage:
     python gui.py
 """
 
-import sys, os, csv, matplotlib.pyplot as plt
+import sys, os, io, csv, matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QProgressBar, QTextEdit, QPushButton, QGroupBox, QHBoxLayout
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QPixmap
 from PyQt6.QtCore import Qt, QTimer, pyqtSlot
 from PIL import Image, ImageQt, ImageFile
+import fsm_log, telemetry
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 def get_app():
@@ -51,12 +55,6 @@ def load_performance_data():
         print("No performance data file found. Run experiments first.")
     return data
 
-def read_text_file(filename):
-    if os.path.exists(filename):
-        with open(filename, "r") as f:
-            return f.readlines()
-    return []
-
 def colorize_message(msg):
     if "LOSS" in msg.upper():
         color = "red"
@@ -68,26 +66,48 @@ def colorize_message(msg):
         color = "black"
     return f'<span style="color:{color};">{msg}</span>'
 
+PREVIEW_CACHE_SIZES = 8  # scaled pixmaps kept, one per preview widget size
+
+def decode_preview(path, length, max_size):
+    # Runs on the preview worker: decodes the first `length` bytes of the
+    # partial image, no larger than max_size, and returns a QImage (QPixmaps
+    # may only be made on the UI thread)
+    with open(path, "rb") as f:
+        data = f.read(length)
+    im = Image.open(io.BytesIO(data))
+    im.draft("RGB", max_size)  # JPEG: libjpeg decodes at 1/2 to 1/8 scale
+    im.load()
+    im.thumbnail(max_size)
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+    return ImageQt.ImageQt(im).copy()
+
 class ServerFileTransferGUI(QWidget):
     def __init__(self):
         super().__init__()
-        # Clear old progress and stats files.
-        for fname in ["progress.txt", "stats.txt"]:
-            if os.path.exists(fname):
-                os.remove(fname)
+        # Clear counters left over from an earlier transfer.
+        self.telemetry = telemetry.Telemetry()
+        self.telemetry.reset()
+        self.sender_tail = fsm_log.LogTail("sender_fsm.txt")
+        self.receiver_tail = fsm_log.LogTail("receiver_fsm.txt")
         self.init_ui()
-        # Timer for progress.txt updates
-        self.progress_timer = QTimer(self)
-        self.progress_timer.timeout.connect(self.read_progress)
-        self.progress_timer.start(500)
-        # Timer for stats.txt updates
-        self.stats_timer = QTimer(self)
-        self.stats_timer.timeout.connect(self.update_stats)
-        self.stats_timer.start(500)
+        # Timer for progress and stats updates; reading the telemetry map is cheap
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.timeout.connect(self.read_telemetry)
+        self.telemetry_timer.start(500)
         # Timer for FSM logs updates
         self.fsm_timer = QTimer(self)
         self.fsm_timer.timeout.connect(self.update_fsm_logs)
         self.fsm_timer.start(1000)
+        # Live preview state: one decode in flight at a time, the decoded image,
+        # the file length and widget size it was decoded for, and scaled pixmaps
+        self.preview_pool = ThreadPoolExecutor(max_workers=1)
+        self.preview_job = None
+        self.preview_image = None
+        self.preview_length = 0
+        self.preview_target = None
+        self.preview_cache = {}
+        self.preview_shown = None
         # Timer for image preview updates using Pillow
         self.image_timer = QTimer(self)
         self.image_timer.timeout.connect(self.check_for_image)
@@ -133,6 +153,7 @@ class ServerFileTransferGUI(QWidget):
         self.sender_fsm = QTextEdit()
         self.sender_fsm.setReadOnly(True)
         self.sender_fsm.setFont(QFont("Courier New", 10))
+        self.sender_fsm.document().setMaximumBlockCount(fsm_log.TAIL_HISTORY)
         sender_layout.addWidget(self.sender_fsm)
         sender_group.setLayout(sender_layout)
         fsm_layout.addWidget(sender_group)
@@ -141,6 +162,7 @@ class ServerFileTransferGUI(QWidget):
         self.receiver_fsm = QTextEdit()
         self.receiver_fsm.setReadOnly(True)
         self.receiver_fsm.setFont(QFont("Courier New", 10))
+        self.receiver_fsm.document().setMaximumBlockCount(fsm_log.TAIL_HISTORY)
         receiver_layout.addWidget(self.receiver_fsm)
         receiver_group.setLayout(receiver_layout)
         fsm_layout.addWidget(receiver_group)
@@ -165,54 +187,71 @@ class ServerFileTransferGUI(QWidget):
         self.setLayout(main_layout)
         self.show()
     
-    def read_progress(self):
-        try:
-            with open("progress.txt", "r") as f:
-                content = f.read().strip()
-                if content:
-                    parts = content.split()
-                    if len(parts) == 2:
-                        current = int(parts[0])
-                        total = int(parts[1])
-                        percent = int((current / total) * 100) if total > 0 else 0
-                        self.progress_bar.setValue(percent)
-                        self.progress_label.setText(f"Progress: {percent}%")
-        except Exception:
-            pass
+    def read_telemetry(self):
+        state = self.telemetry.read()
+        self.progress_bar.setValue(state["percent"])
+        self.progress_label.setText(f"Progress: {state['percent']}%")
+        self.stats_label.setText(telemetry.format_stats(state))
     
-    def update_stats(self):
-        try:
-            with open("stats.txt", "r") as f:
-                line = f.readline().strip()
-                if line:
-                    self.stats_label.setText(line)
-        except Exception:
-            pass
-
     def update_fsm_logs(self):
-        sender_lines = read_text_file("sender_fsm.txt")
-        receiver_lines = read_text_file("receiver_fsm.txt")
-        sender_html = "<br>".join([colorize_message(line.strip()) for line in sender_lines])
-        receiver_html = "<br>".join([colorize_message(line.strip()) for line in receiver_lines])
-        self.sender_fsm.setHtml(sender_html)
-        self.receiver_fsm.setHtml(receiver_html)
+        # Appends only the lines written since the last tick; one block per line,
+        # so the documents' maximum block count trims the oldest ones
+        for tail, view in ((self.sender_tail, self.sender_fsm), (self.receiver_tail, self.receiver_fsm)):
+            new_lines, reset = tail.poll()
+            if reset:
+                view.clear()
+            if not new_lines:
+                continue
+            view.setUpdatesEnabled(False)
+            for line in new_lines:
+                view.append(colorize_message(line.strip()))
+            view.setUpdatesEnabled(True)
     
     def check_for_image(self):
         image_path = "received_file.jpg"
-        if os.path.exists(image_path):
+        if self.preview_job is not None and self.preview_job.done():
+            job, self.preview_job = self.preview_job, None
             try:
-                from PIL import Image, ImageQt
-                im = Image.open(image_path)
-                im.load()
-                qimage = ImageQt.ImageQt(im)
-                from PyQt6.QtGui import QPixmap
-                pixmap = QPixmap.fromImage(qimage)
-                scaled_pixmap = pixmap.scaled(self.image_display.size(), 
-                                              Qt.AspectRatioMode.KeepAspectRatio, 
-                                              Qt.TransformationMode.SmoothTransformation)
-                self.image_display.setPixmap(scaled_pixmap)
-            except Exception as e:
-                self.image_display.setText("Unable to load image.")
+                self.preview_image = job.result()
+                self.preview_cache.clear()
+            except Exception:
+                if self.preview_image is None:
+                    self.image_display.setText("Unable to load image.")
+        # The receiver writes the file in order, so its size is the valid length
+        try:
+            length = os.path.getsize(image_path)
+        except OSError:
+            length = 0
+        if length < self.preview_length:
+            self.preview_length = 0  # a new transfer restarted the file
+        target = (max(1, self.image_display.width()), max(1, self.image_display.height()))
+        larger = self.preview_target is not None and (target[0] > self.preview_target[0] or target[1] > self.preview_target[1])
+        if self.preview_job is None and length > 0 and (length > self.preview_length or larger):
+            self.preview_length = length
+            self.preview_target = target
+            self.preview_job = self.preview_pool.submit(decode_preview, image_path, length, target)
+        self.show_preview()
+
+    def show_preview(self):
+        if self.preview_image is None:
+            return
+        size = self.image_display.size()
+        key = (size.width(), size.height())
+        pixmap = self.preview_cache.get(key)
+        if pixmap is None:
+            if len(self.preview_cache) >= PREVIEW_CACHE_SIZES:
+                self.preview_cache.clear()
+            pixmap = QPixmap.fromImage(self.preview_image).scaled(size,
+                                                                 Qt.AspectRatioMode.KeepAspectRatio,
+                                                                 Qt.TransformationMode.SmoothTransformation)
+            self.preview_cache[key] = pixmap
+        if pixmap is not self.preview_shown:
+            self.preview_shown = pixmap
+            self.image_display.setPixmap(pixmap)
+
+    def closeEvent(self, event):
+        self.preview_pool.shutdown(wait=False)
+        super().closeEvent(event)
     
     def plot_performance_graphs(self):
         data = load_performance_data()
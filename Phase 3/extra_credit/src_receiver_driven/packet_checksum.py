@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Description: Packet checksum shared by the sender and the receiver: the sum
+of the payload bytes modulo 256.
+"""
+
+import zlib
+
+def compute_checksum(data):
+    view = memoryview(data)
+    total = 0
+    # adler32's low half is 1 + the byte sum and cannot wrap within 256 bytes
+    for i in range(0, len(view), 256):
+        total += (zlib.adler32(view[i:i + 256]) & 0xFFFF) - 1
+    return total % 256
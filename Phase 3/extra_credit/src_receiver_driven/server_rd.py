@@ -4,23 +4,38 @@ Receiver-Driven RDT 3.0 Receiver Implementation
 ------------------------------------------------
 Role: Receiver
 This script initiates data transfer by sending header and packet requests
-to the sender. It writes progress updates to "progress.txt" and logs events
-to "receiver_fsm.txt". The received file is saved to the specified filename.
+to the sender. It publishes progress through the telemetry channel
+("telemetry.bin") and logs events to "receiver_fsm.txt". The received file
+is saved to the specified filename.
+Requests are pipelined: up to <window> packets are outstanding at once and
+the missing ones are asked for as ranges ("REQ 36-40,44 BASE 4 AT 12.5", where
+BASE is the first packet not yet received and AT our clock when the request
+was sent, which the sender times its duplicate check by). A request that
+goes unanswered for longer than the adaptive timeout is sent again. A
+window of 1 is the original one-packet-per-RTT behaviour.
 ------------------------------------------------
 Usage:
-    python3 server_rd.py <save_filename> <sender_ip> <loss_rate> <option>
+    python3 server_rd.py <save_filename> <sender_ip> <loss_rate> <option> [window]
 
 Arguments:
     <save_filename> : File to save the received data.
     <sender_ip>     : IP address where the sender is running.
     <loss_rate>     : (Optional) Percentage for simulating packet loss or error.
     <option>        : (Optional) Simulation option.
+    <window>        : (Optional) Requests kept outstanding (default 32).
 """
 
 import socket, struct, sys, time, os, random
+import fsm_log, telemetry
+from packet_checksum import compute_checksum
 
-def compute_checksum(data):
-    return sum(data) % 256
+WINDOW = 32
+INITIAL_TIMEOUT = 0.05  # seconds
+MIN_TIMEOUT = 0.005
+MAX_TIMEOUT = 2.0
+ALPHA = 0.125
+BETA = 0.25
+MAX_REQUEST = 960  # bytes of range text per request datagram; the sender reads 1024
 
 def parse_packet(packet):
     header_size = struct.calcsize("!I B I")
@@ -29,22 +44,48 @@ def parse_packet(packet):
     data = packet[header_size:header_size+data_len]
     return seq, checksum, data
 
-def log_receiver_fsm(message):
-    with open("receiver_fsm.txt", "a") as f:
-        f.write(f"[{time.time()}] {message}\n")
+# FSM events are queued and written in batches by a background thread
+receiver_log = fsm_log.BatchedLogger("receiver_fsm.txt")
 
-def update_progress(current, total):
-    with open("progress.txt", "w") as f:
-        f.write(f"{current} {total}")
+def log_receiver_fsm(message, level=fsm_log.INFO):
+    receiver_log.log(message, level)
 
-def receiver(save_filename, sender_addr, sim_loss=0.0, option=1):
+# Live progress for the GUI and telemetry.py, in shared memory
+live_stats = telemetry.Telemetry()
+
+def update_progress(current, total, valid_length=0):
+    live_stats.update_receiver(current, total, valid_length)
+
+def format_ranges(seqs):
+    # [4, 5, 6, 9] -> "4-6,9"
+    ranges = []
+    for seq in seqs:
+        if ranges and ranges[-1][1] == seq - 1:
+            ranges[-1][1] = seq
+        else:
+            ranges.append([seq, seq])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+def split_ranges(ranges, limit=MAX_REQUEST):
+    # Cuts a format_ranges() string at commas into pieces shorter than limit,
+    # one per request datagram
+    pieces = []
+    while ranges:
+        cut = len(ranges) if len(ranges) < limit else ranges.rindex(",", 0, limit)
+        pieces.append(ranges[:cut])
+        ranges = ranges[cut + 1:]
+    return pieces
+
+def receiver(save_filename, sender_addr, sim_loss=0.0, option=1, window=WINDOW):
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind(('', 10000))
     sock.settimeout(2)
     
     expected_seq = 0
-    received_packets = {}
     total_packets = None
+    # Packets go to the file in order, as soon as the gap before them is filled
+    out = open(save_filename, "wb")
+    received_bytes = 0
 
     log_receiver_fsm("Receiver started, requesting header...")
     # Request header until received
@@ -52,7 +93,7 @@ def receiver(save_filename, sender_addr, sim_loss=0.0, option=1):
         sock.sendto("REQ HEADER".encode(), sender_addr)
         try:
             msg, addr = sock.recvfrom(1024)
-            msg_decoded = msg.decode().strip()
+            msg_decoded = msg.decode(errors="ignore").strip()
             if msg_decoded.startswith("HEADER"):
                 parts = msg_decoded.split()
                 if len(parts) == 2 and parts[1].isdigit():
@@ -60,45 +101,92 @@ def receiver(save_filename, sender_addr, sim_loss=0.0, option=1):
                     log_receiver_fsm(f"Received header: total packets = {total_packets}")
                     update_progress(0, total_packets)
         except socket.timeout:
-            log_receiver_fsm("Header request timed out, retrying...")
+            log_receiver_fsm("Header request timed out, retrying...", fsm_log.WARNING)
             continue
 
-    # Now request each packet in sequence
+    # Keep up to `window` requests outstanding. Packets that arrive ahead of
+    # expected_seq wait in `buffered` until the gap before them is filled.
+    buffered = {}
+    requested = {}  # seq -> time of its latest request
+    retried = set()  # seqs requested more than once (no RTT samples, Karn)
+    lost = set()  # seqs overtaken by a packet requested after them
+    estimated_rtt = INITIAL_TIMEOUT
+    dev_rtt = INITIAL_TIMEOUT / 2
+    timeout = INITIAL_TIMEOUT
     while expected_seq < total_packets:
-        req_msg = f"REQ {expected_seq}".encode()
-        sock.sendto(req_msg, sender_addr)
-        log_receiver_fsm(f"Requested packet {expected_seq}")
+        now = time.time()
+        due = []
+        expired = False
+        for seq in range(expected_seq, min(expected_seq + window, total_packets)):
+            if seq in buffered:
+                continue
+            if seq not in requested or seq in lost:
+                due.append(seq)
+            elif now - requested[seq] >= timeout:
+                due.append(seq)
+                expired = True
+        lost.clear()
+        if expired:
+            # Something went unanswered for a whole timeout: back off
+            timeout = min(MAX_TIMEOUT, timeout * 2)
+        if due:
+            for seq in due:
+                if seq in requested:
+                    retried.add(seq)
+                requested[seq] = now
+            ranges = format_ranges(due)
+            for piece in split_ranges(ranges):
+                sock.sendto(f"REQ {piece} BASE {expected_seq} AT {now:.6f}".encode(), sender_addr)
+            log_receiver_fsm(f"Requested packets {ranges}", fsm_log.DEBUG)
+        oldest = min(requested.values(), default=now)
+        sock.settimeout(max(MIN_TIMEOUT, oldest + timeout - time.time()))
         try:
             packet, addr = sock.recvfrom(2048)
-            if packet == b"END":
-                log_receiver_fsm("Received END signal from sender.")
-                break
-            seq, checksum, data = parse_packet(packet)
-            # Optionally simulate loss (e.g. option 5)
-            if option == 5 and random.random() < sim_loss:
-                log_receiver_fsm(f"Simulated loss for packet {seq}.")
-                continue
-            if compute_checksum(data) == checksum and seq == expected_seq:
-                received_packets[seq] = data
-                expected_seq += 1
-                update_progress(expected_seq, total_packets)
-                log_receiver_fsm(f"Received packet {seq} successfully.")
-            else:
-                log_receiver_fsm(f"Packet {expected_seq} failed checksum or sequence check, retrying.")
         except socket.timeout:
-            log_receiver_fsm(f"Timeout waiting for packet {expected_seq}, re-requesting.")
+            log_receiver_fsm(f"Timeout waiting for packet {expected_seq}, re-requesting.", fsm_log.WARNING)
             continue
+        if packet == b"END":
+            log_receiver_fsm("Received END signal from sender.")
+            break
+        try:
+            seq, checksum, data = parse_packet(packet)
+        except struct.error:
+            continue
+        # Optionally simulate loss (e.g. option 5)
+        if option == 5 and random.random() < sim_loss:
+            log_receiver_fsm(f"Simulated loss for packet {seq}.", fsm_log.WARNING)
+            continue
+        if compute_checksum(data) != checksum or not expected_seq <= seq < total_packets or seq in buffered:
+            log_receiver_fsm(f"Packet {seq} failed checksum or sequence check, discarded.", fsm_log.WARNING)
+            continue
+        sent_at = requested.pop(seq, None)
+        if sent_at is not None and seq not in retried:
+            rtt = time.time() - sent_at
+            estimated_rtt = (1 - ALPHA) * estimated_rtt + ALPHA * rtt
+            dev_rtt = (1 - BETA) * dev_rtt + BETA * abs(rtt - estimated_rtt)
+            timeout = min(MAX_TIMEOUT, max(MIN_TIMEOUT, estimated_rtt + 4 * dev_rtt))
+        buffered[seq] = data
+        # The sender answers requests in order, so a missing packet that was
+        # requested no later than this one was lost: ask again right away
+        if sent_at is not None:
+            lost.update(q for q in range(expected_seq, seq) if q not in buffered and requested.get(q, now) <= sent_at)
+        log_receiver_fsm(f"Received packet {seq} successfully.", fsm_log.DEBUG)
+        while expected_seq in buffered:
+            data = buffered.pop(expected_seq)
+            out.write(data)
+            received_bytes += len(data)
+            retried.discard(expected_seq)
+            expected_seq += 1
+        update_progress(expected_seq, total_packets, received_bytes)
 
-    # Save the received file
-    with open(save_filename, "wb") as f:
-        for seq in sorted(received_packets.keys()):
-            f.write(received_packets[seq])
+    out.close()
     log_receiver_fsm("File transfer complete.")
+    receiver_log.flush()
     sock.close()
 
 if __name__ == "__main__":
     if len(sys.argv) < 5:
-        print("Usage: python3 server_rd.py <save_filename> <sender_ip> <loss_rate> <option>")
+        print("Usage: python3 server_rd.py <save_filename> <sender_ip> <loss_rate> <option> [window]")
         sys.exit(1)
     save_filename = sys.argv[1]
     sender_ip = sys.argv[2]
@@ -112,4 +200,8 @@ if __name__ == "__main__":
         option = 1
     sender_port = 10001  # Sender listens on port 10001.
     sender_addr = (sender_ip, sender_port)
-    receiver(save_filename, sender_addr, sim_loss, option)
\ No newline at end of file
+    try:
+        window = int(sys.argv[5])
+    except Exception:
+        window = WINDOW
+    receiver(save_filename, sender_addr, sim_loss, option, window)
\ No newline at end of file
@@ -13,6 +13,8 @@ import socket
 import struct
 import time
 import random
+import fsm_log
+from packet_checksum import check_sum
 
 # Simulation Option (select one):
 #   1 - No loss/bit-errors.
@@ -42,17 +44,12 @@ BUFFER_SIZE = 1024     # Packet size in bytes
 # Log file path
 log_file = "log.txt"
 
-def write_log(entry):
-    """Appends a log entry to log.txt."""
-    with open(log_file, "a") as f:
-        f.write(entry + "\n")
+# Entries are queued and appended to log.txt in batches by a background thread
+packet_log = fsm_log.BatchedLogger(log_file, timestamps=False)
 
-def check_sum(data):
-    """Calculates a simple XOR-based checksum over the data bytes."""
-    checksum = 0
-    for byte in data:
-        checksum ^= byte
-    return checksum
+def write_log(entry, level=fsm_log.INFO):
+    """Queues a log entry for log.txt."""
+    packet_log.log(entry, level)
 
 # Read the BMP file to be transferred
 with open("image.bmp", "rb") as f:
@@ -82,7 +79,7 @@ for packet in packets:
         # Send the packet over UDP
         client_socket.sendto(full_packet, (UDP_IP, UDP_PORT))
         print(f"Sent Packet {seq_num}")
-        write_log(f"{time.time()} | {seq_num} | Sent | {checksum} | Success")
+        write_log(f"{time.time()} | {seq_num} | Sent | {checksum} | Success", fsm_log.DEBUG)
 
         try:
             # Wait for the 4-byte ACK packet from the server
@@ -122,6 +119,7 @@ total_time = end_time - start_time
 print("File transfer complete.")
 print(f"Time taken to send file: {total_time:.2f} seconds.")
 write_log(f"File Transfer Completed in {total_time:.2f} seconds")
+packet_log.flush()
 
 # Signal the end of the transfer and close the socket
 client_socket.sendto(b"STOP", (UDP_IP, UDP_PORT))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Description: Batched asynchronous writer for the packet log (log.txt).
+Records go into a bounded queue and a background thread appends them to the
+log file in batches, so logging a packet event costs a queue put instead of
+an open/write/close of the file. When the queue is full a record is either
+dropped (policy "drop", counted in .dropped) or the caller waits for room
+(policy "block"). Records below the logger's level are discarded before they
+are formatted. Call flush() at the end of a transfer; close() also runs at
+interpreter exit.
+Usage:
+    log = BatchedLogger("log.txt", timestamps=False)
+    log.debug("1712345678.9 | 3 | Sent | 42 | Success")
+    log.info("File Transfer Completed in 1.23 seconds")
+    log.flush()
+"""
+
+import atexit, os, queue, threading, time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+MAX_QUEUE = 10000
+BATCH_SIZE = 512
+FLUSH_INTERVAL = 0.2  # seconds a partial batch may wait before it is written
+
+_STOP = object()
+
+class BatchedLogger:
+    def __init__(self, path, level=DEBUG, max_queue=MAX_QUEUE, policy="drop",
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, timestamps=True):
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy '{policy}', choose drop or block")
+        self.path = os.path.abspath(path)
+        self.level = level
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timestamps = timestamps  # prefix "[<time.time()>] " like the old log lines
+        self.queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def log(self, message, level=INFO):
+        if level < self.level or self.closed:
+            return
+        if isinstance(message, bytes):
+            message = f"Binary data: {message.hex()}"
+        line = f"[{time.time()}] {message}\n" if self.timestamps else f"{message}\n"
+        if self.policy == "block":
+            self.queue.put(line)
+            return
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+
+    def debug(self, message):
+        self.log(message, DEBUG)
+
+    def info(self, message):
+        self.log(message, INFO)
+
+    def warning(self, message):
+        self.log(message, WARNING)
+
+    def error(self, message):
+        self.log(message, ERROR)
+
+    def flush(self):
+        # Returns once everything logged so far is in the file
+        if self.closed:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            lines = []
+            deadline = time.monotonic() + self.flush_interval
+            # Collect a batch: stop at batch_size, a flush/stop marker, or the deadline
+            while isinstance(item, str):
+                lines.append(item)
+                if len(lines) >= self.batch_size:
+                    item = None
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+            if lines:
+                self._write(lines)
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, lines):
+        # One open per batch, so a reader that truncates or rotates the file
+        # gets a fresh one on the next batch
+        try:
+            with open(self.path, "a") as f:
+                f.write("".join(lines))
+            self.written += len(lines)
+        except OSError:
+            self.dropped += len(lines)
@@ -0,0 +1,18 @@
+"""
+Description: XOR checksum shared by client.py and server.py.
+"""
+
+def check_sum(data):
+    """Calculates a simple XOR-based checksum over the data bytes.
+
+    The bytes are read as one integer and folded in halves, so the XOR runs
+    in C instead of one Python iteration per byte.
+    """
+    width = len(data)
+    checksum = int.from_bytes(data, "big")
+    while width > 1:
+        half = (width + 1) // 2
+        bits = half * 8
+        checksum = (checksum >> bits) ^ (checksum & ((1 << bits) - 1))
+        width = half
+    return checksum
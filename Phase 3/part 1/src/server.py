@@ -13,6 +13,8 @@ import socket
 import struct
 import random
 import time
+import fsm_log
+from packet_checksum import check_sum
 
 # Simulation Option (select one):
 #   1 - No loss/bit-errors.
@@ -42,17 +44,12 @@ BUFFER_SIZE = 1024    # Expected packet data size in bytes
 # Log file path
 log_file = "log.txt"
 
-def write_log(entry):
-    """Appends a log entry to log.txt."""
-    with open(log_file, "a") as f:
-        f.write(entry + "\n")
+# Entries are queued and appended to log.txt in batches by a background thread
+packet_log = fsm_log.BatchedLogger(log_file, timestamps=False)
 
-def check_sum(data):
-    """Calculates a simple XOR-based checksum over the data bytes."""
-    checksum = 0
-    for byte in data:
-        checksum ^= byte
-    return checksum
+def write_log(entry, level=fsm_log.INFO):
+    """Queues a log entry for log.txt."""
+    packet_log.log(entry, level)
 
 # Create and bind a UDP socket
 server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -60,7 +57,7 @@ server_socket.bind((UDP_IP, UDP_PORT))
 print(f"UDP Server listening on {UDP_IP}:{UDP_PORT}...")
 
 while True:
-    received_data = {}  # Dictionary to hold received packets (keyed by sequence number)
+    output_file = None    # Opened on the first accepted packet; data is written as it arrives
     expected_seq_num = 0  # Start expecting sequence number 0
     start_time = None     # Timer starts when the first packet is received
 
@@ -79,6 +76,7 @@ while True:
                 print("\nFile transfer complete.")
                 print(f"Time taken: {total_time:.2f} seconds.")
                 write_log(f"File Transfer Completed in {total_time:.2f} seconds")
+                packet_log.flush()
             break
 
         # Start the timer when the first packet is received
@@ -112,9 +110,11 @@ while True:
 
         # Validate packet integrity and order
         if computed_checksum == received_checksum and seq_num == expected_seq_num:
-            received_data[seq_num] = data
+            if output_file is None:
+                output_file = open("received_image.bmp", "wb")
+            output_file.write(data)
             print(f"Received Packet {seq_num}, sending ACK.")
-            write_log(f"{time.time()} | {seq_num} | Received | {computed_checksum} | Success")
+            write_log(f"{time.time()} | {seq_num} | Received | {computed_checksum} | Success", fsm_log.DEBUG)
 
             # Send ACK with the correct sequence number
             ack_packet = struct.pack("I", seq_num)
@@ -128,10 +128,8 @@ while True:
             ack_packet = struct.pack("I", last_ack)
             server_socket.sendto(ack_packet, client_address)
 
-    # Assemble and save the received file after the transfer ends
-    if received_data:
-        # For a two-state protocol, simply ordering by key (0 and 1) works; adjust if using larger sequence space.
-        sorted_data = b"".join(received_data[i] for i in sorted(received_data.keys()))
-        with open("received_image.bmp", "wb") as f:
-            f.write(sorted_data)
+    # Packets were written in arrival order, which is file order for the
+    # alternating-bit protocol, so only the file needs closing
+    if output_file is not None:
+        output_file.close()
         print("File saved as 'received_image.bmp'")
\ No newline at end of file
@@ -0,0 +1,95 @@
+import argparse
+import os
+import socket
+import threading
+import time
+from src import go_back_n
+from src.offload import SegmentBatcher, GroSocket, gso_supported, enable_gro
+from src.utils import make_packet
+
+# Compares the per-packet sendto/recvfrom path with UDP GSO/GRO batches on
+# loopback. Run from the Phase 4 directory:
+#   python -m benchmarks.bench_offload [--packets 20000] [--batch 10 50]
+
+PACKET_SIZE = 1024
+
+def blast(packets, batch, offload):
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(0.5)
+    rx = GroSocket(receiver) if offload else receiver
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tx = SegmentBatcher(sender, use_gso=offload)
+    address = receiver.getsockname()
+    payload = os.urandom(PACKET_SIZE)
+    received = 0
+
+    start = time.perf_counter()
+    for seq in range(0, packets, batch):
+        for i in range(seq, min(seq + batch, packets)):
+            tx.sendto(make_packet(i, payload), address)
+        tx.flush()
+        # Drain what arrived so the receive buffer does not overflow
+        while received < min(seq + batch, packets):
+            try:
+                rx.recvfrom(PACKET_SIZE + 16)
+            except socket.timeout:
+                break
+            received += 1
+    elapsed = time.perf_counter() - start
+    sender.close()
+    receiver.close()
+    return {
+        "packets_per_sec": received / elapsed,
+        "received": received,
+        "send_syscalls": tx.syscalls,
+        "recv_syscalls": rx.syscalls if offload else received,
+    }
+
+def transfer(file_path, window_size, offload, port):
+    output_file = file_path + ".out"
+    go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.0
+    go_back_n.SEGMENT_OFFLOAD = offload
+    receiver_thread = threading.Thread(target=go_back_n.run_go_back_n_receiver, args=('127.0.0.1', port, output_file))
+    receiver_thread.start()
+    start = time.perf_counter()
+    size = go_back_n.run_go_back_n_sender('127.0.0.1', port, file_path, window_size)
+    receiver_thread.join()
+    elapsed = time.perf_counter() - start
+    os.remove(output_file)
+    return size / elapsed / 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UDP GSO/GRO benchmark against the per-packet path")
+    parser.add_argument("--packets", type=int, default=20000, help="Datagrams per raw run")
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 50], help="Window sizes to batch")
+    parser.add_argument("--file_size", type=int, default=2 * 1024 * 1024, help="Bytes per Go-Back-N transfer")
+    parser.add_argument("--port", type=int, default=54420, help="Port for the Go-Back-N transfers")
+    args = parser.parse_args()
+
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    print(f"GSO supported: {gso_supported(probe)}, GRO supported: {enable_gro(probe)}")
+    probe.close()
+
+    print(f"\nRaw datagrams ({args.packets} x {PACKET_SIZE + 16} bytes)")
+    for batch in args.batch:
+        for offload in (False, True):
+            result = blast(args.packets, batch, offload)
+            mode = "gso/gro" if offload else "per-packet"
+            print(f"  batch {batch:3d} {mode:10s} {result['packets_per_sec']:10.0f} pkt/s  "
+                  f"send syscalls {result['send_syscalls']:6d}  recv syscalls {result['recv_syscalls']:6d}  "
+                  f"received {result['received']}")
+
+    file_path = "bench_offload_input.bin"
+    with open(file_path, "wb") as f:
+        f.write(os.urandom(args.file_size))
+    print(f"\nGo-Back-N transfer ({args.file_size} bytes, no loss)")
+    try:
+        for batch in args.batch:
+            for offload in (False, True):
+                mbps = transfer(file_path, batch, offload, args.port)
+                mode = "gso/gro" if offload else "per-packet"
+                print(f"  window {batch:3d} {mode:10s} {mbps:8.2f} MB/s")
+    finally:
+        os.remove(file_path)
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from src import go_back_n, selective_repeat, async_go_back_n
+from src.utils import make_packet, verify_checksum, extract_sequence_number, extract_data
+
+# Codec hot paths in packets/sec and loopback transfers per protocol, file
+# size and window size. Results are written as JSON and can be compared
+# with a saved baseline; the exit status is 1 when anything regressed by
+# more than the tolerance. Run from the Phase 4 directory:
+#   python -m benchmarks.bench_suite --output bench.json
+#   python -m benchmarks.bench_suite --baseline bench.json [--tolerance 0.1]
+
+PACKET_SIZE = 1024
+PROTOCOLS = ("gbn", "sr", "async")
+
+def best_rate(function, items, repeat):
+    # Calls function on every item `repeat` times over; returns the best items/sec
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(items) / elapsed)
+    return best
+
+def bench_codec(packets, repeat):
+    payloads = [os.urandom(PACKET_SIZE) for _ in range(64)] * (packets // 64)
+    encoded = [make_packet(i, payload) for i, payload in enumerate(payloads)]
+    numbered = list(enumerate(payloads))
+    return {
+        "codec.make_packet": best_rate(lambda item: make_packet(item[0], item[1]), numbered, repeat),
+        "codec.verify_checksum": best_rate(verify_checksum, encoded, repeat),
+        "codec.extract_sequence_number": best_rate(extract_sequence_number, encoded, repeat),
+        "codec.extract_data": best_rate(extract_data, encoded, repeat),
+    }
+
+def transfer(protocol, file_path, window_size, port):
+    # One loss-free loopback transfer; returns the sender's completion time
+    output_file = file_path + ".out"
+    if protocol == "async":
+        async def run():
+            receiver = await async_go_back_n.open_receiver('127.0.0.1', port, output_file)
+            start = time.perf_counter()
+            await async_go_back_n.send_file('127.0.0.1', port, file_path, window_size)
+            elapsed = time.perf_counter() - start
+            await receiver.done
+            await receiver.closed
+            return elapsed
+        elapsed = asyncio.run(run())
+    else:
+        if protocol == "gbn":
+            receive = lambda: go_back_n.run_go_back_n_receiver('127.0.0.1', port, output_file)
+            send = lambda: go_back_n.run_go_back_n_sender('127.0.0.1', port, file_path, window_size)
+        else:
+            receive = lambda: selective_repeat.run_selective_repeat_receiver('127.0.0.1', port, output_file, window_size)
+            send = lambda: selective_repeat.run_selective_repeat_sender('127.0.0.1', port, file_path, window_size)
+        receiver_thread = threading.Thread(target=receive)
+        receiver_thread.start()
+        start = time.perf_counter()
+        send()
+        elapsed = time.perf_counter() - start
+        receiver_thread.join()
+    with open(file_path, 'rb') as f, open(output_file, 'rb') as g:
+        if f.read() != g.read():
+            raise RuntimeError(f"{protocol} transfer of {file_path} was corrupted")
+    os.remove(output_file)
+    return elapsed
+
+def bench_transfers(protocols, sizes, windows, repeat, port):
+    for module in (go_back_n, selective_repeat, async_go_back_n):
+        module.DATA_LOSS_RATE = module.ACK_LOSS_RATE = module.BIT_ERROR_RATE = 0.0
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            file_path = os.path.join(tmp, f"input_{size}.bin")
+            with open(file_path, 'wb') as f:
+                f.write(os.urandom(size))
+            for protocol in protocols:
+                for window in windows:
+                    times = []
+                    for _ in range(repeat):
+                        # Each transfer still prints its sender/receiver summary lines; keep
+                        # them out of the report
+                        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                            times.append(transfer(protocol, file_path, window, port))
+                        port += 1
+                    name = f"e2e.{protocol}.size={size}.window={window}"
+                    completion_time = statistics.median(times)
+                    results[name + ".completion_time"] = completion_time
+                    results[name + ".throughput"] = size / completion_time / 1e6
+    return results
+
+def unit(name):
+    if name.endswith(".completion_time"):
+        return "s"
+    if name.endswith(".throughput"):
+        return "MB/s"
+    return "pkt/s"
+
+def higher_is_better(name):
+    return not name.endswith(".completion_time")
+
+def compare(results, baseline, tolerance):
+    # Returns the names that got worse than the baseline by more than tolerance
+    regressions = []
+    print(f"\n{'benchmark':55s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, value in results.items():
+        if name not in baseline:
+            print(f"{name:55s} {'-':>12s} {value:12.4g} {'new':>8s}")
+            continue
+        old = baseline[name]
+        change = (value - old) / old if old else 0.0
+        worse = -change if higher_is_better(name) else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:55s} {old:12.4g} {value:12.4g} {change:+8.1%}{flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Codec and loopback transfer benchmarks")
+    parser.add_argument("--packets", type=int, default=20000, help="Packets per codec run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64 * 1024, 1024 * 1024], help="File sizes in bytes")
+    parser.add_argument("--windows", type=int, nargs="+", default=[10, 50], help="Window sizes")
+    parser.add_argument("--protocols", nargs="+", choices=PROTOCOLS, default=list(PROTOCOLS))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best codec rate, median transfer)")
+    parser.add_argument("--port", type=int, default=54480, help="First loopback port; every transfer takes the next one")
+    parser.add_argument("--output", help="Write the results as JSON, e.g. to save a baseline")
+    parser.add_argument("--baseline", help="JSON from an earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown before a result counts as a regression")
+    parser.add_argument("--skip_transfers", action="store_true", help="Only run the codec benchmarks")
+    args = parser.parse_args()
+
+    results = bench_codec(args.packets, args.repeat)
+    if not args.skip_transfers:
+        results.update(bench_transfers(args.protocols, args.sizes, args.windows, args.repeat, args.port))
+
+    for name, value in results.items():
+        print(f"{name:55s} {value:14.4f} {unit(name)}")
+
+    if args.output:
+        report = {
+            "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "machine": platform.machine(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
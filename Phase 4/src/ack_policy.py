@@ -0,0 +1,56 @@
+import time
+
+# Delayed/thinned cumulative ACKs for the Go-Back-N receivers. In-order
+# packets are acknowledged every `every` packets, or once `delay` seconds
+# have passed since the first unacknowledged one, whichever comes first.
+# Gaps and corrupt packets are answered at once with the duplicate ACK so
+# the sender's loss detection is not slowed down. every=1 is the classic
+# ACK-per-packet receiver.
+ACK_EVERY = 2
+ACK_DELAY = 0.005
+
+class AckPolicy:
+    def __init__(self, every=ACK_EVERY, delay=ACK_DELAY, clock=time.monotonic):
+        self.every = max(1, every)
+        self.delay = delay
+        self.clock = clock
+        self.pending = 0
+        self.deadline = None
+        self.packets = 0  # packets an ACK-per-packet receiver would have answered
+        self.acks_sent = 0
+
+    def on_data(self):
+        # In-order packet; returns True when its ACK should go out now
+        self.packets += 1
+        self.pending += 1
+        if self.pending >= self.every or self.delay <= 0:
+            return True
+        if self.deadline is None:
+            self.deadline = self.clock() + self.delay
+        return False
+
+    def on_gap(self):
+        # Out-of-order or corrupt packet: ACK now, which also covers anything pending
+        self.packets += 1
+        return True
+
+    def due(self):
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def next_timeout(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self.clock())
+
+    def sent(self):
+        # Every ACK that leaves the receiver (or is dropped by the loss simulation)
+        self.acks_sent += 1
+        self.pending = 0
+        self.deadline = None
+
+    def acks_saved(self):
+        return max(0, self.packets - self.acks_sent)
+
+    def stats(self):
+        return {"every": self.every, "delay": self.delay, "packets": self.packets,
+                "acks_sent": self.acks_sent, "acks_saved": self.acks_saved()}
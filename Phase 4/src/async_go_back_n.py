@@ -0,0 +1,295 @@
+import asyncio
+try:
+    from .utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_data, extract_packet_type
+    from .rto import RtoEstimator
+    from .congestion import make_controller
+    from .reassembly import StreamingReassembler
+except ImportError:
+    from utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_data, extract_packet_type
+    from rto import RtoEstimator
+    from congestion import make_controller
+    from reassembly import StreamingReassembler
+
+# Go-Back-N on an asyncio event loop. The sender and receiver are the same
+# state machines as go_back_n.py, driven by datagram_received() and
+# call_later() timers instead of blocking recvfrom, so one process can run
+# many transfers at once:
+#
+#     await asyncio.gather(*(send_file(host, port, path) for port, path in jobs))
+#
+# File reads and writes stay synchronous; they are small and hit the page cache.
+
+PACKET_SIZE = 1024
+TIMEOUT = 0.05
+MAX_WINDOW_SIZE = 50
+ACK_SIGNAL = b'ACK'
+END_SIGNAL = b'END'
+# Simulated impairments, off by default (the experiments in sender.py set them)
+DATA_LOSS_RATE = 0.0
+ACK_LOSS_RATE = 0.0
+BIT_ERROR_RATE = 0.0
+CONGESTION_CONTROL = 'fixed'
+END_RETRIES = 10
+# The sender gives up after this many timeouts in a row without the window moving
+MAX_TIMEOUTS = 30
+END_LINGER = 0.5
+RECEIVER_IDLE_TIMEOUT = 5.0
+
+class GoBackNSenderProtocol(asyncio.DatagramProtocol):
+    def __init__(self, file, N, done):
+        self.file = file
+        self.N = N
+        self.done = done
+        self.transport = None
+        self.loop = asyncio.get_running_loop()
+        self.rto = RtoEstimator(TIMEOUT)
+        self.cc = make_controller(CONGESTION_CONTROL, N)
+        self.base = 0
+        self.nextseqnum = 0
+        self.sndpkt = [b''] * N
+        self.file_size = 0
+        self.retransmissions = 0
+        self.eof = False
+        self.end_tries = 0
+        self.stalled = 0
+        self.timer = None
+        self.pace_timer = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.fill_window()
+
+    def udt_send(self, packet):
+        if not simulate_loss(DATA_LOSS_RATE):
+            self.transport.sendto(packet)
+
+    def start_timer(self):
+        self.stop_timer()
+        self.timer = self.loop.call_later(self.rto.timeout, self.on_timeout)
+
+    def stop_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def fill_window(self):
+        # A pending pace timer calls back in here once the controller allows
+        if self.pace_timer is not None:
+            return
+        while not self.eof and self.nextseqnum < self.base + min(self.N, self.cc.window()):
+            delay = self.cc.pacing_delay()
+            if delay > 0:
+                self.pace_timer = self.loop.call_later(delay, self.on_pace)
+                return
+            data = self.file.read(PACKET_SIZE)
+            if not data:
+                self.eof = True
+                break
+            self.file_size += len(data)
+            self.cc.on_send()
+            packet = make_packet(self.nextseqnum, data)
+            self.sndpkt[self.nextseqnum % self.N] = packet
+            self.udt_send(packet)
+            self.rto.on_send(self.nextseqnum)
+            if self.base == self.nextseqnum:
+                self.start_timer()
+            self.nextseqnum += 1
+        if self.eof and self.base == self.nextseqnum and self.end_tries == 0:
+            self.send_end()
+
+    def on_pace(self):
+        self.pace_timer = None
+        self.fill_window()
+
+    def send_end(self):
+        self.end_tries += 1
+        if self.end_tries > END_RETRIES:
+            self.finish(TimeoutError(f"END was never acknowledged after {END_RETRIES} tries"))
+            return
+        self.transport.sendto(make_packet(self.nextseqnum, b'', packet_type=END_SIGNAL))
+        self.start_timer()
+
+    def on_timeout(self):
+        self.timer = None
+        if self.end_tries:
+            self.send_end()
+            return
+        self.stalled += 1
+        if self.stalled > MAX_TIMEOUTS:
+            self.finish(TimeoutError(f"no progress past packet {self.base} after {MAX_TIMEOUTS} timeouts"))
+            return
+        self.rto.on_timeout()
+        self.rto.on_retransmit(self.base, self.nextseqnum)
+        self.cc.on_timeout()
+        for seq in range(self.base, self.nextseqnum):
+            self.retransmissions += 1
+            self.udt_send(self.sndpkt[seq % self.N])
+        self.start_timer()
+
+    def datagram_received(self, packet, address):
+        packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+        if not verify_checksum(packet) or extract_packet_type(packet) != ACK_SIGNAL:
+            return
+        ack_num = extract_sequence_number(packet)
+        if self.end_tries:
+            if ack_num == self.nextseqnum:
+                self.finish()
+            return
+        if self.base <= ack_num < self.nextseqnum:
+            rtt = self.rto.on_ack(ack_num)
+            self.cc.on_ack(ack_num + 1 - self.base, rtt)
+            self.base = ack_num + 1
+            self.stalled = 0
+            if self.base == self.nextseqnum:
+                self.stop_timer()
+            else:
+                self.start_timer()
+            self.fill_window()
+        elif ack_num == self.base - 1:
+            self.cc.on_duplicate_ack()
+
+    def error_received(self, exc):
+        # e.g. ICMP port unreachable before the receiver is up: the
+        # retransmission timer covers it
+        pass
+
+    def stop_pacing(self):
+        if self.pace_timer is not None:
+            self.pace_timer.cancel()
+            self.pace_timer = None
+
+    def finish(self, exc=None):
+        self.stop_timer()
+        self.stop_pacing()
+        if not self.done.done():
+            if exc is not None:
+                self.done.set_exception(exc)
+            else:
+                self.done.set_result(self.file_size)
+        self.transport.close()
+
+    def connection_lost(self, exc):
+        self.stop_timer()
+        self.stop_pacing()
+        if not self.done.done():
+            if exc is not None:
+                self.done.set_exception(exc)
+            else:
+                self.done.set_result(self.file_size)
+
+class GoBackNReceiverProtocol(asyncio.DatagramProtocol):
+    def __init__(self, file, done):
+        self.file = file
+        self.done = done
+        self.transport = None
+        self.loop = asyncio.get_running_loop()
+        self.stream = StreamingReassembler(file)
+        self.expectedseqnum = 0
+        self.idle_timer = None
+        # Set once the socket is closed, i.e. after the linger that follows END
+        self.closed = self.loop.create_future()
+
+    @property
+    def port(self):
+        return self.transport.get_extra_info('sockname')[1]
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def send_ack(self, seq, address):
+        if not simulate_loss(ACK_LOSS_RATE):
+            self.transport.sendto(make_packet(seq, b'', packet_type=ACK_SIGNAL), address)
+
+    def datagram_received(self, packet, address):
+        if self.done.done():
+            # Lingering after END: re-ACK the ENDs of a sender that missed our ACK
+            if verify_checksum(packet) and extract_packet_type(packet) == END_SIGNAL and extract_sequence_number(packet) == self.expectedseqnum:
+                self.transport.sendto(make_packet(self.expectedseqnum, b'', packet_type=ACK_SIGNAL), address)
+            return
+        # The idle timeout only starts once the sender has shown up
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        self.idle_timer = self.loop.call_later(RECEIVER_IDLE_TIMEOUT, self.finish)
+
+        if simulate_loss(DATA_LOSS_RATE):
+            return
+        packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+        if not verify_checksum(packet):
+            if self.expectedseqnum > 0:
+                self.send_ack(self.expectedseqnum - 1, address)
+            return
+
+        seq_num = extract_sequence_number(packet)
+        packet_type = extract_packet_type(packet)
+        if packet_type == END_SIGNAL:
+            if seq_num == self.expectedseqnum:
+                self.transport.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address)
+                self.finish(linger=END_LINGER)
+            return
+
+        if seq_num == self.expectedseqnum:
+            self.stream.add(seq_num, extract_data(packet))
+            self.send_ack(seq_num, address)
+            self.expectedseqnum += 1
+        elif self.expectedseqnum > 0:
+            self.send_ack(self.expectedseqnum - 1, address)
+
+    def finish(self, linger=0.0):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        if not self.done.done():
+            self.stream.close()
+            self.done.set_result(self.stream.delivered_bytes)
+        if linger > 0:
+            self.loop.call_later(linger, self.transport.close)
+        else:
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.stream.close()
+            self.done.set_result(self.stream.delivered_bytes)
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+async def send_file(host, port, file_path, N=MAX_WINDOW_SIZE):
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    with open(file_path, 'rb') as file:
+        await loop.create_datagram_endpoint(lambda: GoBackNSenderProtocol(file, N, done), remote_addr=(host, port))
+        return await done
+
+async def open_receiver(host, port, output_file):
+    # Binds right away and returns the protocol; await protocol.done for the
+    # byte count and protocol.closed for the end of the linger after END.
+    # Port 0 picks a free port, readable as protocol.port.
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+    file = open(output_file, 'wb')
+    try:
+        _, protocol = await loop.create_datagram_endpoint(lambda: GoBackNReceiverProtocol(file, done), local_addr=(host, port))
+    except OSError:
+        file.close()
+        raise
+    done.add_done_callback(lambda _: file.close())
+    return protocol
+
+async def receive_file(host, port, output_file):
+    protocol = await open_receiver(host, port, output_file)
+    received = await protocol.done
+    await protocol.closed
+    return received
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="asyncio Go-Back-N sender/receiver")
+    parser.add_argument("mode", choices=["send", "receive"])
+    parser.add_argument("path", help="File to send or to write")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument("--window_size", type=int, default=MAX_WINDOW_SIZE)
+    args = parser.parse_args()
+    if args.mode == "send":
+        print(f"Sent {asyncio.run(send_file(args.host, args.port, args.path, args.window_size))} bytes")
+    else:
+        print(f"Received {asyncio.run(receive_file(args.host, args.port, args.path))} bytes")
@@ -0,0 +1,58 @@
+import struct
+import zlib
+
+HEADER_FORMAT = "!II4sH"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+CHECKSUM_OFFSET = 12  # seq (4) + length (4) + type (4), then the 2-byte checksum field
+TRAILER_SIZE = 2
+
+# adler32's low half is 1 + sum(bytes) mod 65521. A 256-byte block sums to at
+# most 65280, so per block the modulus never kicks in and the exact byte sum
+# falls out of a single C call.
+_BLOCK = 256
+_SMALL = 64
+_SEQ_LEN = struct.Struct("!II")
+_adler32 = zlib.adler32
+
+def byte_sum(data, start=0, stop=None):
+    if stop is None:
+        stop = len(data)
+    if stop - start <= _SMALL:
+        return sum(data[start:stop])
+    view = memoryview(data)
+    total = 0
+    for offset in range(start, stop, _BLOCK):
+        end = offset + _BLOCK
+        if end > stop:
+            end = stop
+        total += (_adler32(view[offset:end]) & 0xFFFF) - 1
+    return total
+
+def checksum16(data):
+    # Same value as the old per-byte `checksum += byte; checksum &= 0xFFFF` loop
+    return byte_sum(data) & 0xFFFF
+
+def update_checksum16(checksum, old_bytes, new_bytes):
+    # Additive checksums are order independent, so replacing a field only
+    # needs the difference between the old and new bytes
+    return (checksum - byte_sum(old_bytes) + byte_sum(new_bytes)) & 0xFFFF
+
+def header_sum(sequence_number, data_length, packet_type=b'DATA'):
+    return sum(_SEQ_LEN.pack(sequence_number, data_length)) + sum(packet_type)
+
+def packet_checksum(sequence_number, data, packet_type=b'DATA', data_sum=None):
+    # data_sum lets a retransmission or resequenced packet reuse the payload
+    # sum and only pay for the 12 header bytes
+    if data_sum is None:
+        data_sum = byte_sum(data)
+    return (header_sum(sequence_number, len(data), packet_type) + data_sum) & 0xFFFF
+
+def verify_packet(packet):
+    # Checks a make_packet() packet in place: header fields plus payload,
+    # skipping the checksum field itself, against the trailing checksum
+    size = len(packet)
+    if size < HEADER_SIZE + TRAILER_SIZE:
+        return False
+    received = (packet[size - 2] << 8) | packet[size - 1]
+    calculated = byte_sum(packet, 0, CHECKSUM_OFFSET) + byte_sum(packet, HEADER_SIZE, size - TRAILER_SIZE)
+    return received == calculated & 0xFFFF
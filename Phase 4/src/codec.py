@@ -0,0 +1,60 @@
+import struct
+try:
+    from .checksum import HEADER_SIZE, TRAILER_SIZE, byte_sum, header_sum
+except ImportError:
+    from checksum import HEADER_SIZE, TRAILER_SIZE, byte_sum, header_sum
+
+PACKET_SIZE = 1024
+HEADER = struct.Struct("!II4sH")
+TRAILER = struct.Struct("!H")
+MAX_PACKET_BYTES = HEADER_SIZE + PACKET_SIZE + TRAILER_SIZE
+
+# Same wire format as utils.make_packet, but packets are built inside
+# preallocated bytearrays and payloads are handed out as memoryviews, so a
+# 1 KB packet costs one copy (or none when read straight from the file)
+# instead of several intermediate bytes objects.
+
+class BufferPool:
+    def __init__(self, count, buffer_size=MAX_PACKET_BYTES):
+        self.buffer_size = buffer_size
+        self._free = [bytearray(buffer_size) for _ in range(count)]
+        self.allocated = count
+
+    def acquire(self):
+        if self._free:
+            return self._free.pop()
+        # Only reached when more buffers are held than the pool was sized for
+        self.allocated += 1
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer):
+        self._free.append(buffer)
+
+    def available(self):
+        return len(self._free)
+
+def _finish(buffer, sequence_number, length, packet_type, data_sum):
+    checksum = (header_sum(sequence_number, length, packet_type) + data_sum) & 0xFFFF
+    HEADER.pack_into(buffer, 0, sequence_number, length, packet_type, checksum)
+    TRAILER.pack_into(buffer, HEADER_SIZE + length, checksum)
+    return memoryview(buffer)[:HEADER_SIZE + length + TRAILER_SIZE]
+
+def encode_into(buffer, sequence_number, data, packet_type=b'DATA'):
+    length = len(data)
+    buffer[HEADER_SIZE:HEADER_SIZE + length] = data
+    return _finish(buffer, sequence_number, length, packet_type, byte_sum(data))
+
+def encode_from_file(buffer, sequence_number, file, payload_size=PACKET_SIZE):
+    # Reads the payload straight into the packet slot; returns None at EOF
+    view = memoryview(buffer)
+    length = file.readinto(view[HEADER_SIZE:HEADER_SIZE + payload_size])
+    if not length:
+        return None
+    data_sum = byte_sum(view, HEADER_SIZE, HEADER_SIZE + length)
+    return _finish(buffer, sequence_number, length, b'DATA', data_sum)
+
+def decode(packet):
+    # Returns (sequence_number, packet_type, payload) without copying the payload
+    view = memoryview(packet)
+    sequence_number, length, packet_type, _ = HEADER.unpack_from(view, 0)
+    return sequence_number, packet_type.rstrip(b'\x00'), view[HEADER_SIZE:HEADER_SIZE + length]
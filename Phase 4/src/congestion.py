@@ -0,0 +1,191 @@
+import time
+from collections import deque
+
+# Congestion controllers for the sliding-window senders. Windows are counted
+# in packets. The sender asks window() how many packets may be in flight,
+# calls pacing_delay() before each new send, and reports ACKs, duplicate
+# ACKs and timeouts back.
+
+class CongestionControl:
+    name = "fixed"
+
+    def __init__(self, max_window, clock=time.monotonic):
+        self.max_window = max_window
+        self.cwnd = float(max_window)
+        self.clock = clock
+        self.losses = 0
+
+    def window(self):
+        return max(1, min(self.max_window, int(self.cwnd)))
+
+    def on_send(self, now=None):
+        pass
+
+    def pacing_delay(self, now=None):
+        return 0.0
+
+    def on_ack(self, acked, rtt=None, now=None):
+        pass
+
+    def on_duplicate_ack(self):
+        pass
+
+    def on_timeout(self):
+        self.losses += 1
+
+    def stats(self):
+        return {"controller": self.name, "cwnd": round(self.cwnd, 2), "losses": self.losses}
+
+class FixedWindow(CongestionControl):
+    name = "fixed"
+
+class Reno(CongestionControl):
+    # AIMD: slow start doubles the window every RTT up to ssthresh, then
+    # congestion avoidance adds one packet per RTT. Three duplicate ACKs
+    # halve the window; a timeout drops back to one packet.
+    name = "reno"
+    DUP_ACK_THRESHOLD = 3
+
+    def __init__(self, max_window, clock=time.monotonic, initial_window=1):
+        super().__init__(max_window, clock)
+        self.cwnd = float(initial_window)
+        self.ssthresh = float(max_window)
+        self.dup_acks = 0
+
+    def on_ack(self, acked, rtt=None, now=None):
+        self.dup_acks = 0
+        for _ in range(acked):
+            if self.cwnd < self.ssthresh:
+                self.cwnd += 1
+            else:
+                self.cwnd += 1 / self.cwnd
+        self.cwnd = min(self.cwnd, float(self.max_window))
+
+    def on_duplicate_ack(self):
+        self.dup_acks += 1
+        if self.dup_acks == self.DUP_ACK_THRESHOLD:
+            self.losses += 1
+            self.ssthresh = max(self.cwnd / 2, 2.0)
+            self.cwnd = self.ssthresh
+
+    def on_timeout(self):
+        self.losses += 1
+        self.ssthresh = max(self.cwnd / 2, 2.0)
+        self.cwnd = 1.0
+        self.dup_acks = 0
+
+    def stats(self):
+        stats = super().stats()
+        stats["ssthresh"] = round(self.ssthresh, 2)
+        return stats
+
+class BbrLike(CongestionControl):
+    # Rate based: tracks the bottleneck delivery rate (windowed max) and the
+    # minimum RTT, paces sends at gain * rate and caps the window at
+    # 2 * bandwidth-delay product. Loss does not shrink the window.
+    name = "bbr"
+    STARTUP_GAIN = 2.89
+    PROBE_GAINS = (1.25, 0.75, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0)
+    CWND_GAIN = 2.0
+    BW_WINDOW = 10  # rounds kept for the max filter
+    MIN_RTT_WINDOW = 10.0  # seconds
+
+    def __init__(self, max_window, clock=time.monotonic, initial_window=4):
+        super().__init__(max_window, clock)
+        self.cwnd = float(initial_window)
+        self.state = "startup"
+        self.pacing_gain = self.STARTUP_GAIN
+        self.btl_bw = 0.0  # packets per second
+        self.min_rtt = None
+        self.min_rtt_stamp = 0.0
+        self.delivered = 0
+        self.next_send_time = 0.0
+        self._bw_samples = deque(maxlen=self.BW_WINDOW)
+        self._deliveries = deque()
+        self._full_bw = 0.0
+        self._full_bw_rounds = 0
+        self._round_start = None
+        self._cycle_index = 0
+
+    def pacing_rate(self):
+        return self.pacing_gain * self.btl_bw
+
+    def pacing_delay(self, now=None):
+        if now is None:
+            now = self.clock()
+        return max(0.0, self.next_send_time - now)
+
+    def on_send(self, now=None):
+        if now is None:
+            now = self.clock()
+        rate = self.pacing_rate()
+        if rate > 0:
+            self.next_send_time = max(now, self.next_send_time) + 1.0 / rate
+
+    def on_ack(self, acked, rtt=None, now=None):
+        if now is None:
+            now = self.clock()
+        if rtt is not None and (self.min_rtt is None or rtt <= self.min_rtt or now - self.min_rtt_stamp > self.MIN_RTT_WINDOW):
+            self.min_rtt = rtt
+            self.min_rtt_stamp = now
+        self.delivered += acked
+        self._deliveries.append((now, self.delivered))
+        if self.min_rtt is None:
+            return
+
+        # Delivery rate over roughly the last min_rtt
+        while len(self._deliveries) > 2 and now - self._deliveries[1][0] >= self.min_rtt:
+            self._deliveries.popleft()
+        start_time, start_delivered = self._deliveries[0]
+        if now > start_time:
+            self._bw_samples.append((self.delivered - start_delivered) / (now - start_time))
+            self.btl_bw = max(self._bw_samples)
+
+        if self._round_start is None or now - self._round_start >= self.min_rtt:
+            self._round_start = now
+            self._new_round()
+
+        bdp = self.btl_bw * self.min_rtt
+        self.cwnd = min(float(self.max_window), max(4.0, self.CWND_GAIN * bdp))
+
+    def _new_round(self):
+        if self.state == "startup":
+            if self.btl_bw >= self._full_bw * 1.25:
+                self._full_bw = self.btl_bw
+                self._full_bw_rounds = 0
+            else:
+                self._full_bw_rounds += 1
+            if self._full_bw_rounds >= 3:
+                self.state = "drain"
+                self.pacing_gain = 1 / self.STARTUP_GAIN
+        elif self.state == "drain":
+            self.state = "probe_bw"
+            self._cycle_index = 0
+            self.pacing_gain = self.PROBE_GAINS[0]
+        else:
+            self._cycle_index = (self._cycle_index + 1) % len(self.PROBE_GAINS)
+            self.pacing_gain = self.PROBE_GAINS[self._cycle_index]
+
+    def on_timeout(self):
+        self.losses += 1
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({
+            "state": self.state,
+            "btl_bw_pps": round(self.btl_bw, 1),
+            "min_rtt_ms": None if self.min_rtt is None else round(self.min_rtt * 1000, 3),
+        })
+        return stats
+
+CONTROLLERS = {
+    "fixed": FixedWindow,
+    "reno": Reno,
+    "bbr": BbrLike,
+}
+
+def make_controller(name, max_window, clock=time.monotonic):
+    try:
+        return CONTROLLERS[name](max_window, clock)
+    except KeyError:
+        raise ValueError(f"Unknown congestion control '{name}', choose from {', '.join(CONTROLLERS)}")
@@ -0,0 +1,213 @@
+import heapq
+import random
+import select
+import socket
+import threading
+import time
+from collections import deque
+
+# Seeded UDP network emulator. Run it between any sender and receiver in the
+# repo: the sender sends to the proxy's listen port, the proxy forwards to the
+# receiver and relays the replies back. Each direction has its own LinkRule
+# and its own random.Random, seeded from the proxy seed, so the same seed and
+# packet sequence always give the same drops, duplicates and corruptions.
+#
+#     python -m src.emulator --listen 12344 --target 12345 --seed 7 \
+#         --forward delay=0.02,jitter=0.005,rate=2e6,ge_p=0.01,ge_r=0.3 \
+#         --reverse delay=0.02,loss=0.01
+
+RECV_BUFFER = 65535
+
+class GilbertElliott:
+    # Two-state burst loss: p = P(good -> bad), r = P(bad -> good), and a
+    # loss probability in each state
+    def __init__(self, p, r, loss_good=0.0, loss_bad=1.0):
+        self.p = p
+        self.r = r
+        self.loss_good = loss_good
+        self.loss_bad = loss_bad
+        self.bad = False
+
+    def lost(self, rng):
+        if self.bad:
+            if rng.random() < self.r:
+                self.bad = False
+        elif rng.random() < self.p:
+            self.bad = True
+        return rng.random() < (self.loss_bad if self.bad else self.loss_good)
+
+class LinkRule:
+    def __init__(self, delay=0.0, jitter=0.0, rate=0.0, queue=0, loss=0.0,
+                 ge_p=0.0, ge_r=1.0, ge_loss_good=0.0, ge_loss_bad=1.0,
+                 reorder=0.0, reorder_delay=0.01, duplicate=0.0, bit_error=0.0):
+        self.delay = delay  # seconds of one-way propagation delay
+        self.jitter = jitter  # uniform +/- seconds added to delay
+        self.rate = rate  # bytes per second, 0 = unlimited
+        self.queue = queue  # packets waiting for the link, 0 = unlimited
+        self.loss = loss  # independent loss probability
+        self.ge_p = ge_p  # Gilbert-Elliott burst loss, off while ge_p is 0
+        self.ge_r = ge_r
+        self.ge_loss_good = ge_loss_good
+        self.ge_loss_bad = ge_loss_bad
+        self.reorder = reorder  # probability a packet is held back by reorder_delay
+        self.reorder_delay = reorder_delay
+        self.duplicate = duplicate
+        self.bit_error = bit_error  # probability of one flipped bit per packet
+
+    @classmethod
+    def parse(cls, spec):
+        # "delay=0.02,loss=0.1" -> LinkRule(delay=0.02, loss=0.1)
+        kwargs = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, value = item.partition("=")
+            if not hasattr(cls(), name):
+                raise ValueError(f"Unknown link setting '{name}'")
+            kwargs[name] = int(value) if name == "queue" else float(value)
+        return cls(**kwargs)
+
+class Link:
+    # One direction of the path: decides what happens to each packet and
+    # when it comes out the other end
+    def __init__(self, rule, seed):
+        self.rule = rule
+        self.rng = random.Random(seed)
+        self.burst = GilbertElliott(rule.ge_p, rule.ge_r, rule.ge_loss_good, rule.ge_loss_bad) if rule.ge_p > 0 else None
+        self.link_free = 0.0  # when the bottleneck finishes the queued packets
+        self.backlog = deque()  # departure times of packets still queued
+        self.stats = {"packets": 0, "delivered": 0, "lost": 0, "burst_lost": 0, "queue_dropped": 0,
+                      "duplicated": 0, "reordered": 0, "corrupted": 0}
+
+    def transmit(self, packet, now):
+        # Returns [(deliver_at, packet)]; empty when the packet is dropped.
+        # Every random draw happens in a fixed order, so the outcome depends
+        # only on the seed and the packet sequence.
+        rule = self.rule
+        rng = self.rng
+        self.stats["packets"] += 1
+        lost = rng.random() < rule.loss
+        burst_lost = self.burst.lost(rng) if self.burst is not None else False
+        duplicate = rng.random() < rule.duplicate
+        reorder = rng.random() < rule.reorder
+        corrupt = rng.random() < rule.bit_error
+        flip = rng.randrange(len(packet) * 8) if packet else 0
+        jitters = [rng.uniform(-rule.jitter, rule.jitter) for _ in range(2)]
+
+        if lost or burst_lost:
+            self.stats["burst_lost" if burst_lost and not lost else "lost"] += 1
+            return []
+
+        departure = now
+        if rule.rate > 0:
+            while self.backlog and self.backlog[0] <= now:
+                self.backlog.popleft()
+            if rule.queue and len(self.backlog) >= rule.queue:
+                self.stats["queue_dropped"] += 1
+                return []
+            departure = max(now, self.link_free) + len(packet) / rule.rate
+            self.link_free = departure
+            self.backlog.append(departure)
+
+        if corrupt and packet:
+            data = bytearray(packet)
+            data[flip // 8] ^= 1 << (flip % 8)
+            packet = bytes(data)
+            self.stats["corrupted"] += 1
+
+        deliver_at = departure + max(0.0, rule.delay + jitters[0])
+        if reorder:
+            deliver_at += rule.reorder_delay
+            self.stats["reordered"] += 1
+        deliveries = [(deliver_at, packet)]
+        if duplicate:
+            deliveries.append((departure + max(0.0, rule.delay + jitters[1]), packet))
+            self.stats["duplicated"] += 1
+        self.stats["delivered"] += len(deliveries)
+        return deliveries
+
+class UdpProxy:
+    # Forwards client -> target through the forward link and target -> client
+    # through the reverse link. The client is whoever sent the last datagram
+    # to the listen port.
+    def __init__(self, listen_addr, target_addr, forward=None, reverse=None, seed=0):
+        self.target_addr = target_addr
+        self.forward = Link(forward or LinkRule(), seed * 2 + 1)
+        self.reverse = Link(reverse or LinkRule(), seed * 2 + 2)
+        self.client_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.client_sock.bind(listen_addr)
+        self.target_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.target_sock.bind((listen_addr[0], 0))
+        self.client_addr = None
+        self.pending = []  # heap of (deliver_at, order, socket, packet, address)
+        self.order = 0
+        self.running = False
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.client_sock.getsockname()[1]
+
+    def schedule(self, deliveries, sock, address):
+        for deliver_at, packet in deliveries:
+            heapq.heappush(self.pending, (deliver_at, self.order, sock, packet, address))
+            self.order += 1
+
+    def run(self):
+        sockets = [self.client_sock, self.target_sock]
+        while self.running:
+            now = time.monotonic()
+            while self.pending and self.pending[0][0] <= now:
+                _, _, sock, packet, address = heapq.heappop(self.pending)
+                if address is not None:
+                    try:
+                        sock.sendto(packet, address)
+                    except OSError:
+                        pass
+            wait = 0.05 if not self.pending else max(0.0, self.pending[0][0] - now)
+            readable, _, _ = select.select(sockets, [], [], min(wait, 0.05))
+            now = time.monotonic()
+            for sock in readable:
+                try:
+                    packet, address = sock.recvfrom(RECV_BUFFER)
+                except OSError:
+                    continue
+                if sock is self.client_sock:
+                    self.client_addr = address
+                    self.schedule(self.forward.transmit(packet, now), self.target_sock, self.target_addr)
+                else:
+                    self.schedule(self.reverse.transmit(packet, now), self.client_sock, self.client_addr)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        self.client_sock.close()
+        self.target_sock.close()
+
+    def stats(self):
+        return {"forward": dict(self.forward.stats), "reverse": dict(self.reverse.stats)}
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Seeded UDP network emulator proxy")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--listen", type=int, default=12344, help="Port the sender sends to")
+    parser.add_argument("--target", type=int, default=12345, help="Receiver port")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--forward", default="", help="Sender -> receiver rule, e.g. delay=0.02,loss=0.05")
+    parser.add_argument("--reverse", default="", help="Receiver -> sender rule")
+    args = parser.parse_args()
+
+    proxy = UdpProxy((args.host, args.listen), (args.host, args.target),
+                     LinkRule.parse(args.forward), LinkRule.parse(args.reverse), args.seed)
+    print(f"Emulating {args.host}:{args.listen} -> {args.host}:{args.target} (seed {args.seed})")
+    proxy.running = True
+    try:
+        proxy.run()
+    except KeyboardInterrupt:
+        print(proxy.stats())
@@ -0,0 +1,132 @@
+import struct
+try:
+    from .utils import make_packet
+except ImportError:
+    from utils import make_packet
+
+# XOR forward error correction for the Go-Back-N pipeline. After every group
+# of k data packets the sender emits one FEC packet whose sequence field is
+# the group's first sequence number and whose payload is
+#     !HH (packet count, XOR of payload lengths) + XOR of the zero-padded payloads
+# A receiver holding all but one packet of a group rebuilds the missing one
+# without waiting for a retransmission. Groups carry their own start and
+# count, so k can change from group to group (adaptive redundancy).
+
+FEC_SIGNAL = b'FEC'
+PARITY_HEADER = "!HH"
+PARITY_HEADER_SIZE = struct.calcsize(PARITY_HEADER)
+MIN_GROUP = 2
+MAX_GROUP = 32
+LOSS_WINDOW = 256  # packets of history behind the adaptive loss estimate
+
+def group_size_for_loss(loss_rate):
+    # Aim for about half a lost packet per group: a group survives one loss,
+    # so k + 1 packets should see well under two on average
+    if loss_rate <= 0:
+        return MAX_GROUP
+    return max(MIN_GROUP, min(MAX_GROUP, int(0.5 / loss_rate) - 1))
+
+class FecEncoder:
+    def __init__(self, k, width, adaptive=False):
+        self.k = max(MIN_GROUP, min(MAX_GROUP, k))
+        self.width = width
+        self.adaptive = adaptive
+        self.group_start = None
+        self.count = 0
+        self.length_xor = 0
+        self.acc = 0
+        self.parity_packets = 0
+        self.delivered = 0
+        self.lost = 0
+
+    def add(self, seq, data):
+        # Returns the group's parity packet once it is complete, else None
+        if self.group_start is None:
+            self.group_start = seq
+        self.count += 1
+        self.length_xor ^= len(data)
+        self.acc ^= int.from_bytes(bytes(data).ljust(self.width, b'\x00'), 'big')
+        if self.count >= self.k:
+            return self.flush()
+        return None
+
+    def flush(self):
+        # Parity for a partial group (e.g. at the end of the file), or None
+        if self.group_start is None:
+            return None
+        payload = struct.pack(PARITY_HEADER, self.count, self.length_xor) + self.acc.to_bytes(self.width, 'big')
+        packet = make_packet(self.group_start, payload, packet_type=FEC_SIGNAL)
+        self.group_start = None
+        self.count = 0
+        self.length_xor = 0
+        self.acc = 0
+        self.parity_packets += 1
+        if self.adaptive:
+            self.k = group_size_for_loss(self.loss_rate())
+        return packet
+
+    def on_delivery(self, delivered, lost):
+        # Sender feedback: packets cumulatively ACKed, packets found missing
+        self.delivered += delivered
+        self.lost += lost
+        if self.delivered + self.lost >= LOSS_WINDOW:
+            self.delivered /= 2
+            self.lost /= 2
+
+    def loss_rate(self):
+        total = self.delivered + self.lost
+        return self.lost / total if total else 0.0
+
+class FecDecoder:
+    def __init__(self):
+        self.packets = {}  # seq -> payload, kept until no group can need it
+        self.groups = {}  # first seq -> (count, length xor, parity int, width)
+        self.recovered = 0
+
+    def add_data(self, seq, data):
+        # Returns [(seq, data)] rebuilt with the help of this packet
+        if seq in self.packets:
+            return []
+        self.packets[seq] = bytes(data)
+        for start, (count, _, _, _) in list(self.groups.items()):
+            if start <= seq < start + count:
+                return self._recover(start)
+        return []
+
+    def add_parity(self, start, payload):
+        if start in self.groups or len(payload) < PARITY_HEADER_SIZE:
+            return []
+        count, length_xor = struct.unpack_from(PARITY_HEADER, payload)
+        parity = bytes(payload[PARITY_HEADER_SIZE:])
+        self.groups[start] = (count, length_xor, int.from_bytes(parity, 'big'), len(parity))
+        return self._recover(start)
+
+    def _recover(self, start):
+        count, length_xor, acc, width = self.groups[start]
+        missing = [seq for seq in range(start, start + count) if seq not in self.packets]
+        if len(missing) != 1:
+            if not missing:
+                del self.groups[start]
+            return []
+        for seq in range(start, start + count):
+            if seq != missing[0]:
+                data = self.packets[seq]
+                acc ^= int.from_bytes(data.ljust(width, b'\x00'), 'big')
+                length_xor ^= len(data)
+        if length_xor > width:
+            return []
+        data = acc.to_bytes(width, 'big')[:length_xor]
+        del self.groups[start]
+        self.packets[missing[0]] = data
+        self.recovered += 1
+        return [(missing[0], data)]
+
+    def discard_below(self, seq):
+        # Everything before seq is delivered; keep one maximal group of
+        # history for parity that is still on its way
+        floor = seq - MAX_GROUP
+        for start, (count, _, _, _) in list(self.groups.items()):
+            if start + count <= seq:
+                del self.groups[start]
+        for old in [s for s in self.packets if s < floor]:
+            del self.packets[old]
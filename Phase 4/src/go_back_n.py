@@ -2,27 +2,74 @@ import socket
 import struct
 import time
 import random
+try:
+    from .checksum import checksum16, packet_checksum, verify_packet, HEADER_SIZE
+    from .rto import RtoEstimator, MAX_RTO
+    from .congestion import make_controller
+    from .reassembly import StreamingReassembler
+    from .offload import SegmentBatcher, GroSocket
+    from .ack_policy import AckPolicy
+    from .utils import make_ack, extract_sack_blocks, MAX_SACK_BLOCKS
+    from .fec import FecEncoder, FecDecoder, FEC_SIGNAL
+    from . import tracing
+except ImportError:
+    from checksum import checksum16, packet_checksum, verify_packet, HEADER_SIZE
+    from rto import RtoEstimator, MAX_RTO
+    from congestion import make_controller
+    from reassembly import StreamingReassembler
+    from offload import SegmentBatcher, GroSocket
+    from ack_policy import AckPolicy
+    from utils import make_ack, extract_sack_blocks, MAX_SACK_BLOCKS
+    from fec import FecEncoder, FecDecoder, FEC_SIGNAL
+    import tracing
 
 PACKET_SIZE = 1024
 TIMEOUT = 0.05
 MAX_WINDOW_SIZE = 50
 ACK_SIGNAL = b'ACK'
+END_SIGNAL = b'END'
+START_SIGNAL = b'SYN'
 DATA_LOSS_RATE = 0.2
 ACK_LOSS_RATE = 0.2
 BIT_ERROR_RATE = 0.1
+ADAPTIVE_TIMEOUT = True
+CONGESTION_CONTROL = 'fixed'
+MIN_WAIT = 0.0001
+END_RETRIES = 100
+# After END the receiver keeps answering repeated ENDs until the sender has
+# been quiet this long, in case its ACK was lost
+END_LINGER = 0.5
+# The sender gives up after this many timeouts in a row without the window moving
+MAX_TIMEOUTS = 30
+# Several of the longest backoffs, so a slow sender is not mistaken for a gone one
+RECEIVER_IDLE_TIMEOUT = 5 * MAX_RTO
+# Linux UDP GSO/GRO: batch window sends into one syscall, falls back per packet
+SEGMENT_OFFLOAD = False
+# Receiver ACK thinning: ACK every ACK_EVERY in-order packets or after ACK_DELAY
+ACK_EVERY = 1
+ACK_DELAY = 0.005
+# Selective ACKs: the receiver keeps out-of-order packets and reports them in
+# SACK blocks; the sender retransmits only the holes on a timeout
+SACK = False
+# XOR parity after every FEC_GROUP data packets (0 = off); FEC_ADAPTIVE
+# resizes the groups from the observed loss rate
+FEC_GROUP = 0
+FEC_ADAPTIVE = False
+# tracing.Tracer recording per-packet events instead of printing them; None disables tracing
+TRACER = None
+
+# Returned by rdt_rcv in place of data once the sender's END packet arrives
+TRANSFER_COMPLETE = object()
+
+# Filled in by run_go_back_n_sender / run_go_back_n_receiver after every transfer
+last_sender_stats = {}
+last_receiver_stats = {}
 
 def calculate_checksum(data):
-    checksum = 0
-    for byte in data:
-        checksum += byte
-        checksum &= 0xFFFF
-    return checksum
+    return checksum16(data)
 
 def verify_checksum(packet):
-    received_checksum = struct.unpack("!H", packet[-2:])[0]
-    data = packet[:-2]
-    calculated_checksum = calculate_checksum(data)
-    return calculated_checksum == received_checksum
+    return verify_packet(packet)
 
 def make_packet(sequence_number, data, packet_type=b'DATA'):
     header_format = "!II4sH"
@@ -31,8 +78,7 @@ def make_packet(sequence_number, data, packet_type=b'DATA'):
     if not isinstance(data, bytes):
         data = data.encode()
 
-    checksum_data = packet_type + struct.pack("!II", sequence_number, len(data)) + data
-    checksum = calculate_checksum(checksum_data)
+    checksum = packet_checksum(sequence_number, data, packet_type)
     header = struct.pack(header_format, sequence_number, len(data), packet_type, checksum)
     return header + data + struct.pack("!H", checksum)
 
@@ -41,10 +87,11 @@ def extract_sequence_number(packet):
 
 def extract_data(packet):
     data_length = struct.unpack("!I", packet[4:8])[0]
-    return packet[12:12 + data_length]
+    return packet[HEADER_SIZE:HEADER_SIZE + data_length]
 
 def extract_packet_type(packet):
-    return packet[8:12]
+    # The type field is 4 bytes wide, so b'ACK' comes back NUL padded
+    return packet[8:12].rstrip(b'\x00')
 
 def introduce_bit_error(packet, error_probability):
     if random.random() < error_probability:
@@ -65,7 +112,7 @@ class Timer:
 
     def start(self, duration):
         self.duration = duration
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.running = True
 
     def stop(self):
@@ -75,30 +122,50 @@ class Timer:
     def is_expired(self):
         if not self.running:
             return False
-        return time.time() - self.start_time > self.duration
+        return time.monotonic() - self.start_time > self.duration
 
     def restart(self):
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.running = True
 
-def rdt_send(sock, address, data, base, nextsegnum, N, sndpkt, timer):
-    if nextsegnum < base + N:
-        print(f"rdt_send: Sending packet {nextsegnum}, base={base}, nextsegnum={nextsegnum}, N={N}")
+    def remaining(self):
+        if not self.running:
+            return None
+        return max(0.0, self.duration - (time.monotonic() - self.start_time))
+
+def current_timeout(rto):
+    return rto.timeout if rto is not None else TIMEOUT
+
+def rdt_send(sock, address, data, base, nextsegnum, N, sndpkt, timer, rto=None, cc=None):
+    window = N if cc is None else min(N, cc.window())
+    if nextsegnum < base + window:
+        if cc is not None:
+            delay = cc.pacing_delay()
+            if delay > 0:
+                time.sleep(delay)
+            cc.on_send()
         packet = make_packet(nextsegnum, data)
         sndpkt[nextsegnum % N] = packet
         if not simulate_loss(DATA_LOSS_RATE):
             sock.sendto(packet, address)
-        else:
-            print(f"rdt_send: Simulating loss of packet {nextsegnum}")
+            if TRACER is not None:
+                TRACER.record(tracing.SEND, nextsegnum, base, nextsegnum, window)
+        elif TRACER is not None:
+            TRACER.record(tracing.SEND_LOST, nextsegnum, base, nextsegnum, window)
 
+        if rto is not None:
+            rto.on_send(nextsegnum)
         if base == nextsegnum:
-            timer.start(TIMEOUT)
+            timer.start(current_timeout(rto))
         return nextsegnum + 1
     else:
-        print("rdt_send: Refuse data, window is full")
+        if TRACER is not None:
+            TRACER.record(tracing.WINDOW_FULL, nextsegnum, base, nextsegnum, window)
         return nextsegnum
 
-def rdt_rcv(sock, N, expectedsegnum):
+def rdt_rcv(sock, N, expectedsegnum, ack_policy=None, stream=None, fec=None):
+    # With a StreamingReassembler (SACK/FEC mode) packets are stored here, the
+    # returned data is always None and expectedsegnum may jump ahead
     try:
         packet, address = sock.recvfrom(4096)
         if not packet:
@@ -111,9 +178,11 @@ def rdt_rcv(sock, N, expectedsegnum):
         packet = introduce_bit_error(packet, BIT_ERROR_RATE)
 
     if not verify_checksum(packet):
-        print("rdt_rcv: Checksum error, discarding packet")
-        ack_packet = make_packet(expectedsegnum, b'', packet_type=ACK_SIGNAL)
-        sock.sendto(ack_packet, address)
+        if TRACER is not None:
+            TRACER.record(tracing.CHECKSUM_ERROR, -1, expectedsegnum, expectedsegnum, N)
+        if ack_policy is not None:
+            ack_policy.on_gap()
+        send_last_ack(sock, address, expectedsegnum, ack_policy, stream)
         return None, address, expectedsegnum
 
     seq_num = extract_sequence_number(packet)
@@ -122,86 +191,325 @@ def rdt_rcv(sock, N, expectedsegnum):
     if packet_type == ACK_SIGNAL:
         return seq_num, address, expectedsegnum
 
+    if packet_type == END_SIGNAL:
+        if seq_num != expectedsegnum:
+            return None, address, expectedsegnum
+        sock.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address)
+        return TRANSFER_COMPLETE, address, expectedsegnum
+
+    if packet_type == FEC_SIGNAL and fec is None:
+        return None, address, expectedsegnum
+
+    if stream is not None:
+        if packet_type == FEC_SIGNAL:
+            arrived = fec.add_parity(seq_num, extract_data(packet))
+            if not arrived:
+                return None, address, expectedsegnum
+            if TRACER is not None:
+                TRACER.record(tracing.FEC_REBUILT, arrived[0][0], expectedsegnum, stream.next_seq, N)
+        else:
+            arrived = [(seq_num, extract_data(packet))]
+            if fec is not None:
+                arrived += fec.add_data(seq_num, arrived[0][1])
+        for seq, data in arrived:
+            if expectedsegnum <= seq < expectedsegnum + MAX_WINDOW_SIZE:
+                stream.add(seq, data)
+        if fec is not None:
+            fec.discard_below(stream.next_seq)
+        in_order = stream.next_seq == expectedsegnum + 1
+        if not in_order and TRACER is not None:
+            TRACER.record(tracing.HELD, seq_num, expectedsegnum, stream.next_seq, N)
+        if in_order:
+            if ack_policy is None or ack_policy.on_data():
+                send_ack(sock, address, expectedsegnum, ack_policy, stream)
+        else:
+            # Gaps and hole fills are ACKed at once
+            if ack_policy is not None:
+                ack_policy.on_gap()
+            send_last_ack(sock, address, stream.next_seq, ack_policy, stream)
+        return None, address, stream.next_seq
+
     if seq_num == expectedsegnum:
-        print(f"rdt_rcv: Received expected packet {seq_num}")
+        if TRACER is not None:
+            TRACER.record(tracing.RECEIVED, seq_num, expectedsegnum, expectedsegnum + 1, N)
         data = extract_data(packet)
-        ack_packet = make_packet(expectedsegnum, b'', packet_type=ACK_SIGNAL)
-        if not simulate_loss(ACK_LOSS_RATE):
-            sock.sendto(ack_packet, address)
-        else:
-            print(f"rdt_rcv: Simulating loss of ACK for packet {expectedsegnum}")
+        if ack_policy is None or ack_policy.on_data():
+            send_ack(sock, address, expectedsegnum, ack_policy)
         return data, address, expectedsegnum + 1
     else:
-        print(f"rdt_rcv: Out-of-order packet {seq_num}, expected {expectedsegnum}")
-        ack_packet = make_packet(expectedsegnum, b'', packet_type=ACK_SIGNAL)
-        sock.sendto(ack_packet, address)
+        if TRACER is not None:
+            TRACER.record(tracing.OUT_OF_ORDER, seq_num, expectedsegnum, expectedsegnum, N)
+        if ack_policy is not None:
+            ack_policy.on_gap()
+        send_last_ack(sock, address, expectedsegnum, ack_policy)
         return None, address, expectedsegnum
 
-def run_go_back_n_sender(host, port, file_path, N):
+def send_ack(sock, address, seq, ack_policy=None, stream=None):
+    if ack_policy is not None:
+        ack_policy.sent()
+    sack_blocks = stream.held_ranges(MAX_SACK_BLOCKS) if SACK and stream is not None else ()
+    if not simulate_loss(ACK_LOSS_RATE):
+        sock.sendto(make_ack(seq, sack_blocks), address)
+        if TRACER is not None:
+            TRACER.record(tracing.ACK_SENT, seq, seq + 1, seq + 1, len(sack_blocks))
+    elif TRACER is not None:
+        TRACER.record(tracing.ACK_LOST, seq, seq + 1, seq + 1, len(sack_blocks))
+
+def send_last_ack(sock, address, expectedsegnum, ack_policy=None, stream=None):
+    # ACKs are cumulative: re-acknowledge the last in-order packet. Nothing
+    # has been received in order before packet 0, so there is nothing to ACK.
+    if expectedsegnum > 0:
+        if ack_policy is not None:
+            ack_policy.sent()
+        sack_blocks = stream.held_ranges(MAX_SACK_BLOCKS) if SACK and stream is not None else ()
+        sock.sendto(make_ack(expectedsegnum - 1, sack_blocks), address)
+        if TRACER is not None:
+            TRACER.record(tracing.ACK_SENT, expectedsegnum - 1, expectedsegnum, expectedsegnum, len(sack_blocks))
+
+def rdt_rcv_ack(sock):
+    # Sender side: returns the cumulative ACK number, or None
+    return rdt_rcv_sack(sock)[0]
+
+def rdt_rcv_sack(sock):
+    # Sender side: returns (cumulative ACK number, SACK blocks), or (None, [])
+    try:
+        packet, _ = sock.recvfrom(4096)
+    except socket.timeout:
+        return None, []
+    packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+    if not verify_checksum(packet) or extract_packet_type(packet) != ACK_SIGNAL:
+        return None, []
+    return extract_sequence_number(packet), extract_sack_blocks(packet)
+
+def send_end(sock, address, seq):
+    end_packet = make_packet(seq, b'', packet_type=END_SIGNAL)
+    sock.settimeout(TIMEOUT)
+    for _ in range(END_RETRIES):
+        sock.sendto(end_packet, address)
+        ack_num = rdt_rcv_ack(sock)
+        while ack_num is not None and ack_num != seq:
+            ack_num = rdt_rcv_ack(sock)
+        if ack_num == seq:
+            return True
+    return False
+
+def linger(sock, expectedsegnum):
+    # Re-ACKs the ENDs of a sender that missed our ACK; anything else is
+    # answered as usual (a stale data packet gets the last ACK)
+    sock.settimeout(END_LINGER)
+    while True:
+        data, address, _ = rdt_rcv(sock, 1, expectedsegnum)
+        if address is None:
+            return
+
+def send_parity(sock, address, parity):
+    # Parity is never retransmitted; a lost one only costs the recovery chance
+    if parity is not None and not simulate_loss(DATA_LOSS_RATE):
+        sock.sendto(parity, address)
+
+def rdt_rcv_start(sock):
+    # Sender side: returns the session ID of a start reply, or None
+    try:
+        packet, _ = sock.recvfrom(4096)
+    except socket.timeout:
+        return None
+    packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+    if not verify_checksum(packet) or extract_packet_type(packet) != START_SIGNAL:
+        return None
+    return extract_sequence_number(packet)
+
+def send_start(sock, address, session_id):
+    # Opens a session on the multi-session receiver. It answers with a SYN
+    # carrying the session ID, not an ACK, so a late duplicate reply cannot
+    # pass for a cumulative ACK once data is flowing.
+    start_packet = make_packet(0, struct.pack("!I", session_id), packet_type=START_SIGNAL)
+    sock.settimeout(TIMEOUT)
+    for _ in range(END_RETRIES):
+        sock.sendto(start_packet, address)
+        if rdt_rcv_start(sock) == session_id:
+            return True
+    return False
+
+def run_go_back_n_sender(host, port, file_path, N, session_id=None):
+    global last_sender_stats
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # With offload enabled data packets are queued and flushed as GSO batches
+    out = SegmentBatcher(sock) if SEGMENT_OFFLOAD else sock
     address = (host, port)
     timer = Timer()
+    rto = RtoEstimator(TIMEOUT, clock=time.monotonic) if ADAPTIVE_TIMEOUT else None
+    cc = make_controller(CONGESTION_CONTROL, N, time.monotonic)
     base = 0
     nextsegnum = 0
     sndpkt = [b''] * N
     file_size = 0
+    eof = False
+    retransmissions = 0
+    ack_events = 0
+    in_flight_total = 0
+    peak_in_flight = 0
+    sacked = set()  # packets in [base, nextsegnum) the receiver reported holding
+    sack_skipped = 0
+    fec = FecEncoder(FEC_GROUP, PACKET_SIZE, FEC_ADAPTIVE) if FEC_GROUP else None
+    stalled = 0  # timeouts since the window last moved
+    completed = False
 
     try:
+        if session_id is not None and not send_start(sock, address, session_id):
+            raise ConnectionError(f"no answer to the start of session {session_id}")
         with open(file_path, 'rb') as file:
             while True:
-                data = file.read(PACKET_SIZE)
-                if not data:
-                    break
-                file_size += len(data)
-                nextsegnum = rdt_send(sock, address, data, base, nextsegnum, N, sndpkt, timer)
-
-                while base < nextsegnum:
-                    if timer.is_expired():
-                        print("Sender: Timeout, retransmitting packets")
-                        timer.restart()
-                        for i in range(base, nextsegnum):
-                            if not simulate_loss(DATA_LOSS_RATE):
-                                sock.sendto(sndpkt[i % N], address)
-                            else:
-                                print(f"run_go_back_n_sender: Simulating loss of packet {i}")
-                    ack_num, _, _ = rdt_rcv(sock, N, base)
-                    if ack_num is not None:
-                        print(f"Sender: Received ACK {ack_num}")
-                        base = ack_num + 1
-                        if base == nextsegnum:
-                            timer.stop()
-                        else:
-                            timer.restart()
-
-                if base >= nextsegnum:
+                # Refill the window: new data goes out as soon as ACKs make room
+                while not eof and nextsegnum < base + min(N, cc.window()):
+                    data = file.read(PACKET_SIZE)
+                    if not data:
+                        eof = True
+                        if fec is not None:
+                            send_parity(out, address, fec.flush())
+                        break
+                    file_size += len(data)
+                    nextsegnum = rdt_send(out, address, data, base, nextsegnum, N, sndpkt, timer, rto, cc)
+                    if fec is not None:
+                        send_parity(out, address, fec.add(nextsegnum - 1, data))
+                if out is not sock:
+                    out.flush()
+                peak_in_flight = max(peak_in_flight, nextsegnum - base)
+
+                if eof and base == nextsegnum:
                     break
 
+                if timer.is_expired():
+                    stalled += 1
+                    if stalled > MAX_TIMEOUTS:
+                        raise TimeoutError(f"no progress past packet {base} after {MAX_TIMEOUTS} timeouts")
+                    holes = [i for i in range(base, nextsegnum) if i not in sacked]
+                    if TRACER is not None:
+                        TRACER.record(tracing.TIMEOUT, base, base, nextsegnum, len(holes))
+                    if rto is not None:
+                        rto.on_timeout()
+                        rto.on_retransmit(base, nextsegnum)
+                    cc.on_timeout()
+                    if fec is not None:
+                        fec.on_delivery(0, len(holes))
+                    timer.start(current_timeout(rto))
+                    sack_skipped += nextsegnum - base - len(holes)
+                    for i in holes:
+                        retransmissions += 1
+                        if not simulate_loss(DATA_LOSS_RATE):
+                            out.sendto(sndpkt[i % N], address)
+                        if TRACER is not None:
+                            TRACER.record(tracing.RETRANSMIT, i, base, nextsegnum, N)
+                    if out is not sock:
+                        out.flush()
+
+                # Block for an ACK, but no longer than the retransmission deadline
+                remaining = timer.remaining()
+                sock.settimeout(current_timeout(rto) if remaining is None else max(remaining, MIN_WAIT))
+                ack_num, sack_blocks = rdt_rcv_sack(sock)
+                if ack_num is None:
+                    continue
+                if TRACER is not None:
+                    TRACER.record(tracing.ACK_RECEIVED, ack_num, base, nextsegnum, len(sack_blocks))
+                for start, end in sack_blocks:
+                    sacked.update(range(max(start, base), min(end, nextsegnum)))
+                if base <= ack_num < nextsegnum:
+                    ack_events += 1
+                    in_flight_total += nextsegnum - base
+                    rtt = rto.on_ack(ack_num) if rto is not None else None
+                    cc.on_ack(ack_num + 1 - base, rtt)
+                    if fec is not None:
+                        fec.on_delivery(ack_num + 1 - base, 0)
+                    base = ack_num + 1
+                    stalled = 0
+                    if sacked:
+                        sacked = {seq for seq in sacked if seq >= base}
+                    if base == nextsegnum:
+                        timer.stop()
+                    else:
+                        timer.start(current_timeout(rto))
+                elif ack_num == base - 1:
+                    cc.on_duplicate_ack()
+
+            completed = send_end(sock, address, nextsegnum)
+            if not completed:
+                print("Sender: END was never acknowledged")
+
     except Exception as e:
         print(f"Sender: An error occurred: {e}")
     finally:
         sock.close()
-    return file_size
+
+    last_sender_stats = {
+        "completed": completed,
+        "file_size": file_size,
+        "packets": nextsegnum,
+        "retransmissions": retransmissions,
+        "window": N,
+        "avg_in_flight": in_flight_total / ack_events if ack_events else 0.0,
+        "peak_in_flight": peak_in_flight,
+        "congestion_control": cc.stats(),
+        "segment_offload": out is not sock and out.enabled,
+        "send_syscalls": out.syscalls if out is not sock else None,
+        "sack_skipped": sack_skipped,
+        "parity_packets": fec.parity_packets if fec is not None else 0,
+        "fec_group": fec.k if fec is not None else 0,
+    }
+    print(f"Sender: {nextsegnum} packets, {retransmissions} retransmissions, "
+          f"in flight avg {last_sender_stats['avg_in_flight']:.1f} / peak {peak_in_flight} of window {N}")
+    print(f"Sender: Congestion control stats {cc.stats()}")
+    # None tells the caller the receiver never confirmed the whole file
+    return file_size if completed else None
 
 def run_go_back_n_receiver(host, port, output_file):
+    global last_receiver_stats
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.bind((host, port))
+    if SEGMENT_OFFLOAD:
+        sock = GroSocket(sock)
     expectedsegnum = 0
-    received_data = b''
+    stream = None
+    ack_policy = AckPolicy(ACK_EVERY, ACK_DELAY, time.monotonic)
+    fec = FecDecoder() if FEC_GROUP else None
+    sender_address = None
+    last_packet = None
 
     try:
         with open(output_file, 'wb') as file:
+            stream = StreamingReassembler(file)
+            # SACK and FEC both need out-of-order packets kept
+            held_stream = stream if SACK or FEC_GROUP else None
             while True:
-                data, _, expectedsegnum = rdt_rcv(sock, 1, expectedsegnum)
-                if data:
-                    received_data += data
-                    file.write(data)
-                    if len(received_data) % (1024 * 100) == 0:
-                        print(f"Received {len(received_data)} bytes")
-                elif data is None:
+                if last_packet is not None:
+                    # Wake up for whichever comes first: the delayed ACK or the idle timeout
+                    wait = RECEIVER_IDLE_TIMEOUT - (time.monotonic() - last_packet)
+                    ack_wait = ack_policy.next_timeout()
+                    if ack_wait is not None:
+                        wait = min(wait, ack_wait)
+                    sock.settimeout(max(wait, MIN_WAIT))
+                data, address, expectedsegnum = rdt_rcv(sock, 1, expectedsegnum, ack_policy, held_stream, fec)
+                if data is TRANSFER_COMPLETE:
+                    linger(sock, expectedsegnum)
                     break
+                if ack_policy.due():
+                    send_ack(sock, sender_address or address, expectedsegnum - 1, ack_policy, held_stream)
+                if address is None:
+                    if last_packet is None or time.monotonic() - last_packet < RECEIVER_IDLE_TIMEOUT:
+                        continue
+                    print("Receiver: Sender went quiet, stopping")
+                    break
+                sender_address = address
+                last_packet = time.monotonic()
+                if data:
+                    stream.add(expectedsegnum - 1, data)
+                    if stream.delivered_bytes % (1024 * 100) == 0:
+                        print(f"Received {stream.delivered_bytes} bytes")
+            stream.close()
 
     except Exception as e:
         print(f"Receiver: An error occurred: {e}")
     finally:
         sock.close()
-    return len(received_data)
\ No newline at end of file
+    last_receiver_stats = ack_policy.stats()
+    last_receiver_stats["fec_recovered"] = fec.recovered if fec is not None else 0
+    print(f"Receiver: {ack_policy.acks_sent} ACKs for {ack_policy.packets} packets, {ack_policy.acks_saved()} saved")
+    return stream.delivered_bytes if stream is not None else 0
@@ -0,0 +1,132 @@
+import socket
+import struct
+import sys
+from collections import deque
+
+# Linux UDP segmentation offload. With UDP_SEGMENT (GSO) one sendmsg carries a
+# run of equal-sized packets that the kernel splits into separate datagrams;
+# with UDP_GRO the kernel hands back several received datagrams in one buffer
+# together with the segment size. The constants come from <linux/udp.h>
+# because the socket module does not export them.
+SOL_UDP = getattr(socket, "SOL_UDP", 17)
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+UDP_GRO = getattr(socket, "UDP_GRO", 104)
+
+MAX_SEGMENTS = 64  # kernel limit per GSO send (UDP_MAX_SEGMENTS)
+MAX_UDP_PAYLOAD = 65507
+GRO_BUFFER_SIZE = 65535
+
+def gso_supported(sock):
+    # Probe by setting the socket-wide default segment size to 0 (disabled)
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        sock.setsockopt(SOL_UDP, UDP_SEGMENT, 0)
+    except OSError:
+        return False
+    return True
+
+def enable_gro(sock):
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        sock.setsockopt(SOL_UDP, UDP_GRO, 1)
+    except OSError:
+        return False
+    return True
+
+class SegmentBatcher:
+    # Stands in for the socket in rdt_send: sendto queues the packet and
+    # flush() sends the queue as GSO batches. Packets of the same size share
+    # a batch; a shorter packet may close a batch (the kernel allows a short
+    # last segment). Without kernel support every packet is sent on its own.
+    def __init__(self, sock, use_gso=True):
+        self.sock = sock
+        self.enabled = use_gso and gso_supported(sock)
+        self.queue = []
+        self.address = None
+        self.syscalls = 0
+        self.packets = 0
+
+    def sendto(self, packet, address):
+        if self.address is not None and address != self.address:
+            self.flush()
+        self.address = address
+        self.queue.append(packet)
+
+    def flush(self):
+        queue, self.queue = self.queue, []
+        if not queue:
+            return
+        self.packets += len(queue)
+        if not self.enabled:
+            for packet in queue:
+                self.sock.sendto(packet, self.address)
+                self.syscalls += 1
+            return
+
+        start = 0
+        while start < len(queue):
+            segment_size = len(queue[start])
+            limit = min(MAX_SEGMENTS, max(1, MAX_UDP_PAYLOAD // segment_size))
+            end = start + 1
+            while end < len(queue) and end - start < limit and len(queue[end]) == segment_size:
+                end += 1
+            if end < len(queue) and end - start < limit and len(queue[end]) < segment_size:
+                end += 1
+            self._send_batch(queue[start:end], segment_size)
+            start = end
+
+    def _send_batch(self, packets, segment_size):
+        if len(packets) == 1:
+            self.sock.sendto(packets[0], self.address)
+            self.syscalls += 1
+            return
+        try:
+            self.sock.sendmsg(packets, [(SOL_UDP, UDP_SEGMENT, struct.pack("=H", segment_size))], 0, self.address)
+            self.syscalls += 1
+        except OSError:
+            # e.g. EIO when the route's device cannot segment: stay on the slow path
+            self.enabled = False
+            for packet in packets:
+                self.sock.sendto(packet, self.address)
+                self.syscalls += 1
+
+class GroSocket:
+    # Wraps a bound receiver socket so that recvfrom keeps returning one
+    # datagram at a time while the kernel delivers coalesced GRO buffers.
+    def __init__(self, sock):
+        self.sock = sock
+        self.enabled = enable_gro(sock)
+        self.pending = deque()
+        self.syscalls = 0
+
+    def recvfrom(self, bufsize):
+        if self.pending:
+            return self.pending.popleft()
+        if not self.enabled:
+            self.syscalls += 1
+            return self.sock.recvfrom(bufsize)
+        data, ancdata, _, address = self.sock.recvmsg(GRO_BUFFER_SIZE, socket.CMSG_SPACE(4))
+        self.syscalls += 1
+        segment_size = len(data)
+        for level, kind, value in ancdata:
+            if level == SOL_UDP and kind == UDP_GRO:
+                segment_size = struct.unpack("=i", value[:4])[0]
+        if segment_size <= 0 or segment_size >= len(data):
+            return data, address
+        for offset in range(segment_size, len(data), segment_size):
+            self.pending.append((data[offset:offset + segment_size], address))
+        return data[:segment_size], address
+
+    def sendto(self, data, address):
+        return self.sock.sendto(data, address)
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def gettimeout(self):
+        return self.sock.gettimeout()
+
+    def close(self):
+        self.sock.close()
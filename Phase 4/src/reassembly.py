@@ -0,0 +1,108 @@
+import tempfile
+
+FLUSH_BYTES = 64 * 1024
+MEMORY_BUDGET = 4 * 1024 * 1024
+
+# Streams received packets to the output file in sequence order. In-order
+# data is batched up to FLUSH_BYTES and written out; packets that arrive
+# ahead of a gap are held in memory up to MEMORY_BUDGET and spill to a
+# temporary file beyond that, so receiver memory no longer grows with the
+# size of the transfer.
+
+class StreamingReassembler:
+    def __init__(self, file, first_seq=0, memory_budget=MEMORY_BUDGET, flush_bytes=FLUSH_BYTES, spill_dir=None):
+        self.file = file
+        self.next_seq = first_seq
+        self.memory_budget = memory_budget
+        self.flush_bytes = flush_bytes
+        self.spill_dir = spill_dir
+        self.delivered_bytes = 0
+        self.written_bytes = 0
+        self.held_bytes = 0
+        self.spilled_packets = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._held = {}
+        self._spill = None
+        self._spilled = {}  # seq -> (offset, length) in the spill file
+
+    def add(self, seq, data):
+        # Returns False for duplicates and data that was already delivered
+        if seq < self.next_seq or seq in self._held or seq in self._spilled:
+            return False
+        if seq == self.next_seq:
+            self._deliver(data)
+            self._drain()
+        elif self.held_bytes + len(data) <= self.memory_budget:
+            self._held[seq] = bytes(data)
+            self.held_bytes += len(data)
+        else:
+            self._spill_packet(seq, data)
+        return True
+
+    def has(self, seq):
+        return seq < self.next_seq or seq in self._held or seq in self._spilled
+
+    def held_ranges(self, limit=None):
+        # [start, end) runs of packets held beyond the next expected one, lowest first
+        ranges = []
+        for seq in sorted(self._held.keys() | self._spilled.keys()):
+            if ranges and ranges[-1][1] == seq:
+                ranges[-1][1] = seq + 1
+            elif limit is not None and len(ranges) == limit:
+                break
+            else:
+                ranges.append([seq, seq + 1])
+        return [tuple(r) for r in ranges]
+
+    def buffered_bytes(self):
+        return self._pending_bytes + self.held_bytes
+
+    def flush(self):
+        if self._pending:
+            self.file.writelines(self._pending)
+            self.written_bytes += self._pending_bytes
+            self._pending = []
+            self._pending_bytes = 0
+
+    def close(self):
+        self.flush()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def _deliver(self, data):
+        # bytes() copies memoryviews into pooled buffers; bytes pass through
+        self._pending.append(bytes(data))
+        self._pending_bytes += len(data)
+        self.delivered_bytes += len(data)
+        self.next_seq += 1
+        if self._pending_bytes >= self.flush_bytes:
+            self.flush()
+
+    def _drain(self):
+        while True:
+            seq = self.next_seq
+            if seq in self._held:
+                data = self._held.pop(seq)
+                self.held_bytes -= len(data)
+            elif seq in self._spilled:
+                offset, length = self._spilled.pop(seq)
+                self._spill.seek(offset)
+                data = self._spill.read(length)
+                if not self._spilled:
+                    # Everything spilled has been read back; reuse the space
+                    self._spill.seek(0)
+                    self._spill.truncate()
+            else:
+                return
+            self._deliver(data)
+
+    def _spill_packet(self, seq, data):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self.spill_dir)
+        self._spill.seek(0, 2)
+        offset = self._spill.tell()
+        self._spill.write(data)
+        self._spilled[seq] = (offset, len(data))
+        self.spilled_packets += 1
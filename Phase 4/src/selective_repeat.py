@@ -0,0 +1,217 @@
+import socket
+import os
+try:
+    from .utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_packet_type
+    from .codec import BufferPool, encode_from_file, decode
+    from .timers import TimerWheel
+except ImportError:
+    from utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_packet_type
+    from codec import BufferPool, encode_from_file, decode
+    from timers import TimerWheel
+
+PACKET_SIZE = 1024
+TIMEOUT = 0.05
+MAX_WINDOW_SIZE = 50
+ACK_SIGNAL = b'ACK'
+END_SIGNAL = b'END'
+DATA_LOSS_RATE = 0.2
+ACK_LOSS_RATE = 0.2
+BIT_ERROR_RATE = 0.1
+POLL_INTERVAL = 0.005
+MIN_WAIT = 0.0001
+END_RETRIES = 100
+# After END the receiver keeps answering repeated ENDs until the sender has
+# been quiet this long, in case its ACK was lost
+END_LINGER = 0.5
+# The sender gives up after the oldest unACKed packet times out this many times in a row
+MAX_TIMEOUTS = 30
+RECEIVER_IDLE_TIMEOUT = 5.0
+
+# Each impairment is drawn once per direction, where go_back_n draws it: data
+# loss when the sender sends, bit errors when the receiver reads data (behind
+# the same extra DATA_LOSS_RATE draw as go_back_n.rdt_rcv), ACK loss when the
+# receiver ACKs and bit errors when the sender reads the ACK.
+
+def udt_send(sock, packet, address, loss_rate):
+    if simulate_loss(loss_rate):
+        return False
+    sock.sendto(packet, address)
+    return True
+
+def sr_send(sock, address, packet, nextseqnum, sndpkt, timers):
+    sndpkt[nextseqnum] = packet
+    udt_send(sock, packet, address, DATA_LOSS_RATE)
+    timers.start(nextseqnum, TIMEOUT)
+    return nextseqnum + 1
+
+def sr_rcv_ack(sock):
+    # Returns the individually acknowledged sequence number, or None
+    try:
+        packet, _ = sock.recvfrom(PACKET_SIZE + 16)
+    except socket.timeout:
+        return None
+    packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+    if not verify_checksum(packet) or extract_packet_type(packet) != ACK_SIGNAL:
+        return None
+    return extract_sequence_number(packet)
+
+def send_end(sock, address, seq):
+    end_packet = make_packet(seq, b'', packet_type=END_SIGNAL)
+    sock.settimeout(TIMEOUT)
+    for _ in range(END_RETRIES):
+        sock.sendto(end_packet, address)
+        if sr_rcv_ack(sock) == seq:
+            return True
+    return False
+
+def run_selective_repeat_sender(host, port, file_path, N):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(POLL_INTERVAL)
+    address = (host, port)
+    base = 0
+    nextseqnum = 0
+    sndpkt = {}
+    timers = TimerWheel()
+    acked = set()
+    retransmissions = 0
+    file_size = os.path.getsize(file_path)
+    # One packet buffer per window slot, handed back as each slot is ACKed
+    pool = BufferPool(N)
+    stalled = 0  # timeouts of the base packet since base last moved
+    completed = False
+
+    try:
+        with open(file_path, 'rb') as file:
+            eof = False
+            while True:
+                while not eof and nextseqnum < base + N:
+                    buffer = pool.acquire()
+                    packet = encode_from_file(buffer, nextseqnum, file, PACKET_SIZE)
+                    if packet is None:
+                        pool.release(buffer)
+                        eof = True
+                        break
+                    nextseqnum = sr_send(sock, address, packet, nextseqnum, sndpkt, timers)
+
+                if eof and base == nextseqnum:
+                    break
+
+                # Only the packet whose own timer fired goes out again
+                for seq in timers.expired():
+                    if seq == base:
+                        stalled += 1
+                        if stalled > MAX_TIMEOUTS:
+                            raise TimeoutError(f"no progress past packet {base} after {MAX_TIMEOUTS} timeouts")
+                    udt_send(sock, sndpkt[seq], address, DATA_LOSS_RATE)
+                    timers.start(seq, TIMEOUT)
+                    retransmissions += 1
+
+                # Sleep in recvfrom until an ACK arrives or the next timer is due
+                wait = timers.next_timeout()
+                sock.settimeout(POLL_INTERVAL if wait is None else min(max(wait, MIN_WAIT), POLL_INTERVAL))
+                ack_num = sr_rcv_ack(sock)
+                if ack_num is not None and base <= ack_num < nextseqnum and ack_num not in acked:
+                    acked.add(ack_num)
+                    timers.stop(ack_num)
+                    pool.release(sndpkt.pop(ack_num).obj)
+                    while base in acked:
+                        acked.remove(base)
+                        base += 1
+                        stalled = 0
+
+            completed = send_end(sock, address, nextseqnum)
+            if not completed:
+                print("Selective Repeat sender: END was never acknowledged")
+
+    except Exception as e:
+        print(f"Selective Repeat sender: An error occurred: {e}")
+    finally:
+        sock.close()
+    print(f"Selective Repeat sender: {nextseqnum} packets, {retransmissions} retransmissions")
+    # None tells the caller the receiver never confirmed the whole file
+    return file_size if completed else None
+
+def linger(sock, buffer, rcv_base, N):
+    # Re-ACKs the ENDs of a sender that missed our ACK, and already delivered
+    # packets whose ACK was lost
+    sock.settimeout(END_LINGER)
+    while True:
+        try:
+            nbytes, address = sock.recvfrom_into(buffer)
+        except socket.timeout:
+            return
+        packet = memoryview(buffer)[:nbytes]
+        if not simulate_loss(DATA_LOSS_RATE):
+            packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+        if not verify_checksum(packet):
+            continue
+        seq_num, packet_type, _ = decode(packet)
+        if packet_type == END_SIGNAL and seq_num == rcv_base:
+            sock.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address)
+        elif packet_type != END_SIGNAL and rcv_base - N <= seq_num < rcv_base:
+            udt_send(sock, make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address, ACK_LOSS_RATE)
+
+def run_selective_repeat_receiver(host, port, output_file, N=MAX_WINDOW_SIZE):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    rcv_base = 0
+    reorder_buffer = {}
+    bytes_written = 0
+    # Packets are received into pooled buffers and held there until written
+    pool = BufferPool(N + 1)
+    buffer = pool.acquire()
+
+    try:
+        with open(output_file, 'wb') as file:
+            while True:
+                try:
+                    nbytes, address = sock.recvfrom_into(buffer)
+                except socket.timeout:
+                    print("Selective Repeat receiver: Sender went quiet, stopping")
+                    break
+                sock.settimeout(RECEIVER_IDLE_TIMEOUT)
+                packet = memoryview(buffer)[:nbytes]
+
+                if not simulate_loss(DATA_LOSS_RATE):
+                    packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+                if not verify_checksum(packet):
+                    continue
+
+                seq_num, packet_type, payload = decode(packet)
+                if packet_type == END_SIGNAL:
+                    if seq_num == rcv_base:
+                        sock.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address)
+                        linger(sock, buffer, rcv_base, N)
+                        break
+                    continue
+
+                if rcv_base <= seq_num < rcv_base + N:
+                    udt_send(sock, make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address, ACK_LOSS_RATE)
+                    if seq_num not in reorder_buffer:
+                        reorder_buffer[seq_num] = payload
+                        if payload.obj is buffer:
+                            buffer = pool.acquire()
+                    while rcv_base in reorder_buffer:
+                        data = reorder_buffer.pop(rcv_base)
+                        file.write(data)
+                        bytes_written += len(data)
+                        rcv_base += 1
+                        # Corrupted-then-copied packets are not pool buffers
+                        if isinstance(data.obj, bytearray):
+                            pool.release(data.obj)
+                elif rcv_base - N <= seq_num < rcv_base:
+                    # Already delivered, the earlier ACK was lost
+                    udt_send(sock, make_packet(seq_num, b'', packet_type=ACK_SIGNAL), address, ACK_LOSS_RATE)
+
+    except Exception as e:
+        print(f"Selective Repeat receiver: An error occurred: {e}")
+    finally:
+        sock.close()
+    return bytes_written
+
+if __name__ == "__main__":
+    receiver_host = 'localhost'
+    receiver_port = 12346
+    output_file = 'received_image_sr.bmp'
+
+    run_selective_repeat_receiver(receiver_host, receiver_port, output_file)
@@ -1,8 +1,11 @@
-from utils import Timer, calculate_checksum, verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_data
-import socket
-import struct
+try:
+    from . import selective_repeat, go_back_n, sweep, tracing
+except ImportError:
+    import selective_repeat
+    import go_back_n
+    import sweep
+    import tracing
 import time
-import random
 import os
 import argparse
 import matplotlib.pyplot as plt
@@ -15,76 +18,9 @@ ACK_SIGNAL = b'ACK'
 DATA_LOSS_RATE = 0.2
 ACK_LOSS_RATE = 0.2
 BIT_ERROR_RATE = 0.1
-
-def calculate_checksum(data):
-    checksum = 0
-    for byte in data:
-        checksum += byte
-        checksum &= 0xFFFF
-    return checksum
-
-def make_packet(sequence_number, data, packet_type=b'DATA'):
-    header_format = "!II4sH"
-    header_size = struct.calcsize(header_format)
-
-    if not isinstance(data, bytes):
-        data = data.encode()
-
-    checksum_data = packet_type + struct.pack("!II", sequence_number, len(data)) + data
-    checksum = calculate_checksum(checksum_data)
-    header = struct.pack(header_format, sequence_number, len(data), packet_type, checksum)
-    return header + data + struct.pack("!H", checksum)
-
-def simulate_loss(probability):
-    return random.random() < probability
-
-def introduce_bit_error(packet, error_probability):
-    if random.random() < error_probability:
-        index = random.randint(0, len(packet) - 1)
-        bit_index = random.randint(0, 7)
-        byte_array = bytearray(packet)
-        byte_array[index] ^= (1 << bit_index)
-        return bytes(byte_array)
-    return packet
-
-def rdt_rcv(sock, N, base):
-    try:
-        packet, _ = sock.recvfrom(PACKET_SIZE + 12)  # Adjust buffer size as needed
-        if not packet:
-            return None, None, None
-
-        if not simulate_loss(ACK_LOSS_RATE):
-            packet = introduce_bit_error(packet, BIT_ERROR_RATE)
-
-        if not verify_checksum(packet):
-            print("Checksum error, discarding packet")
-            return None, None, None
-
-        seq_num = extract_sequence_number(packet)
-        if seq_num >= base and seq_num < base + N:
-            return seq_num, extract_data(packet), packet
-        else:
-            return None, None, None
-    except socket.timeout:
-        return None, None, None
-
-def rdt_send(sock, address, data, base, nextsegnum, N, sndpkt, timer):
-    if nextsegnum < base + N:
-        print(f"Sending packet {nextsegnum}, base={base}, nextsegnum={nextsegnum}, N={N}")
-        packet = make_packet(nextsegnum, data)
-        sndpkt[nextsegnum % N] = packet
-        if not simulate_loss(DATA_LOSS_RATE):
-            print(f"Sending packet {nextsegnum} to {address}")
-            sock.sendto(packet, address)
-        else:
-            print(f"Simulating loss of packet {nextsegnum}")
-
-        if base == nextsegnum:
-            timer.start(TIMEOUT)
-        return nextsegnum + 1
-    else:
-        print("Refuse data, window is full")
-        return nextsegnum
+ADAPTIVE_TIMEOUT = True
+CONGESTION_CONTROL = 'fixed'
+SEGMENT_OFFLOAD = False
 
 def run_go_back_n_sender(host, port, file_path, N):
     min_file_size = 500 * 1024  # 500KB in bytes
@@ -93,47 +29,15 @@ def run_go_back_n_sender(host, port, file_path, N):
         print(f"Error: Transfer file must be at least {min_file_size / 1024}KB. Current size: {file_size / 1024}KB")
         return
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    address = (host, port)
-    timer = Timer()
-    base = 0
-    nextsegnum = 0
-    sndpkt = [b''] * N
-
-    try:
-        with open(file_path, 'rb') as file:
-            while True:
-                data = file.read(PACKET_SIZE)
-                if not data:
-                    break
-                nextsegnum = rdt_send(sock, address, data, base, nextsegnum, N, sndpkt, timer)
-
-                while base < nextsegnum:
-                    if timer.is_expired():
-                        print("Timeout, retransmitting packets")
-                        timer.restart()
-                        for i in range(base, nextsegnum):
-                            if not simulate_loss(DATA_LOSS_RATE):
-                                print(f"Retransmitting packet {i} to {address}")
-                                sock.sendto(sndpkt[i % N], address)
-                            else:
-                                print(f"Simulating loss of packet {i}")
-                    ack_num, _, _ = rdt_rcv(sock, N, base)
-                    if ack_num is not None:
-                        print(f"Received ACK {ack_num}")
-                        base = ack_num + 1
-                        if base == nextsegnum:
-                            timer.stop()
-                        else:
-                            timer.restart()
-
-                if base >= nextsegnum:
-                    break
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    finally:
-        sock.close()
+    # The pipelined send loop lives in go_back_n; run it with this module's settings
+    go_back_n.TIMEOUT = TIMEOUT
+    go_back_n.DATA_LOSS_RATE = DATA_LOSS_RATE
+    go_back_n.ACK_LOSS_RATE = ACK_LOSS_RATE
+    go_back_n.BIT_ERROR_RATE = BIT_ERROR_RATE
+    go_back_n.ADAPTIVE_TIMEOUT = ADAPTIVE_TIMEOUT
+    go_back_n.CONGESTION_CONTROL = CONGESTION_CONTROL
+    go_back_n.SEGMENT_OFFLOAD = SEGMENT_OFFLOAD
+    return go_back_n.run_go_back_n_sender(host, port, file_path, N)
 
 def run_experiment(host, port, file_path, window_size, loss_rate):
     global DATA_LOSS_RATE, ACK_LOSS_RATE, BIT_ERROR_RATE
@@ -146,13 +50,38 @@ def run_experiment(host, port, file_path, window_size, loss_rate):
     BIT_ERROR_RATE = loss_rate
 
     start_time = time.time()
-    run_go_back_n_sender(host, port, file_path, window_size)
+    size = run_go_back_n_sender(host, port, file_path, window_size)
     end_time = time.time()
 
     DATA_LOSS_RATE = original_data_loss_rate
     ACK_LOSS_RATE = original_ack_loss_rate
     BIT_ERROR_RATE = original_bit_error_rate
 
+    if size is None:
+        # Left out of the charts: the transfer failed or was never confirmed
+        print(f"Transfer at {loss_rate:.0%} loss did not complete")
+        return float("nan")
+    return end_time - start_time
+
+def run_selective_repeat_experiment(host, port, file_path, window_size, loss_rate):
+    # The Selective Repeat receiver must be started with the same loss settings
+    original_settings = (selective_repeat.DATA_LOSS_RATE, selective_repeat.ACK_LOSS_RATE,
+                         selective_repeat.BIT_ERROR_RATE, selective_repeat.TIMEOUT)
+    selective_repeat.DATA_LOSS_RATE = loss_rate
+    selective_repeat.ACK_LOSS_RATE = loss_rate
+    selective_repeat.BIT_ERROR_RATE = loss_rate
+    selective_repeat.TIMEOUT = TIMEOUT
+
+    start_time = time.time()
+    size = selective_repeat.run_selective_repeat_sender(host, port, file_path, window_size)
+    end_time = time.time()
+
+    (selective_repeat.DATA_LOSS_RATE, selective_repeat.ACK_LOSS_RATE,
+     selective_repeat.BIT_ERROR_RATE, selective_repeat.TIMEOUT) = original_settings
+
+    if size is None:
+        print(f"Selective Repeat transfer at {loss_rate:.0%} loss did not complete")
+        return float("nan")
     return end_time - start_time
 
 if __name__ == "__main__":
@@ -162,6 +91,12 @@ if __name__ == "__main__":
     parser.add_argument("--port", type=int, default=12345, help="Receiver port number")
     parser.add_argument("--window_size", type=int, default=10, help="Go-Back-N window size")
     parser.add_argument("--enable_loss", action="store_true", help="Enable loss and error simulation")
+    parser.add_argument("--fixed_timeout", action="store_true", help="Use the fixed TIMEOUT instead of the adaptive RTO")
+    parser.add_argument("--congestion_control", choices=["fixed", "reno", "bbr"], default="fixed", help="Congestion control for the sending window")
+    parser.add_argument("--segment_offload", action="store_true", help="Batch window sends with UDP GSO (Linux, falls back per packet)")
+    parser.add_argument("--parallel", type=int, default=0, help="Run Charts 1-3 with this many worker processes, each with its own receiver (0 uses the receiver at --port)")
+    parser.add_argument("--trace", help="Record per-packet sender events and dump them to this file (decode with python -m src.tracing)")
+    parser.add_argument("--sr_port", type=int, default=0, help="Selective Repeat receiver port for Chart 4 (0 skips it)")
     args = parser.parse_args()
 
     sender_host = args.host
@@ -169,19 +104,37 @@ if __name__ == "__main__":
     file_to_transfer = args.file_path
     window_size = args.window_size
 
+    if args.fixed_timeout:
+        ADAPTIVE_TIMEOUT = False
+    CONGESTION_CONTROL = args.congestion_control
+    SEGMENT_OFFLOAD = args.segment_offload
+
     if not args.enable_loss:
         DATA_LOSS_RATE = 0.0
         ACK_LOSS_RATE = 0.0
         BIT_ERROR_RATE = 0.0
 
+    def parallel_times(matrix):
+        # Completion times for a sweep.run_sweep matrix, in matrix order
+        matrix = dict(matrix, options={"CONGESTION_CONTROL": [CONGESTION_CONTROL], "SEGMENT_OFFLOAD": [SEGMENT_OFFLOAD]})
+        return [r["completion_time"] if r["ok"] else float("nan") for r in sweep.run_sweep(matrix, file_to_transfer, args.parallel)]
+    default_timeout = None if ADAPTIVE_TIMEOUT else TIMEOUT
+    if args.trace:
+        go_back_n.TRACER = tracing.Tracer()
+
     # --- Performance Measurement for Chart 1 ---
     loss_probabilities = range(0, 75, 5)
     completion_times = []
 
     print("Running performance measurement for Chart 1...")
-    for loss_prob in loss_probabilities:
-        completion_time = run_experiment(sender_host, sender_port, file_to_transfer, window_size, loss_prob / 100.0)
-        completion_times.append(completion_time)
+    if args.parallel:
+        completion_times = parallel_times({"loss": [p / 100.0 for p in loss_probabilities], "timeout": [default_timeout], "window": [window_size]})
+    for i, loss_prob in enumerate(loss_probabilities):
+        if args.parallel:
+            completion_time = completion_times[i]
+        else:
+            completion_time = run_experiment(sender_host, sender_port, file_to_transfer, window_size, loss_prob / 100.0)
+            completion_times.append(completion_time)
         print(f"Loss Probability: {loss_prob}%, Completion Time: {completion_time:.2f} seconds")
 
     # Plotting Chart 1: Phase 4 performance
@@ -200,16 +153,33 @@ if __name__ == "__main__":
     timeout_completion_times = []
     fixed_loss_probability = 0.2 # 20% loss
 
-    original_timeout = TIMEOUT
-    for timeout_val in timeout_values:
-        TIMEOUT = timeout_val / 1000.0 # Convert ms to seconds
-        completion_time = run_experiment(sender_host, sender_port, file_to_transfer, window_size, fixed_loss_probability)
-        timeout_completion_times.append(completion_time)
-        print(f"Timeout Value: {timeout_val}ms, Completion Time: {completion_time:.2f} seconds")
-    TIMEOUT = original_timeout # Restore original timeout
+    if args.parallel:
+        # The adaptive RTO reference rides along as the last entry
+        *timeout_completion_times, adaptive_completion_time = parallel_times(
+            {"loss": [fixed_loss_probability], "timeout": [t / 1000.0 for t in timeout_values] + [None], "window": [window_size]})
+        for timeout_val, completion_time in zip(timeout_values, timeout_completion_times):
+            print(f"Timeout Value: {timeout_val}ms, Completion Time: {completion_time:.2f} seconds")
+    else:
+        original_timeout = TIMEOUT
+        original_adaptive = ADAPTIVE_TIMEOUT
+        ADAPTIVE_TIMEOUT = False
+        for timeout_val in timeout_values:
+            TIMEOUT = timeout_val / 1000.0 # Convert ms to seconds
+            completion_time = run_experiment(sender_host, sender_port, file_to_transfer, window_size, fixed_loss_probability)
+            timeout_completion_times.append(completion_time)
+            print(f"Timeout Value: {timeout_val}ms, Completion Time: {completion_time:.2f} seconds")
+        TIMEOUT = original_timeout # Restore original timeout
+
+        # Reference point: the adaptive RTO needs no sweep
+        ADAPTIVE_TIMEOUT = True
+        adaptive_completion_time = run_experiment(sender_host, sender_port, file_to_transfer, window_size, fixed_loss_probability)
+        ADAPTIVE_TIMEOUT = original_adaptive
+    print(f"Adaptive RTO, Completion Time: {adaptive_completion_time:.2f} seconds")
 
     plt.figure(figsize=(10, 6))
     plt.plot(timeout_values, timeout_completion_times, marker='o')
+    plt.axhline(adaptive_completion_time, color='green', linestyle='--', label="Adaptive RTO")
+    plt.legend()
     plt.xlabel("Retransmission Timeout value (ms)")
     plt.ylabel("File Transfer Completion Time (seconds)")
     plt.title("Optimal Timeout Value - Phase 4 Performance (20% Loss)")
@@ -223,9 +193,14 @@ if __name__ == "__main__":
     window_completion_times = []
     fixed_loss_probability = 0.2 # 20% loss
 
-    for win_size in window_sizes:
-        completion_time = run_experiment(sender_host, sender_port, file_to_transfer, win_size, fixed_loss_probability)
-        window_completion_times.append(completion_time)
+    if args.parallel:
+        window_completion_times = parallel_times({"loss": [fixed_loss_probability], "timeout": [default_timeout], "window": window_sizes})
+    for i, win_size in enumerate(window_sizes):
+        if args.parallel:
+            completion_time = window_completion_times[i]
+        else:
+            completion_time = run_experiment(sender_host, sender_port, file_to_transfer, win_size, fixed_loss_probability)
+            window_completion_times.append(completion_time)
         print(f"Window Size: {win_size}, Completion Time: {completion_time:.2f} seconds")
 
     plt.figure(figsize=(10, 6))
@@ -237,34 +212,38 @@ if __name__ == "__main__":
     plt.savefig("phase4_optimal_window_size.png")
     print("Chart 3 saved as phase4_optimal_window_size.png")
 
-    print("\nRemember to implement the logic for Chart 4 (Performance comparison of different phases) separately.")
-
     # --- Performance Measurement for Chart 4 (Performance Comparison) ---
-print("\nRunning performance measurement for Chart 4 (Performance Comparison)...")
-fixed_loss_probability = 0.2  # 20% loss
-
-# Replace these placeholders with actual measurements when implementing the respective phases
-completion_time_phase2 = 0  # Replace with actual measurement for Phase 2
-completion_time_phase3 = 0  # Replace with actual measurement for Phase 3
-completion_time_phase4 = run_experiment(sender_host, sender_port, file_to_transfer, window_size, fixed_loss_probability)
-completion_time_udp = 0  # Replace with actual measurement for UDP (if implemented)
-completion_time_selective_repeat = 0  # Replace with actual measurement for Selective Repeat (if implemented)
-
-phases = ['Phase 2', 'Phase 3', 'Phase 4']
-times = [completion_time_phase2, completion_time_phase3, completion_time_phase4]
-
-if completion_time_selective_repeat > 0:
-    phases.append('Selective Repeat')
-    times.append(completion_time_selective_repeat)
-if completion_time_udp > 0:
-    phases.append('UDP')
-    times.append(completion_time_udp)
-
-plt.figure(figsize=(10, 6))
-plt.bar(phases, times, color='skyblue')
-plt.xlabel("Phase")
-plt.ylabel("File Transfer Completion Time (seconds)")
-plt.title("Performance Comparison of Different Phases (20% Loss)")
-plt.grid(axis='y')
-plt.savefig("phase4_comparison.png")
-print("Chart 4 saved as phase4_comparison.png")
\ No newline at end of file
+    print("\nRunning performance measurement for Chart 4 (Performance Comparison)...")
+    fixed_loss_probability = 0.2  # 20% loss
+
+    # Replace these placeholders with actual measurements when implementing the respective phases
+    completion_time_phase2 = 0  # Replace with actual measurement for Phase 2
+    completion_time_phase3 = 0  # Replace with actual measurement for Phase 3
+    completion_time_phase4 = run_experiment(sender_host, sender_port, file_to_transfer, window_size, fixed_loss_probability)
+    completion_time_udp = 0  # Replace with actual measurement for UDP (if implemented)
+    completion_time_selective_repeat = 0
+    if args.sr_port:
+        completion_time_selective_repeat = run_selective_repeat_experiment(sender_host, args.sr_port, file_to_transfer, window_size, fixed_loss_probability)
+
+    phases = ['Phase 2', 'Phase 3', 'Phase 4']
+    times = [completion_time_phase2, completion_time_phase3, completion_time_phase4]
+
+    if completion_time_selective_repeat > 0:
+        phases.append('Selective Repeat')
+        times.append(completion_time_selective_repeat)
+    if completion_time_udp > 0:
+        phases.append('UDP')
+        times.append(completion_time_udp)
+
+    plt.figure(figsize=(10, 6))
+    plt.bar(phases, times, color='skyblue')
+    plt.xlabel("Phase")
+    plt.ylabel("File Transfer Completion Time (seconds)")
+    plt.title("Performance Comparison of Different Phases (20% Loss)")
+    plt.grid(axis='y')
+    plt.savefig("phase4_comparison.png")
+    print("Chart 4 saved as phase4_comparison.png")
+
+    if args.trace:
+        go_back_n.TRACER.dump(args.trace)
+        print(f"{len(go_back_n.TRACER)} trace events saved to {args.trace}")
@@ -0,0 +1,204 @@
+import os
+import socket
+import struct
+import time
+import multiprocessing
+import queue
+try:
+    from .utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_data, extract_packet_type
+    from .reassembly import StreamingReassembler
+except ImportError:
+    from utils import verify_checksum, introduce_bit_error, simulate_loss, make_packet, extract_sequence_number, extract_data, extract_packet_type
+    from reassembly import StreamingReassembler
+
+# Receiver daemon for many concurrent Go-Back-N uploads. Every (peer address,
+# session ID) pair has its own expected sequence number and output file.
+# A sender opens a session with a SYN packet whose payload is a 4-byte
+# session ID (go_back_n.run_go_back_n_sender(..., session_id=n)) and gets a
+# SYN back with the session ID as its sequence number; a sender that starts
+# straight at packet 0 gets session 0 for its address.
+#
+# With workers > 1 each worker process binds the same port with
+# SO_REUSEPORT. The kernel hashes the 4-tuple, so every packet from one
+# sender socket lands in the same worker and sessions never move.
+
+PACKET_SIZE = 1024
+ACK_SIGNAL = b'ACK'
+END_SIGNAL = b'END'
+START_SIGNAL = b'SYN'
+DATA_LOSS_RATE = 0.0
+ACK_LOSS_RATE = 0.0
+BIT_ERROR_RATE = 0.0
+SESSION_IDLE_TIMEOUT = 5.0
+FINISHED_LINGER = 5.0  # keep answering END retries after a session closes
+POLL_INTERVAL = 0.1
+
+class Session:
+    def __init__(self, peer, session_id, output_dir):
+        self.peer = peer
+        self.session_id = session_id
+        self.path = session_filename(output_dir, peer, session_id)
+        self.file = open(self.path, 'wb')
+        self.stream = StreamingReassembler(self.file)
+        self.expectedseqnum = 0
+        self.last_seen = time.monotonic()
+
+    def close(self):
+        self.stream.close()
+        self.file.close()
+        return self.stream.delivered_bytes
+
+def session_filename(output_dir, peer, session_id):
+    host, port = peer[:2]
+    return os.path.join(output_dir, f"{host.replace(':', '_')}_{port}_{session_id}.bin")
+
+def reuse_port_supported():
+    return hasattr(socket, "SO_REUSEPORT")
+
+def send_ack(sock, seq, address, loss_rate=0.0):
+    if not simulate_loss(loss_rate):
+        sock.sendto(make_packet(seq, b'', packet_type=ACK_SIGNAL), address)
+
+def serve(host, port, output_dir, reuse_port=False, stop=None, max_sessions=None):
+    # Runs until stop (a threading/multiprocessing Event) is set, max_sessions
+    # sessions have finished or Ctrl-C. Returns {(peer, session_id): bytes}.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.settimeout(POLL_INTERVAL)
+    sessions = {}  # peer -> current Session
+    finished = {}  # peer -> (session_id, end seq, closed at)
+    completed = {}
+    last_sweep = time.monotonic()
+
+    try:
+        while not (stop is not None and stop.is_set()):
+            if max_sessions is not None and len(completed) >= max_sessions:
+                break
+            now = time.monotonic()
+            if now - last_sweep >= POLL_INTERVAL:
+                last_sweep = now
+                for peer, session in list(sessions.items()):
+                    if now - session.last_seen > SESSION_IDLE_TIMEOUT:
+                        print(f"Receiver: Session {session.session_id} from {peer} went quiet, closing")
+                        completed[(peer, session.session_id)] = session.close()
+                        del sessions[peer]
+                for peer, (_, _, closed_at) in list(finished.items()):
+                    if now - closed_at > FINISHED_LINGER:
+                        del finished[peer]
+
+            try:
+                packet, peer = sock.recvfrom(PACKET_SIZE + 16)
+            except socket.timeout:
+                continue
+            if simulate_loss(DATA_LOSS_RATE):
+                continue
+            packet = introduce_bit_error(packet, BIT_ERROR_RATE)
+            session = sessions.get(peer)
+            if not verify_checksum(packet):
+                if session is not None and session.expectedseqnum > 0:
+                    send_ack(sock, session.expectedseqnum - 1, peer, ACK_LOSS_RATE)
+                continue
+
+            seq_num = extract_sequence_number(packet)
+            packet_type = extract_packet_type(packet)
+
+            if packet_type == START_SIGNAL:
+                data = extract_data(packet)
+                if len(data) != 4:
+                    continue
+                session_id = struct.unpack("!I", data)[0]
+                if session is None or session.session_id != session_id:
+                    if session is not None:
+                        # The peer moved on to a new session on the same socket
+                        completed[(peer, session.session_id)] = session.close()
+                    session = sessions[peer] = Session(peer, session_id, output_dir)
+                    finished.pop(peer, None)
+                session.last_seen = time.monotonic()
+                sock.sendto(make_packet(session_id, b'', packet_type=START_SIGNAL), peer)
+                continue
+
+            if packet_type == END_SIGNAL:
+                if session is not None and seq_num == session.expectedseqnum:
+                    sock.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), peer)
+                    completed[(peer, session.session_id)] = session.close()
+                    print(f"Receiver: Session {session.session_id} from {peer} complete, {completed[(peer, session.session_id)]} bytes")
+                    finished[peer] = (session.session_id, seq_num, time.monotonic())
+                    del sessions[peer]
+                elif session is None and peer in finished and finished[peer][1] == seq_num:
+                    sock.sendto(make_packet(seq_num, b'', packet_type=ACK_SIGNAL), peer)
+                continue
+
+            if session is None:
+                if seq_num != 0:
+                    continue
+                # Sender without a SYN: implicit session 0
+                session = sessions[peer] = Session(peer, 0, output_dir)
+                finished.pop(peer, None)
+            session.last_seen = time.monotonic()
+
+            if seq_num == session.expectedseqnum:
+                session.stream.add(seq_num, extract_data(packet))
+                send_ack(sock, seq_num, peer, ACK_LOSS_RATE)
+                session.expectedseqnum += 1
+            elif session.expectedseqnum > 0:
+                send_ack(sock, session.expectedseqnum - 1, peer, ACK_LOSS_RATE)
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Receiver: An error occurred: {e}")
+    finally:
+        for peer, session in sessions.items():
+            completed[(peer, session.session_id)] = session.close()
+        sock.close()
+    return completed
+
+def _serve_worker(results, host, port, output_dir, stop):
+    # Worker process: hands its finished sessions back to the daemon
+    results.put(serve(host, port, output_dir, True, stop))
+
+def run_receiver_daemon(host, port, output_dir, workers=1, stop=None):
+    # Shards sessions across worker processes when SO_REUSEPORT is available;
+    # otherwise serves everything in this process. Either way returns serve()'s
+    # {(peer, session_id): bytes}, merged over all workers.
+    os.makedirs(output_dir, exist_ok=True)
+    if workers <= 1 or not reuse_port_supported():
+        if workers > 1:
+            print("Receiver: SO_REUSEPORT not available, running a single worker")
+        return serve(host, port, output_dir, stop=stop)
+
+    if stop is None:
+        stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_serve_worker, args=(results, host, port, output_dir, stop))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    completed = {}
+    remaining = workers
+    # Read the results before joining: a worker cannot exit while its result
+    # is still stuck in the queue's pipe
+    while remaining:
+        try:
+            completed.update(results.get(timeout=POLL_INTERVAL))
+            remaining -= 1
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break  # a worker died without reporting
+        except KeyboardInterrupt:
+            stop.set()
+    for process in processes:
+        process.join()
+    return completed
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Multi-session Go-Back-N receiver daemon")
+    parser.add_argument("output_dir", help="Directory for the received files")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=12345)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes sharing the port")
+    args = parser.parse_args()
+    run_receiver_daemon(args.host, args.port, args.output_dir, args.workers)
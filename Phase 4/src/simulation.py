@@ -0,0 +1,437 @@
+import contextlib
+import heapq
+import importlib.util
+import itertools
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import deque
+try:
+    from . import go_back_n
+    from .emulator import Link, LinkRule
+except ImportError:
+    import go_back_n
+    from emulator import Link, LinkRule
+
+# Discrete-event simulation of the real protocol code. The sender and the
+# receiver run unchanged, each in its own thread, but with their module's
+# `socket`, `time` and `random` swapped for a simulated channel, a virtual
+# clock and a seeded generator. Only one thread runs at a time: when it
+# blocks (recvfrom, sleep) the scheduler jumps the clock to the next event,
+# a packet arrival or a timeout, and hands control to whoever it belongs to.
+# Timeouts therefore cost no wall time, and the same seed always replays the
+# same transfer. The channel between the two is emulator.Link, so every
+# LinkRule setting (delay, rate, burst loss, ...) is available.
+#
+#     python -m src.simulation image.bmp --protocol gbn --loss 0.7 --seed 3
+
+DEFAULT_RULE = "delay=0.001"  # one-way delay of a fast local link
+EPHEMERAL_PORTS = 50000
+PHASE3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Phase 3", "extra_credit", "src")
+PHASE3_RD_DIR = os.path.join(os.path.dirname(PHASE3_DIR), "src_receiver_driven")
+
+class SimulationAbort(BaseException):
+    # Raised inside a process that is still blocked when the simulation ends.
+    # Not an Exception, so the protocol code's `except Exception` lets it through.
+    pass
+
+class _Process:
+    def __init__(self, target, args, daemon=False):
+        self.target = target
+        self.args = args
+        self.daemon = daemon  # a server loop: run() does not wait for it
+        self.resume = threading.Semaphore(0)
+        self.token = 0  # bumped on every wake-up so stale timeouts are ignored
+        self.done = False
+        self.finished_at = None
+        self.aborted = False
+        self.result = None
+        self.error = None
+        self.thread = None
+
+class SimSocket:
+    def __init__(self, sim):
+        self.sim = sim
+        self.address = None
+        self.bound = False
+        self.timeout = None
+        self.inbox = deque()
+        self.waiter = None
+        self.closed = False
+
+    def bind(self, address):
+        self.address = self.sim.register(self, address)
+        self.bound = True
+
+    def setsockopt(self, *args):
+        pass
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def gettimeout(self):
+        return self.timeout
+
+    def getsockname(self):
+        return self.address
+
+    def sendto(self, data, address):
+        if self.closed:
+            raise OSError("socket is closed")
+        if self.address is None:
+            self.address = self.sim.register(self, None)
+        self.sim.transmit(self, bytes(data), address)
+        return len(data)
+
+    def recvfrom(self, bufsize):
+        if self.closed:
+            raise OSError("socket is closed")
+        if not self.inbox:
+            self.sim.wait(self, self.timeout)
+            if not self.inbox:
+                raise socket.timeout("timed out")
+        data, address = self.inbox.popleft()
+        return data[:bufsize], address
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.sim.unregister(self)
+
+class Simulator:
+    def __init__(self, forward=None, reverse=None, seed=0):
+        # forward carries packets to sockets that called bind() (receivers),
+        # reverse carries the replies to unbound (ephemeral) sockets
+        self.forward = forward if forward is not None else LinkRule.parse(DEFAULT_RULE)
+        self.reverse = reverse if reverse is not None else LinkRule.parse(DEFAULT_RULE)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.now = 0.0
+        self.events = []  # heap of (time, order, callback)
+        self.order = itertools.count()
+        self.sockets = {}
+        self.links = {}
+        self.next_port = EPHEMERAL_PORTS
+        self.processes = []
+        self.current = None
+        self.switch = threading.Semaphore(0)
+        self.events_run = 0
+
+    # The stand-ins for the socket, time and random modules
+    def socket(self, family=socket.AF_INET, type=socket.SOCK_DGRAM, *args):
+        return SimSocket(self)
+
+    def modules(self):
+        socket_module = types.SimpleNamespace(
+            socket=self.socket, timeout=socket.timeout, error=OSError,
+            AF_INET=socket.AF_INET, SOCK_DGRAM=socket.SOCK_DGRAM,
+            SOL_SOCKET=socket.SOL_SOCKET, SO_REUSEADDR=socket.SO_REUSEADDR)
+        time_module = types.SimpleNamespace(
+            time=lambda: self.now, monotonic=lambda: self.now, perf_counter=lambda: self.now,
+            sleep=self.sleep)
+        return {"socket": socket_module, "time": time_module, "random": self.random}
+
+    @contextlib.contextmanager
+    def patched(self, *modules):
+        # Swaps the globals of the given protocol modules for the duration
+        replacements = self.modules()
+        saved = [(module, name, getattr(module, name)) for module in modules
+                 for name in replacements if hasattr(module, name)]
+        for module, name, _ in saved:
+            setattr(module, name, replacements[name])
+        try:
+            yield self
+        finally:
+            for module, name, value in saved:
+                setattr(module, name, value)
+
+    # Addresses and the channel
+    def normalize(self, address):
+        host, port = address[:2]
+        if host in ("", "0.0.0.0", "localhost"):
+            host = "127.0.0.1"
+        return (host, port)
+
+    def register(self, sock, address):
+        if address is None or address[1] == 0:
+            host = "127.0.0.1" if address is None else address[0]
+            address = (host, self.next_port)
+            self.next_port += 1
+        address = self.normalize(address)
+        if address in self.sockets:
+            raise OSError(f"address {address} already in use")
+        self.sockets[address] = sock
+        return address
+
+    def unregister(self, sock):
+        if self.sockets.get(sock.address) is sock:
+            del self.sockets[sock.address]
+
+    def transmit(self, sock, data, address):
+        address = self.normalize(address)
+        key = (sock.address, address)
+        link = self.links.get(key)
+        if link is None:
+            target = self.sockets.get(address)
+            rule = self.forward if target is not None and target.bound else self.reverse
+            link = self.links[key] = Link(rule, self.random.getrandbits(32))
+        for deliver_at, packet in link.transmit(data, self.now):
+            self.schedule(deliver_at, lambda packet=packet: self.deliver(sock.address, address, packet))
+
+    def deliver(self, source, address, packet):
+        target = self.sockets.get(address)
+        if target is None or target.closed:
+            return
+        target.inbox.append((packet, source))
+        if target.waiter is not None:
+            self.wake(target.waiter)
+
+    def stats(self):
+        # Channel counters summed per direction
+        totals = {"forward": {}, "reverse": {}}
+        for link in self.links.values():
+            direction = totals["forward" if link.rule is self.forward else "reverse"]
+            for name, value in link.stats.items():
+                direction[name] = direction.get(name, 0) + value
+        return totals
+
+    # Scheduling
+    def schedule(self, at, callback):
+        heapq.heappush(self.events, (max(at, self.now), next(self.order), callback))
+
+    def spawn(self, target, *args, daemon=False):
+        process = _Process(target, args, daemon)
+        process.thread = threading.Thread(target=self._run_process, args=(process,), daemon=True)
+        self.processes.append(process)
+        process.thread.start()
+        self.schedule(self.now, lambda: self.wake(process))
+        return process
+
+    def _run_process(self, process):
+        process.resume.acquire()
+        try:
+            process.result = process.target(*process.args)
+        except SimulationAbort:
+            pass
+        except BaseException as e:
+            process.error = e
+        finally:
+            process.done = True
+            process.finished_at = self.now
+            self.switch.release()
+
+    def wake(self, process):
+        # Scheduler side: run the process until it blocks again or finishes
+        process.token += 1
+        self.current = process
+        process.resume.release()
+        self.switch.acquire()
+        self.current = None
+
+    def block(self, timeout):
+        # Process side: give control back until woken, or until timeout
+        process = self.current
+        token = process.token
+        if timeout is not None:
+            self.schedule(self.now + timeout, lambda: process.token == token and self.wake(process))
+        self.switch.release()
+        process.resume.acquire()
+        if process.aborted:
+            raise SimulationAbort()
+
+    def wait(self, sock, timeout):
+        sock.waiter = self.current
+        try:
+            self.block(timeout)
+        finally:
+            sock.waiter = None
+
+    def sleep(self, seconds):
+        self.block(max(0.0, seconds))
+
+    def run(self, until=None):
+        # Runs events until every non-daemon process has finished, nothing is
+        # left to happen, or the clock would pass `until`. Processes still
+        # blocked at that point are aborted. Returns the virtual time reached.
+        while not all(p.done for p in self.processes if not p.daemon):
+            if not self.events or (until is not None and self.events[0][0] > until):
+                # Deadlocked or out of time: a blocked process waits until `until`
+                if until is not None:
+                    self.now = max(self.now, until)
+                break
+            at, _, callback = heapq.heappop(self.events)
+            self.now = at
+            self.events_run += 1
+            callback()
+        for process in self.processes:
+            if not process.done:
+                process.aborted = True
+                self.wake(process)
+            process.thread.join()
+        for process in self.processes:
+            if process.error is not None:
+                raise process.error
+        return self.now
+
+def _same_file(first, second):
+    with open(first, 'rb') as f, open(second, 'rb') as g:
+        return f.read() == g.read()
+
+def simulate_go_back_n(input_file, output_file, N=10, loss=0.0, seed=0, forward=None, reverse=None,
+                       port=12345, until=None, quiet=True):
+    # Runs go_back_n's sender and receiver against each other. `loss` sets
+    # the module's own DATA/ACK loss and bit error rates, like sender.py's
+    # experiments; the channel rules add on top of that.
+    sim = Simulator(forward, reverse, seed)
+    original = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE, go_back_n.SEGMENT_OFFLOAD)
+    go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = loss
+    go_back_n.SEGMENT_OFFLOAD = False  # GSO needs a kernel socket
+    start = time.perf_counter()
+    try:
+        with sim.patched(go_back_n), _quiet(quiet):
+            sim.spawn(go_back_n.run_go_back_n_receiver, '127.0.0.1', port, output_file)
+            sender = sim.spawn(go_back_n.run_go_back_n_sender, '127.0.0.1', port, input_file, N)
+            sim.run(until)
+    finally:
+        go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE, go_back_n.SEGMENT_OFFLOAD = original
+    return {
+        "protocol": "gbn", "loss": loss, "window": N, "seed": seed,
+        "virtual_time": sender.finished_at,
+        "wall_time": time.perf_counter() - start,
+        "ok": sender.done and not sender.aborted and sender.result is not None and _same_file(input_file, output_file),
+        "sender": dict(go_back_n.last_sender_stats),
+        "channel": sim.stats(),
+        "events": sim.events_run,
+    }
+
+def load_phase3(directory=PHASE3_DIR, names=("client", "server")):
+    # Imports Phase 3 scripts from their folder, by default the sender-driven
+    # RDT 3.0 client and server. Their loggers resolve the log paths against
+    # the current directory. Both extra_credit folders carry the same fsm_log,
+    # telemetry and packet_checksum, so whichever folder is imported first
+    # serves them.
+    if directory not in sys.path:
+        sys.path.append(directory)  # for their fsm_log, telemetry and packet_checksum imports
+    modules = []
+    for name in names:
+        spec = importlib.util.spec_from_file_location(f"rdt3_{name}", os.path.join(directory, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        modules.append(module)
+    return tuple(modules)
+
+def simulate_rdt3(input_file, output_file, option=1, loss=0.0, seed=0, forward=None, reverse=None,
+                  until=None, quiet=True, work_dir=None):
+    # Runs the Phase 3 RDT 3.0 client.send_file against server.receive_file.
+    # Both write status files into the working directory, so they run in
+    # work_dir (a temporary directory by default).
+    sim = Simulator(forward, reverse, seed)
+    input_file = os.path.abspath(input_file)
+    output_file = os.path.abspath(output_file)
+    previous_dir = os.getcwd()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(work_dir or scratch)
+        try:
+            client, server = load_phase3()
+            client.SIM_LOSS_RATE = server.SIM_LOSS_RATE = loss
+            server.option = option
+            with sim.patched(client, server), _quiet(quiet):
+                sim.spawn(server.receive_file, output_file)
+                sender = sim.spawn(client.send_file, input_file, ('127.0.0.1', 20000), "sender_driven", option)
+                sim.run(until)
+            client.sender_log.close()
+            server.receiver_log.close()
+        finally:
+            os.chdir(previous_dir)
+    completion_time, throughput, data_retransmissions, ack_retransmissions, ack_efficiency = sender.result or (sim.now, 0.0, 0, 0, 0.0)
+    return {
+        "protocol": "rdt3", "loss": loss, "option": option, "seed": seed,
+        "virtual_time": completion_time,
+        "wall_time": time.perf_counter() - start,
+        "ok": sender.result is not None and _same_file(input_file, output_file),
+        "sender": {"throughput": throughput, "data_retransmissions": data_retransmissions,
+                   "ack_retransmissions": ack_retransmissions, "ack_efficiency": ack_efficiency},
+        "channel": sim.stats(),
+        "events": sim.events_run,
+    }
+
+def simulate_receiver_driven(input_file, output_file, window=32, option=5, loss=0.0, seed=0, forward=None,
+                             reverse=None, until=None, quiet=True, work_dir=None):
+    # Runs the Phase 3 receiver-driven server_rd.receiver against the
+    # client_rd.sender loop. The sender serves requests until it is stopped,
+    # so the run ends with the receiver. Options 2 (sender) and 5 (receiver)
+    # drop packets at `loss`.
+    sim = Simulator(forward, reverse, seed)
+    input_file = os.path.abspath(input_file)
+    output_file = os.path.abspath(output_file)
+    previous_dir = os.getcwd()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(work_dir or scratch)
+        try:
+            client, server = load_phase3(PHASE3_RD_DIR, ("client_rd", "server_rd"))
+            client.SIM_LOSS_RATE = loss
+            client.option = option
+            with sim.patched(client, server), _quiet(quiet):
+                sim.spawn(client.sender, ('127.0.0.1', 10000), input_file, daemon=True)
+                receiver = sim.spawn(server.receiver, output_file, ('127.0.0.1', 10001), loss, option, window)
+                sim.run(until)
+            stats = client.live_stats.read()
+            server.receiver_log.close()
+            client.live_stats.close()
+            server.live_stats.close()
+        finally:
+            os.chdir(previous_dir)
+    ok = receiver.done and not receiver.aborted
+    return {
+        "protocol": "rd", "loss": loss, "option": option, "window": window, "seed": seed,
+        "virtual_time": receiver.finished_at if ok else sim.now,
+        "wall_time": time.perf_counter() - start,
+        "ok": ok and _same_file(input_file, output_file),
+        "sender": {"sent": stats["sent"], "acked": stats["acked"], "retransmissions": stats["retrans"],
+                   "rtt": stats["rtt"]},
+        "channel": sim.stats(),
+        "events": sim.events_run,
+    }
+
+@contextlib.contextmanager
+def _quiet(quiet):
+    if not quiet:
+        yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Simulate a transfer on a virtual clock")
+    parser.add_argument("input_file")
+    parser.add_argument("--output_file", default="simulated_output.bin")
+    parser.add_argument("--protocol", choices=["gbn", "rdt3", "rd"], default="gbn")
+    parser.add_argument("--loss", type=float, default=0.0, help="Protocol loss/error rate (0-1)")
+    parser.add_argument("--window_size", type=int, default=10, help="Go-Back-N window size, or requests in flight for rd")
+    parser.add_argument("--option", type=int, default=5, help="RDT 3.0 error option (1-5)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--forward", default=DEFAULT_RULE, help="Channel rule towards the receiver, e.g. delay=0.02,loss=0.05")
+    parser.add_argument("--reverse", default=DEFAULT_RULE, help="Channel rule towards the sender")
+    parser.add_argument("--verbose", action="store_true", help="Show the protocol's own output")
+    args = parser.parse_args()
+
+    forward, reverse = LinkRule.parse(args.forward), LinkRule.parse(args.reverse)
+    if args.protocol == "gbn":
+        result = simulate_go_back_n(args.input_file, args.output_file, args.window_size, args.loss, args.seed,
+                                    forward, reverse, quiet=not args.verbose)
+    elif args.protocol == "rdt3":
+        result = simulate_rdt3(args.input_file, args.output_file, args.option, args.loss, args.seed,
+                               forward, reverse, quiet=not args.verbose)
+    else:
+        result = simulate_receiver_driven(args.input_file, args.output_file, args.window_size, args.option,
+                                          args.loss, args.seed, forward, reverse, quiet=not args.verbose)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,173 @@
+import contextlib
+import csv
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+try:
+    from . import go_back_n, selective_repeat
+except ImportError:
+    import go_back_n
+    import selective_repeat
+
+# Parallel experiment sweeps. A matrix lists the values for each axis; every
+# combination is one configuration, run `trials` times. Configurations run in
+# a process pool, and each run gets its own receiver on its own port, so
+# nothing is shared between workers. Example matrix (JSON):
+#
+#     {"loss": [0.0, 0.1, 0.2], "timeout": [null, 0.05], "window": [10, 50],
+#      "protocol": ["gbn", "sr"], "options": {"SACK": [false, true]}, "trials": 3}
+#
+# A timeout of null keeps the adaptive RTO; a number is a fixed timeout.
+# "options" sets extra go_back_n module settings (ignored for "sr").
+
+BASE_PORT = 41000
+DEFAULT_MATRIX = {
+    "loss": [p / 100 for p in range(0, 75, 5)],
+    "timeout": [None],
+    "window": [10],
+    "protocol": ["gbn"],
+    "options": {},
+    "trials": 1,
+}
+
+def expand(matrix):
+    # Returns one dict per run: every combination of the axes times trials
+    matrix = dict(DEFAULT_MATRIX, **matrix)
+    options = matrix["options"]
+    option_names = sorted(options)
+    runs = []
+    for loss, timeout, window, protocol, *option_values in itertools.product(
+            matrix["loss"], matrix["timeout"], matrix["window"], matrix["protocol"],
+            *(options[name] for name in option_names)):
+        for trial in range(matrix["trials"]):
+            runs.append({"loss": loss, "timeout": timeout, "window": window, "protocol": protocol,
+                         "options": dict(zip(option_names, option_values)), "trial": trial})
+    return runs
+
+def run_one(config, input_file, port):
+    # Runs a single transfer in this worker process and returns its results
+    module = selective_repeat if config["protocol"] == "sr" else go_back_n
+    settings = {"DATA_LOSS_RATE": config["loss"], "ACK_LOSS_RATE": config["loss"], "BIT_ERROR_RATE": config["loss"]}
+    if config["timeout"] is not None:
+        settings["TIMEOUT"] = config["timeout"]
+    if module is go_back_n:
+        settings["ADAPTIVE_TIMEOUT"] = config["timeout"] is None
+        for name, value in config["options"].items():
+            if not hasattr(go_back_n, name):
+                raise ValueError(f"go_back_n has no setting '{name}'")
+            settings[name] = value
+    # Pool workers are reused, so put the module back the way we found it
+    original = {name: getattr(module, name) for name in settings}
+    for name, value in settings.items():
+        setattr(module, name, value)
+    try:
+        return _transfer(module, config, input_file, port)
+    finally:
+        for name, value in original.items():
+            setattr(module, name, value)
+
+def _transfer(module, config, input_file, port):
+    output = tempfile.NamedTemporaryFile(prefix="sweep_", suffix=".out", delete=False)
+    output.close()
+    try:
+        if module is go_back_n:
+            receive = lambda: go_back_n.run_go_back_n_receiver('127.0.0.1', port, output.name)
+            send = lambda: go_back_n.run_go_back_n_sender('127.0.0.1', port, input_file, config["window"])
+        else:
+            receive = lambda: selective_repeat.run_selective_repeat_receiver('127.0.0.1', port, output.name, config["window"])
+            send = lambda: selective_repeat.run_selective_repeat_sender('127.0.0.1', port, input_file, config["window"])
+
+        # Each transfer still prints its sender/receiver summary lines; keep
+        # worker output quiet
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            receiver_thread = threading.Thread(target=receive)
+            receiver_thread.start()
+            start = time.perf_counter()
+            sent = send()
+            elapsed = time.perf_counter() - start
+            receiver_thread.join()
+
+        with open(input_file, 'rb') as f, open(output.name, 'rb') as g:
+            ok = f.read() == g.read()
+        # Both senders return None when the END handshake never completed
+        if sent is None:
+            ok = False
+    finally:
+        os.remove(output.name)
+
+    size = os.path.getsize(input_file)
+    result = dict(config, port=port, completion_time=elapsed, throughput=size / elapsed if elapsed else 0.0, ok=ok)
+    stats = go_back_n.last_sender_stats if module is go_back_n else {}
+    result["retransmissions"] = stats.get("retransmissions")
+    result["avg_in_flight"] = stats.get("avg_in_flight")
+    return result
+
+def run_sweep(matrix, input_file, workers=None, base_port=BASE_PORT):
+    # Returns a list of result dicts in matrix order
+    runs = expand(matrix)
+    results = [None] * len(runs)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(run_one, config, input_file, base_port + index): index
+                   for index, config in enumerate(runs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            print(f"[{sum(r is not None for r in results)}/{len(runs)}] {format_result(results[index])}")
+    return results
+
+def format_result(result):
+    options = "".join(f" {k}={v}" for k, v in result["options"].items())
+    timeout = "adaptive" if result["timeout"] is None else result["timeout"]
+    return (f"{result['protocol']} loss={result['loss']:.2f} timeout={timeout} window={result['window']}"
+            f"{options} trial={result['trial']}: {result['completion_time']:.2f}s{'' if result['ok'] else ' FAILED'}")
+
+def summarize(results):
+    # Averages the trials of each configuration
+    groups = {}
+    for result in results:
+        key = (result["protocol"], result["loss"], result["timeout"], result["window"], json.dumps(result["options"], sort_keys=True))
+        groups.setdefault(key, []).append(result)
+    summary = []
+    for (protocol, loss, timeout, window, options), runs in groups.items():
+        summary.append({
+            "protocol": protocol, "loss": loss, "timeout": timeout, "window": window,
+            "options": json.loads(options), "trials": len(runs),
+            "completion_time": sum(r["completion_time"] for r in runs) / len(runs),
+            "throughput": sum(r["throughput"] for r in runs) / len(runs),
+            "ok": all(r["ok"] for r in runs),
+        })
+    return summary
+
+def write_csv(path, rows):
+    fields = list(rows[0].keys())
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, options=json.dumps(row["options"], sort_keys=True)))
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a sweep of transfer experiments in parallel")
+    parser.add_argument("input_file", help="File to transfer in every run")
+    parser.add_argument("--matrix", help="JSON file with the sweep matrix (default: Chart 1 loss sweep)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--base_port", type=int, default=BASE_PORT, help="First receiver port; run i uses base_port + i")
+    parser.add_argument("--csv", default="sweep_results.csv", help="Per-run results")
+    parser.add_argument("--summary", default="sweep_summary.json", help="Trial averages per configuration")
+    args = parser.parse_args()
+
+    matrix = {}
+    if args.matrix:
+        with open(args.matrix) as f:
+            matrix = json.load(f)
+    start = time.perf_counter()
+    results = run_sweep(matrix, args.input_file, args.workers, args.base_port)
+    write_csv(args.csv, results)
+    with open(args.summary, "w") as f:
+        json.dump(summarize(results), f, indent=2)
+    print(f"{len(results)} runs in {time.perf_counter() - start:.1f}s, results in {args.csv} and {args.summary}")
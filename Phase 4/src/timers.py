@@ -0,0 +1,94 @@
+import time
+
+# Hashed timer wheel for per-packet retransmission deadlines. Each deadline
+# lives in the slot for its tick, so start/restart/stop are dict operations
+# (O(1)) and expiry only scans the slots the clock has moved past. Deadlines
+# further out than one revolution share a slot with nearer ones and are
+# simply left in place until their own round comes up.
+
+class TimerWheel:
+    def __init__(self, tick=0.001, slots=512, clock=time.monotonic_ns):
+        self._tick_ns = max(1, int(tick * 1e9))
+        self._size = slots
+        self._slots = [{} for _ in range(slots)]
+        self._where = {}  # key -> (slot, interval_ns)
+        self._clock = clock
+        self._current_tick = clock() // self._tick_ns
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def start(self, key, interval):
+        # Starting a running timer restarts it with the new interval
+        self.stop(key)
+        interval_ns = int(interval * 1e9)
+        deadline = self._clock() + interval_ns
+        slot = (deadline // self._tick_ns) % self._size
+        self._slots[slot][key] = deadline
+        self._where[key] = (slot, interval_ns)
+
+    def restart(self, key):
+        _, interval_ns = self._where[key]
+        self.start(key, interval_ns / 1e9)
+
+    def stop(self, key):
+        entry = self._where.pop(key, None)
+        if entry is not None:
+            del self._slots[entry[0]][key]
+
+    def clear(self):
+        for slot in self._slots:
+            slot.clear()
+        self._where.clear()
+
+    def deadline(self, key):
+        slot, _ = self._where[key]
+        return self._slots[slot][key]
+
+    def expired(self):
+        # Removes and returns every key whose deadline has passed
+        now = self._clock()
+        now_tick = now // self._tick_ns
+        fired = []
+        if not self._where:
+            self._current_tick = now_tick
+            return fired
+        if now_tick - self._current_tick >= self._size:
+            ticks = range(self._size)
+        else:
+            ticks = range(self._current_tick, now_tick + 1)
+        for tick in ticks:
+            slot = self._slots[tick % self._size]
+            if not slot:
+                continue
+            due = [key for key, deadline in slot.items() if deadline <= now]
+            for key in due:
+                del slot[key]
+                del self._where[key]
+            fired.extend(due)
+        # The current tick's slot can still hold later deadlines, so it is
+        # scanned again next time rather than skipped
+        self._current_tick = now_tick
+        return fired
+
+    def next_timeout(self):
+        # Seconds until the earliest deadline (0 if already due), or None
+        # when nothing is scheduled. Meant to be called after expired().
+        if not self._where:
+            return None
+        now = self._clock()
+        for offset in range(self._size):
+            tick = self._current_tick + offset
+            slot = self._slots[tick % self._size]
+            if not slot:
+                continue
+            round_end = (tick + 1) * self._tick_ns
+            earliest = min((deadline for deadline in slot.values() if deadline < round_end), default=None)
+            if earliest is not None:
+                return max(0.0, (earliest - now) / 1e9)
+        # Everything is at least one full revolution away
+        earliest = min(self._slots[slot][key] for key, (slot, _) in self._where.items())
+        return max(0.0, (earliest - now) / 1e9)
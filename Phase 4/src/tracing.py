@@ -0,0 +1,122 @@
+import struct
+import time
+
+# Binary event tracing for the protocol loops. Every event is one fixed-size
+# record (timestamp, event type, seq, base, nextseq, window) packed into a
+# ring buffer allocated up front, so recording is a single pack_into and the
+# oldest events are overwritten once the buffer is full. The protocol
+# modules hold a module-level TRACER that is None by default; call sites
+# test it before recording, which is all tracing costs when it is off.
+#
+#     go_back_n.TRACER = Tracer()
+#     ... run a transfer ...
+#     go_back_n.TRACER.dump("sender.trace")
+#     python -m src.tracing sender.trace
+
+RECORD = struct.Struct("<dBxxxiiii")
+RECORD_SIZE = RECORD.size
+MAGIC = b"GBNTRACE"
+DEFAULT_CAPACITY = 1 << 16
+
+SEND = 1
+SEND_LOST = 2
+WINDOW_FULL = 3
+TIMEOUT = 4
+RETRANSMIT = 5
+ACK_RECEIVED = 6
+RECEIVED = 7
+OUT_OF_ORDER = 8
+CHECKSUM_ERROR = 9
+HELD = 10
+FEC_REBUILT = 11
+ACK_SENT = 12
+ACK_LOST = 13
+
+EVENT_NAMES = {
+    SEND: "send", SEND_LOST: "send-lost", WINDOW_FULL: "window-full", TIMEOUT: "timeout",
+    RETRANSMIT: "retransmit", ACK_RECEIVED: "ack-received", RECEIVED: "received",
+    OUT_OF_ORDER: "out-of-order", CHECKSUM_ERROR: "checksum-error", HELD: "held",
+    FEC_REBUILT: "fec-rebuilt", ACK_SENT: "ack-sent", ACK_LOST: "ack-lost",
+}
+
+class Tracer:
+    def __init__(self, capacity=DEFAULT_CAPACITY, clock=time.monotonic):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD_SIZE)
+        self.clock = clock
+        self.position = 0  # next slot to write
+        self.recorded = 0  # events ever recorded, including overwritten ones
+        self._pack = RECORD.pack_into
+
+    def record(self, event, seq, base=0, nextseq=0, window=0):
+        self._pack(self.buffer, self.position * RECORD_SIZE, self.clock(), event, seq, base, nextseq, window)
+        self.position += 1
+        if self.position == self.capacity:
+            self.position = 0
+        self.recorded += 1
+
+    def __len__(self):
+        return min(self.recorded, self.capacity)
+
+    @property
+    def overwritten(self):
+        return max(0, self.recorded - self.capacity)
+
+    def raw(self):
+        # The held records, oldest first
+        if self.recorded <= self.capacity:
+            return bytes(self.buffer[:self.position * RECORD_SIZE])
+        split = self.position * RECORD_SIZE
+        return bytes(self.buffer[split:] + self.buffer[:split])
+
+    def events(self):
+        return list(RECORD.iter_unpack(self.raw()))
+
+    def clear(self):
+        self.position = 0
+        self.recorded = 0
+
+    def dump(self, path):
+        # MAGIC, overwritten count, then the records
+        with open(path, 'wb') as f:
+            f.write(MAGIC + struct.pack("<Q", self.overwritten))
+            f.write(self.raw())
+
+def load(path):
+    # Returns (events, overwritten) from a dump() file
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a trace file")
+    header = len(MAGIC) + 8
+    overwritten = struct.unpack_from("<Q", data, len(MAGIC))[0]
+    body = data[header:]
+    body = body[:len(body) - len(body) % RECORD_SIZE]
+    return list(RECORD.iter_unpack(body)), overwritten
+
+def format_event(event, start=0.0):
+    timestamp, kind, seq, base, nextseq, window = event
+    return (f"{timestamp - start:12.6f} {EVENT_NAMES.get(kind, str(kind)):15s} seq={seq} "
+            f"base={base} next={nextseq} window={window}")
+
+def decode(events):
+    # Text lines with timestamps relative to the first event
+    start = events[0][0] if events else 0.0
+    return [format_event(event, start) for event in events]
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Decode a binary protocol trace to text")
+    parser.add_argument("trace_file")
+    parser.add_argument("--output", help="Write the text here instead of stdout")
+    args = parser.parse_args()
+
+    events, overwritten = load(args.trace_file)
+    lines = decode(events)
+    if overwritten:
+        lines.insert(0, f"# {overwritten} earlier events were overwritten")
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write("\n".join(lines) + "\n")
+    else:
+        print("\n".join(lines))
@@ -1,6 +1,10 @@
 import random
 import time
 import struct
+try:
+    from .checksum import checksum16, packet_checksum, verify_packet
+except ImportError:
+    from checksum import checksum16, packet_checksum, verify_packet
 
 def simulate_loss(probability):
     return random.random() < probability
@@ -23,20 +27,10 @@ def write_bmp_file(file_path, data):
         bmp_file.write(data)
 
 def calculate_checksum(data):
-    checksum = 0
-    for byte in data:
-        checksum += byte
-        checksum &= 0xFFFF
-    return checksum
+    return checksum16(data)
 
 def verify_checksum(packet):
-    header_format = "!II4sH"
-    header_size = struct.calcsize(header_format)
-    header = packet[:header_size]
-    data = packet[header_size:-2]
-    received_checksum = struct.unpack("!H", packet[-2:])[0]
-    calculated_checksum = calculate_checksum(header + data)
-    return received_checksum == calculated_checksum
+    return verify_packet(packet)
 
 def extract_sequence_number(packet):
     header_format = "!II4sH"
@@ -50,6 +44,10 @@ def extract_data(packet):
     header_size = struct.calcsize(header_format)
     return packet[header_size:-2]
 
+def extract_packet_type(packet):
+    # The type field is 4 bytes wide, so b'ACK' comes back NUL padded
+    return packet[8:12].rstrip(b'\x00')
+
 def make_packet(sequence_number, data, packet_type=b'DATA'):
     header_format = "!II4sH"
     header_size = struct.calcsize(header_format)
@@ -57,18 +55,32 @@ def make_packet(sequence_number, data, packet_type=b'DATA'):
     if not isinstance(data, bytes):
         data = data.encode()
 
-    checksum_data = packet_type + struct.pack("!II", sequence_number, len(data)) + data
-    checksum = calculate_checksum(checksum_data)
+    checksum = packet_checksum(sequence_number, data, packet_type)
     header = struct.pack(header_format, sequence_number, len(data), packet_type, checksum)
     return header + data + struct.pack("!H", checksum)
 
+# SACK: an ACK's payload lists up to MAX_SACK_BLOCKS [start, end) ranges of
+# packets held above the cumulative ACK, lowest first
+SACK_BLOCK_FORMAT = "!II"
+SACK_BLOCK_SIZE = struct.calcsize(SACK_BLOCK_FORMAT)
+MAX_SACK_BLOCKS = 4
+
+def make_ack(sequence_number, sack_blocks=()):
+    payload = b''.join(struct.pack(SACK_BLOCK_FORMAT, start, end) for start, end in sack_blocks[:MAX_SACK_BLOCKS])
+    return make_packet(sequence_number, payload, packet_type=b'ACK')
+
+def extract_sack_blocks(packet):
+    data = extract_data(packet)
+    return [struct.unpack_from(SACK_BLOCK_FORMAT, data, offset)
+            for offset in range(0, len(data) - SACK_BLOCK_SIZE + 1, SACK_BLOCK_SIZE)]
+
 class Timer:
     def __init__(self):
         self.start_time = None
         self.interval = None
 
     def start(self, interval):
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.interval = interval
 
     def stop(self):
@@ -78,7 +90,7 @@ class Timer:
     def is_expired(self):
         if self.start_time is None:
             return False
-        return (time.time() - self.start_time) > self.interval
+        return (time.monotonic() - self.start_time) > self.interval
 
     def restart(self):
         self.start(self.interval)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import unittest
+from src.ack_policy import AckPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+class TestAckPolicy(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_ack_every_packet(self):
+        policy = AckPolicy(every=1, clock=self.clock)
+        for _ in range(5):
+            self.assertTrue(policy.on_data())
+            policy.sent()
+        self.assertEqual(policy.acks_saved(), 0)
+
+    def test_ack_every_k(self):
+        policy = AckPolicy(every=4, delay=1.0, clock=self.clock)
+        sent = 0
+        for _ in range(12):
+            if policy.on_data():
+                policy.sent()
+                sent += 1
+        self.assertEqual(sent, 3)
+        self.assertEqual(policy.stats()["acks_saved"], 9)
+
+    def test_delay_timer(self):
+        policy = AckPolicy(every=4, delay=0.005, clock=self.clock)
+        self.assertFalse(policy.on_data())
+        self.assertAlmostEqual(policy.next_timeout(), 0.005)
+        self.clock.now += 0.002
+        self.assertFalse(policy.on_data())
+        self.assertFalse(policy.due())
+        self.clock.now += 0.003
+        self.assertTrue(policy.due())
+        policy.sent()
+        self.assertIsNone(policy.next_timeout())
+
+    def test_gap_acks_immediately(self):
+        policy = AckPolicy(every=4, delay=1.0, clock=self.clock)
+        policy.on_data()
+        self.assertTrue(policy.on_gap())
+        policy.sent()
+        self.assertFalse(policy.due())
+        self.assertEqual(policy.pending, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import socket
+import time
+import unittest
+from src import async_go_back_n
+from src.congestion import CongestionControl
+from src.async_go_back_n import open_receiver, send_file
+
+class PacedWindow(CongestionControl):
+    # One packet every INTERVAL seconds, whatever the window allows
+    INTERVAL = 0.01
+
+    def __init__(self, max_window, clock=time.monotonic):
+        super().__init__(max_window, clock)
+        self.next_send_time = 0.0
+        self.sends = 0
+
+    def pacing_delay(self, now=None):
+        return max(0.0, self.next_send_time - self.clock())
+
+    def on_send(self, now=None):
+        self.sends += 1
+        self.next_send_time = self.clock() + self.INTERVAL
+
+class TestAsyncGoBackN(unittest.TestCase):
+    def setUp(self):
+        self.original_rates = (async_go_back_n.DATA_LOSS_RATE, async_go_back_n.ACK_LOSS_RATE, async_go_back_n.BIT_ERROR_RATE)
+        self.original_controller = async_go_back_n.make_controller
+        self.original_max_timeouts = async_go_back_n.MAX_TIMEOUTS
+        self.paths = []
+
+    def tearDown(self):
+        async_go_back_n.DATA_LOSS_RATE, async_go_back_n.ACK_LOSS_RATE, async_go_back_n.BIT_ERROR_RATE = self.original_rates
+        async_go_back_n.make_controller = self.original_controller
+        async_go_back_n.MAX_TIMEOUTS = self.original_max_timeouts
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def make_input(self, name, size):
+        path = f'test_async_{name}.bin'
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        self.paths.extend([path, path + '.out'])
+        return path
+
+    async def transfer(self, input_file, window_size=10):
+        receiver = await open_receiver('127.0.0.1', 0, input_file + '.out')
+        sent = await send_file('127.0.0.1', receiver.port, input_file, window_size)
+        received = await asyncio.wait_for(receiver.done, 30)
+        await receiver.closed
+        return sent, received
+
+    def assert_same(self, input_file):
+        with open(input_file, 'rb') as f, open(input_file + '.out', 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_single_transfer_with_loss(self):
+        async_go_back_n.DATA_LOSS_RATE = async_go_back_n.ACK_LOSS_RATE = async_go_back_n.BIT_ERROR_RATE = 0.1
+        path = self.make_input('single', 64 * 1024 + 5)
+        sent, received = asyncio.run(self.transfer(path))
+        self.assertEqual(sent, received)
+        self.assert_same(path)
+
+    def test_concurrent_transfers(self):
+        async_go_back_n.DATA_LOSS_RATE = async_go_back_n.ACK_LOSS_RATE = async_go_back_n.BIT_ERROR_RATE = 0.05
+        paths = [self.make_input(i, 8 * 1024 + i) for i in range(100)]
+
+        async def run_all():
+            return await asyncio.gather(*(self.transfer(path) for path in paths))
+
+        results = asyncio.run(run_all())
+        for path, (sent, received) in zip(paths, results):
+            self.assertEqual(sent, os.path.getsize(path))
+            self.assertEqual(received, sent)
+            self.assert_same(path)
+
+    def test_empty_file(self):
+        path = self.make_input('empty', 0)
+        self.assertEqual(asyncio.run(self.transfer(path)), (0, 0))
+
+    def test_pacing_spaces_out_sends(self):
+        controllers = []
+
+        def make_controller(name, max_window):
+            controllers.append(PacedWindow(max_window))
+            return controllers[-1]
+
+        async_go_back_n.make_controller = make_controller
+        path = self.make_input('paced', 20 * 1024)
+        start = time.monotonic()
+        sent, received = asyncio.run(self.transfer(path))
+        elapsed = time.monotonic() - start
+        self.assertEqual(sent, received)
+        self.assert_same(path)
+        self.assertEqual(controllers[0].sends, 20)
+        self.assertGreaterEqual(elapsed, 19 * PacedWindow.INTERVAL)
+
+    def test_unacknowledged_end_fails(self):
+        # A receiver that never answers: the END retries run out
+        path = self.make_input('no_receiver', 0)
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+        try:
+            with self.assertRaises(TimeoutError):
+                asyncio.run(send_file('127.0.0.1', silent.getsockname()[1], path))
+        finally:
+            silent.close()
+
+    def test_unacknowledged_data_fails(self):
+        # No receiver at all: the data retransmissions run out instead of
+        # backing off forever. Few timeouts keep the backoff short.
+        async_go_back_n.MAX_TIMEOUTS = 3
+        path = self.make_input('no_receiver_data', 4096)
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+        try:
+            with self.assertRaises(TimeoutError):
+                asyncio.run(asyncio.wait_for(send_file('127.0.0.1', silent.getsockname()[1], path), 30))
+        finally:
+            silent.close()
+
+if __name__ == '__main__':
+    unittest.main()
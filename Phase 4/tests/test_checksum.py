@@ -0,0 +1,45 @@
+import os
+import unittest
+from src.checksum import byte_sum, checksum16, update_checksum16, packet_checksum, verify_packet
+from src.utils import make_packet
+
+def reference_checksum(data):
+    checksum = 0
+    for byte in data:
+        checksum += byte
+        checksum &= 0xFFFF
+    return checksum
+
+class TestChecksum(unittest.TestCase):
+    def test_matches_per_byte_loop(self):
+        for size in (0, 1, 63, 64, 65, 255, 256, 257, 1038, 5000):
+            for data in (os.urandom(size), b'\xff' * size):
+                self.assertEqual(byte_sum(data), sum(data))
+                self.assertEqual(checksum16(data), reference_checksum(data))
+
+    def test_byte_sum_range(self):
+        data = os.urandom(1038)
+        self.assertEqual(byte_sum(data, 14, 1036), sum(data[14:1036]))
+
+    def test_incremental_update(self):
+        data = os.urandom(1024)
+        header = b'\x00\x00\x00\x01'
+        new_header = b'\x00\x00\x00\x02'
+        checksum = checksum16(header + data)
+        self.assertEqual(update_checksum16(checksum, header, new_header), checksum16(new_header + data))
+
+    def test_packet_checksum_reuses_data_sum(self):
+        data = os.urandom(1024)
+        self.assertEqual(packet_checksum(7, data, data_sum=byte_sum(data)), packet_checksum(7, data))
+
+    def test_verify_packet(self):
+        packet = make_packet(3, os.urandom(1024))
+        self.assertTrue(verify_packet(packet))
+        self.assertTrue(verify_packet(bytearray(packet)))
+        corrupted = bytearray(packet)
+        corrupted[100] ^= 0x01
+        self.assertFalse(verify_packet(corrupted))
+        self.assertFalse(verify_packet(packet[:10]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import io
+import os
+import unittest
+from src.codec import BufferPool, encode_into, encode_from_file, decode
+from src.utils import make_packet, verify_checksum
+
+class TestCodec(unittest.TestCase):
+    def test_encode_matches_make_packet(self):
+        pool = BufferPool(2)
+        data = os.urandom(1024)
+        packet = encode_into(pool.acquire(), 5, data)
+        self.assertEqual(bytes(packet), make_packet(5, data))
+        ack = encode_into(pool.acquire(), 5, b'', packet_type=b'ACK')
+        self.assertEqual(bytes(ack), make_packet(5, b'', packet_type=b'ACK'))
+
+    def test_encode_from_file(self):
+        data = os.urandom(1500)
+        file = io.BytesIO(data)
+        pool = BufferPool(1)
+        first = encode_from_file(pool.acquire(), 0, file)
+        second = encode_from_file(pool.acquire(), 1, file)
+        self.assertEqual(bytes(first), make_packet(0, data[:1024]))
+        self.assertEqual(bytes(second), make_packet(1, data[1024:]))
+        self.assertIsNone(encode_from_file(pool.acquire(), 2, file))
+
+    def test_decode_is_zero_copy(self):
+        buffer = bytearray(2048)
+        packet = encode_into(buffer, 9, b'payload')
+        self.assertTrue(verify_checksum(packet))
+        seq, packet_type, payload = decode(packet)
+        self.assertEqual((seq, packet_type, bytes(payload)), (9, b'DATA', b'payload'))
+        self.assertIs(payload.obj, buffer)
+
+    def test_pool_recycles_buffers(self):
+        pool = BufferPool(2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.acquire()
+        pool.acquire()
+        self.assertEqual(pool.allocated, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from src.congestion import FixedWindow, Reno, BbrLike, make_controller
+
+class TestCongestionControl(unittest.TestCase):
+    def test_fixed_window(self):
+        cc = FixedWindow(10)
+        cc.on_timeout()
+        self.assertEqual(cc.window(), 10)
+
+    def test_reno_slow_start_and_avoidance(self):
+        cc = Reno(50)
+        cc.ssthresh = 8
+        for _ in range(3):
+            cc.on_ack(cc.window())
+        self.assertEqual(cc.window(), 8)
+        cc.on_ack(8)
+        self.assertAlmostEqual(cc.cwnd, 9, delta=0.1)
+
+    def test_reno_loss_response(self):
+        cc = Reno(50, initial_window=20)
+        for _ in range(3):
+            cc.on_duplicate_ack()
+        self.assertEqual(cc.window(), 10)
+        cc.on_timeout()
+        self.assertEqual(cc.window(), 1)
+        self.assertEqual(cc.ssthresh, 5)
+        self.assertEqual(cc.losses, 2)
+
+    def test_bbr_tracks_bandwidth_and_paces(self):
+        now = 0.0
+        cc = BbrLike(100, clock=lambda: now)
+        # 1000 packets/s path with a 10 ms RTT
+        for _ in range(400):
+            now += 0.001
+            cc.on_ack(1, rtt=0.010, now=now)
+        self.assertAlmostEqual(cc.btl_bw, 1000, delta=50)
+        self.assertEqual(cc.min_rtt, 0.010)
+        self.assertNotEqual(cc.state, "startup")
+        self.assertAlmostEqual(cc.cwnd, 20, delta=1)
+        cc.on_send(now)
+        self.assertGreater(cc.pacing_delay(now), 0)
+
+    def test_make_controller(self):
+        self.assertIsInstance(make_controller("reno", 10), Reno)
+        with self.assertRaises(ValueError):
+            make_controller("vegas", 10)
+
+if __name__ == '__main__':
+    unittest.main()
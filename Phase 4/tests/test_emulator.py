@@ -0,0 +1,83 @@
+import os
+import threading
+import unittest
+from src import go_back_n
+from src.emulator import Link, LinkRule, GilbertElliott, UdpProxy
+
+class TestLink(unittest.TestCase):
+    def run_link(self, rule, seed, count=2000):
+        link = Link(rule, seed)
+        return [link.transmit(bytes([i % 256]) * 100, i * 0.001) for i in range(count)], link.stats
+
+    def test_same_seed_same_outcome(self):
+        rule = LinkRule(delay=0.01, jitter=0.002, loss=0.1, duplicate=0.05, reorder=0.05, bit_error=0.05, ge_p=0.02, ge_r=0.3)
+        first, stats = self.run_link(rule, 42)
+        second, _ = self.run_link(rule, 42)
+        third, _ = self.run_link(rule, 43)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+        for name in ("lost", "burst_lost", "duplicated", "reordered", "corrupted"):
+            self.assertGreater(stats[name], 0)
+
+    def test_loss_rate(self):
+        _, stats = self.run_link(LinkRule(loss=0.2), 1, count=10000)
+        self.assertAlmostEqual(stats["lost"] / stats["packets"], 0.2, delta=0.02)
+
+    def test_gilbert_elliott_bursts(self):
+        import random
+        rng = random.Random(5)
+        model = GilbertElliott(p=0.05, r=0.25)
+        losses = [model.lost(rng) for _ in range(20000)]
+        # Stationary loss is p / (p + r); losses come in runs averaging 1 / r
+        self.assertAlmostEqual(sum(losses) / len(losses), 0.05 / 0.30, delta=0.03)
+        runs = sum(1 for a, b in zip(losses, losses[1:]) if b and not a)
+        self.assertAlmostEqual(sum(losses) / runs, 4, delta=1)
+
+    def test_rate_and_queue(self):
+        link = Link(LinkRule(rate=100000, queue=5), 0)
+        deliveries = [link.transmit(b'x' * 1000, 0.0) for _ in range(10)]
+        self.assertEqual(sum(1 for d in deliveries if d), 5)
+        self.assertEqual(link.stats["queue_dropped"], 5)
+        self.assertAlmostEqual(deliveries[4][0][0], 0.05)
+
+    def test_parse(self):
+        rule = LinkRule.parse("delay=0.02, queue=8,ge_p=0.01")
+        self.assertEqual((rule.delay, rule.queue, rule.ge_p), (0.02, 8, 0.01))
+        with self.assertRaises(ValueError):
+            LinkRule.parse("latency=1")
+
+class TestUdpProxy(unittest.TestCase):
+    def setUp(self):
+        self.input_file = 'test_emulator_input.bin'
+        self.output_file = 'test_emulator_output.bin'
+        self.original_rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        with open(self.input_file, 'wb') as f:
+            f.write(os.urandom(64 * 1024 + 9))
+
+    def tearDown(self):
+        go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = self.original_rates
+        for path in (self.input_file, self.output_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_transfer_through_proxy(self):
+        # All impairments come from the proxy, none from the protocol code
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.0
+        forward = LinkRule(delay=0.002, jitter=0.001, loss=0.05, reorder=0.05, duplicate=0.02, bit_error=0.02)
+        reverse = LinkRule(delay=0.002, ge_p=0.02, ge_r=0.5)
+        proxy = UdpProxy(('127.0.0.1', 0), ('127.0.0.1', 54450), forward, reverse, seed=3).start()
+        try:
+            receiver_thread = threading.Thread(target=go_back_n.run_go_back_n_receiver, args=('127.0.0.1', 54450, self.output_file))
+            receiver_thread.start()
+            go_back_n.run_go_back_n_sender('127.0.0.1', proxy.port, self.input_file, 10)
+            receiver_thread.join(timeout=30)
+        finally:
+            proxy.stop()
+        with open(self.input_file, 'rb') as f, open(self.output_file, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+        stats = proxy.stats()
+        self.assertGreater(stats["forward"]["lost"], 0)
+        self.assertGreater(stats["reverse"]["packets"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+from src.fec import FecEncoder, FecDecoder, group_size_for_loss, MAX_GROUP
+from src.utils import verify_checksum, extract_sequence_number, extract_data
+
+class TestFec(unittest.TestCase):
+    def encode(self, payloads, k, first_seq=0):
+        encoder = FecEncoder(k, 1024)
+        parities = []
+        for i, data in enumerate(payloads):
+            parity = encoder.add(first_seq + i, data)
+            if parity is not None:
+                parities.append(parity)
+        parity = encoder.flush()
+        if parity is not None:
+            parities.append(parity)
+        return parities
+
+    def test_rebuilds_any_single_loss(self):
+        payloads = [os.urandom(1024) for _ in range(3)] + [os.urandom(100)]
+        parity, = self.encode(payloads, 4, first_seq=8)
+        self.assertTrue(verify_checksum(parity))
+        self.assertEqual(extract_sequence_number(parity), 8)
+        for lost in range(4):
+            decoder = FecDecoder()
+            for i, data in enumerate(payloads):
+                if i != lost:
+                    self.assertEqual(decoder.add_data(8 + i, data), [])
+            self.assertEqual(decoder.add_parity(8, extract_data(parity)), [(8 + lost, payloads[lost])])
+
+    def test_parity_before_data(self):
+        payloads = [os.urandom(500) for _ in range(4)]
+        parity, = self.encode(payloads, 4)
+        decoder = FecDecoder()
+        self.assertEqual(decoder.add_parity(0, extract_data(parity)), [])
+        decoder.add_data(0, payloads[0])
+        decoder.add_data(2, payloads[2])
+        self.assertEqual(decoder.add_data(3, payloads[3]), [(1, payloads[1])])
+        self.assertEqual(decoder.recovered, 1)
+
+    def test_two_losses_are_not_recoverable(self):
+        payloads = [os.urandom(64) for _ in range(4)]
+        parity, = self.encode(payloads, 4)
+        decoder = FecDecoder()
+        decoder.add_data(0, payloads[0])
+        decoder.add_data(1, payloads[1])
+        self.assertEqual(decoder.add_parity(0, extract_data(parity)), [])
+
+    def test_partial_last_group(self):
+        parities = self.encode([b'a'] * 5, 2)
+        self.assertEqual([extract_sequence_number(p) for p in parities], [0, 2, 4])
+
+    def test_adaptive_group_size(self):
+        self.assertEqual(group_size_for_loss(0.0), MAX_GROUP)
+        self.assertEqual(group_size_for_loss(0.2), 2)
+        self.assertEqual(group_size_for_loss(0.05), 9)
+        encoder = FecEncoder(8, 1024, adaptive=True)
+        encoder.on_delivery(80, 20)
+        for seq in range(8):
+            encoder.add(seq, b'x')
+        self.assertEqual(encoder.k, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
-from src.utils import calculate_checksum, verify_checksum, make_packet, extract_sequence_number, extract_data
+import os
+import threading
+from src import go_back_n, receiver
+from src.utils import calculate_checksum, verify_checksum, make_packet, make_ack, extract_sack_blocks, extract_sequence_number, extract_data
 
 class TestGoBackN(unittest.TestCase):
     def test_make_packet(self):
@@ -13,5 +16,79 @@ class TestGoBackN(unittest.TestCase):
         packet = make_packet(0, data)
         self.assertTrue(verify_checksum(packet))
 
+    def test_sack_blocks(self):
+        ack = make_ack(4, [(6, 8), (10, 11)])
+        self.assertTrue(verify_checksum(ack))
+        self.assertEqual(extract_sequence_number(ack), 4)
+        self.assertEqual(extract_sack_blocks(ack), [(6, 8), (10, 11)])
+        self.assertEqual(extract_sack_blocks(make_ack(4)), [])
+        self.assertEqual(make_ack(4), make_packet(4, b'', packet_type=b'ACK'))
+
+class TestGoBackNTransfer(unittest.TestCase):
+    def setUp(self):
+        self.host = 'localhost'
+        self.port = 54410
+        self.input_file = 'test_gbn_input.bmp'
+        self.output_file = 'test_gbn_output.bmp'
+        self.original_rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        with open(self.input_file, 'wb') as f:
+            f.write(os.urandom(100 * 1024 + 7))
+
+    def tearDown(self):
+        go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = self.original_rates
+        for path in (self.input_file, self.output_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def transfer(self, receive, loss_rate, window_size=10):
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = loss_rate
+        receiver_thread = threading.Thread(target=receive, args=(self.host, self.port, self.output_file))
+        receiver_thread.start()
+        go_back_n.run_go_back_n_sender(self.host, self.port, self.input_file, window_size)
+        receiver_thread.join(timeout=30)
+        self.assertFalse(receiver_thread.is_alive())
+        with open(self.input_file, 'rb') as f, open(self.output_file, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_window_is_kept_full(self):
+        self.transfer(go_back_n.run_go_back_n_receiver, 0.0)
+        self.assertEqual(go_back_n.last_sender_stats["peak_in_flight"], 10)
+        self.assertGreater(go_back_n.last_sender_stats["avg_in_flight"], 1)
+
+    def test_transfer_with_loss(self):
+        self.transfer(go_back_n.run_go_back_n_receiver, 0.1)
+
+    def test_transfer_to_standalone_receiver(self):
+        self.transfer(receiver.run_go_back_n_receiver, 0.1)
+
+    def test_sack_retransmits_only_holes(self):
+        original = go_back_n.SACK
+        try:
+            go_back_n.SACK = True
+            self.transfer(receiver.run_go_back_n_receiver, 0.2)
+            self.assertGreater(go_back_n.last_sender_stats["sack_skipped"], 0)
+        finally:
+            go_back_n.SACK = original
+
+    def test_fec_recovers_without_retransmission(self):
+        originals = (go_back_n.FEC_GROUP, go_back_n.FEC_ADAPTIVE)
+        try:
+            go_back_n.FEC_GROUP = 4
+            go_back_n.FEC_ADAPTIVE = True
+            self.transfer(receiver.run_go_back_n_receiver, 0.1)
+            self.assertGreater(go_back_n.last_sender_stats["parity_packets"], 0)
+            self.assertGreater(go_back_n.last_receiver_stats["fec_recovered"], 0)
+        finally:
+            go_back_n.FEC_GROUP, go_back_n.FEC_ADAPTIVE = originals
+
+    def test_thinned_acks(self):
+        originals = (go_back_n.ACK_EVERY, go_back_n.ACK_DELAY)
+        try:
+            go_back_n.ACK_EVERY = 4
+            self.transfer(receiver.run_go_back_n_receiver, 0.05)
+            self.assertGreater(go_back_n.last_receiver_stats["acks_saved"], 0)
+        finally:
+            go_back_n.ACK_EVERY, go_back_n.ACK_DELAY = originals
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import os
+import socket
+import threading
+import unittest
+from src import go_back_n
+from src.offload import SegmentBatcher, GroSocket
+from src.utils import make_packet, verify_checksum, extract_sequence_number
+
+class TestSegmentOffload(unittest.TestCase):
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.receiver.bind(('127.0.0.1', 0))
+        self.receiver.settimeout(1.0)
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def tearDown(self):
+        self.sender.close()
+        self.receiver.close()
+
+    def round_trip(self, use_gso):
+        rx = GroSocket(self.receiver)
+        tx = SegmentBatcher(self.sender, use_gso=use_gso)
+        address = self.receiver.getsockname()
+        packets = [make_packet(seq, os.urandom(1024)) for seq in range(20)]
+        packets.append(make_packet(20, b'short tail'))
+        for packet in packets:
+            tx.sendto(packet, address)
+        tx.flush()
+        received = [rx.recvfrom(2048)[0] for _ in packets]
+        self.assertEqual(received, packets)
+        self.assertTrue(all(verify_checksum(p) for p in received))
+        return tx
+
+    def test_batched_round_trip(self):
+        tx = self.round_trip(use_gso=True)
+        if tx.enabled:
+            self.assertLess(tx.syscalls, tx.packets)
+
+    def test_per_packet_fallback(self):
+        tx = self.round_trip(use_gso=False)
+        self.assertEqual(tx.syscalls, 21)
+
+    def test_plain_datagram_through_gro_socket(self):
+        rx = GroSocket(self.receiver)
+        self.sender.sendto(make_packet(7, b'x'), self.receiver.getsockname())
+        packet, _ = rx.recvfrom(2048)
+        self.assertEqual(extract_sequence_number(packet), 7)
+
+class TestGoBackNOffloadTransfer(unittest.TestCase):
+    def setUp(self):
+        self.input_file = 'test_offload_input.bmp'
+        self.output_file = 'test_offload_output.bmp'
+        self.original = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE, go_back_n.SEGMENT_OFFLOAD)
+        with open(self.input_file, 'wb') as f:
+            f.write(os.urandom(64 * 1024 + 3))
+
+    def tearDown(self):
+        (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE, go_back_n.SEGMENT_OFFLOAD) = self.original
+        for path in (self.input_file, self.output_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_transfer_with_offload(self):
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.1
+        go_back_n.SEGMENT_OFFLOAD = True
+        receiver_thread = threading.Thread(target=go_back_n.run_go_back_n_receiver, args=('localhost', 54430, self.output_file))
+        receiver_thread.start()
+        go_back_n.run_go_back_n_sender('localhost', 54430, self.input_file, 20)
+        receiver_thread.join(timeout=30)
+        self.assertFalse(receiver_thread.is_alive())
+        with open(self.input_file, 'rb') as f, open(self.output_file, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import os
+import unittest
+from src.reassembly import StreamingReassembler
+
+class TestStreamingReassembler(unittest.TestCase):
+    def setUp(self):
+        self.chunks = [os.urandom(100) for _ in range(20)]
+        self.expected = b''.join(self.chunks)
+
+    def test_in_order(self):
+        out = io.BytesIO()
+        stream = StreamingReassembler(out, flush_bytes=250)
+        for seq, chunk in enumerate(self.chunks):
+            self.assertTrue(stream.add(seq, chunk))
+        # Batched writes reach the file before close
+        self.assertGreater(len(out.getvalue()), 0)
+        stream.close()
+        self.assertEqual(out.getvalue(), self.expected)
+        self.assertEqual(stream.delivered_bytes, len(self.expected))
+
+    def test_out_of_order_and_duplicates(self):
+        out = io.BytesIO()
+        stream = StreamingReassembler(out)
+        order = list(range(19, -1, -1))
+        for seq in order:
+            stream.add(seq, memoryview(bytearray(self.chunks[seq])))
+        self.assertFalse(stream.add(3, self.chunks[3]))
+        self.assertTrue(stream.has(19))
+        stream.close()
+        self.assertEqual(out.getvalue(), self.expected)
+        self.assertEqual(stream.buffered_bytes(), 0)
+
+    def test_held_ranges(self):
+        stream = StreamingReassembler(io.BytesIO(), memory_budget=250)
+        for seq in (2, 3, 5, 7, 8, 9, 12):
+            stream.add(seq, self.chunks[seq])
+        self.assertEqual(stream.held_ranges(), [(2, 4), (5, 6), (7, 10), (12, 13)])
+        self.assertEqual(stream.held_ranges(2), [(2, 4), (5, 6)])
+        stream.add(0, self.chunks[0])
+        stream.add(1, self.chunks[1])
+        self.assertEqual(stream.held_ranges(), [(5, 6), (7, 10), (12, 13)])
+
+    def test_spills_past_memory_budget(self):
+        out = io.BytesIO()
+        stream = StreamingReassembler(out, memory_budget=500)
+        for seq in range(1, 20):
+            stream.add(seq, self.chunks[seq])
+        self.assertLessEqual(stream.held_bytes, 500)
+        self.assertEqual(stream.spilled_packets, 14)
+        self.assertFalse(stream.add(15, self.chunks[15]))
+        stream.add(0, self.chunks[0])
+        stream.close()
+        self.assertEqual(out.getvalue(), self.expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
+from src import go_back_n, receiver
 from src.receiver import run_go_back_n_receiver
+from src.utils import make_packet, verify_checksum, extract_sequence_number, extract_packet_type
 import socket
 import os
 import threading
@@ -10,12 +12,15 @@ class TestReceiver(unittest.TestCase):
         self.port = 54321
         self.output_file = 'received_image.bmp'
         self.test_image_path = 'test_image.bmp'
-        
-        # Create a dummy BMP file for testing
+        self.rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.0
+
+        # Create a dummy BMP file for testing, a few packets long
         with open(self.test_image_path, 'wb') as f:
-            f.write(b'BM' + bytes(100) + b'\x00' * 100)  # Simple BMP header + dummy data
+            f.write(b'BM' + bytes(100) + os.urandom(3000))
 
     def tearDown(self):
+        go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = self.rates
         if os.path.exists(self.output_file):
             try:
                 os.remove(self.output_file)
@@ -24,25 +29,42 @@ class TestReceiver(unittest.TestCase):
         if os.path.exists(self.test_image_path):
             os.remove(self.test_image_path)
 
+    def send_and_wait_for_ack(self, sock, packet, seq):
+        # Stop-and-wait: resend until the matching ACK comes back
+        for _ in range(50):
+            sock.sendto(packet, (self.host, self.port))
+            try:
+                ack, _ = sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            if verify_checksum(ack) and extract_packet_type(ack) == receiver.ACK_SIGNAL and extract_sequence_number(ack) == seq:
+                return
+        self.fail(f"no ACK for packet {seq}")
+
     def test_receiver_functionality(self):
         # Start the receiver in a separate thread
         receiver_thread = threading.Thread(target=run_go_back_n_receiver, args=(self.host, self.port, self.output_file))
         receiver_thread.start()
-        
-        # Simulate sending packets to the receiver (this part would be handled by the sender in a real scenario)
+
+        # Send the file as valid Go-Back-N packets, one at a time, then END
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.settimeout(0.2)
+        seq = 0
         with open(self.test_image_path, 'rb') as f:
             data = f.read(1024)  # Read in chunks
             while data:
-                sock.sendto(data, (self.host, self.port))
+                self.send_and_wait_for_ack(sock, make_packet(seq, data), seq)
+                seq += 1
                 data = f.read(1024)
-        
+        self.send_and_wait_for_ack(sock, make_packet(seq, b'', packet_type=receiver.END_SIGNAL), seq)
+
         sock.close()
         receiver_thread.join()
 
-        # Check if the output file is created and has the expected size
+        # Check that the output file matches what was sent
         self.assertTrue(os.path.exists(self.output_file))
-        self.assertGreater(os.path.getsize(self.output_file), 0)
+        with open(self.test_image_path, 'rb') as f, open(self.output_file, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from src.simulation import PHASE3_RD_DIR, load_phase3
+
+class TestReceiverDrivenRequests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The scripts open their telemetry and log files on import
+        cls.tmp = tempfile.TemporaryDirectory()
+        previous_dir = os.getcwd()
+        os.chdir(cls.tmp.name)
+        try:
+            cls.client, cls.server = load_phase3(PHASE3_RD_DIR, ("client_rd", "server_rd"))
+        finally:
+            os.chdir(previous_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.receiver_log.close()
+        cls.client.live_stats.close()
+        cls.server.live_stats.close()
+        cls.tmp.cleanup()
+
+    def expand(self, ranges):
+        return [seq for first, last in ranges for seq in range(first, last + 1)]
+
+    def test_format_ranges(self):
+        format_ranges = self.server.format_ranges
+        self.assertEqual(format_ranges([]), "")
+        self.assertEqual(format_ranges([7]), "7")
+        self.assertEqual(format_ranges([4, 5, 6, 9]), "4-6,9")
+        self.assertEqual(format_ranges([1, 3, 4, 10, 11, 12]), "1,3-4,10-12")
+
+    def test_parse_request(self):
+        parse_request = self.client.parse_request
+        self.assertEqual(parse_request("REQ 7"), ([(7, 7)], 7, None))
+        self.assertEqual(parse_request("REQ 4-9,12 BASE 4"), ([(4, 9), (12, 12)], 4, None))
+        self.assertEqual(parse_request("REQ 4-9,12 BASE 2 AT 12.5"), ([(4, 9), (12, 12)], 2, 12.5))
+        for message in ("REQ", "REQ HEADER", "REQ 9-4", "REQ 4,,5", "REQ 4 BASE", "REQ 4 FROM 4",
+                        "REQ 4 BASE x", "REQ 4 BASE 4 AT", "REQ 4 BASE 4 AT x", "REQ 4 BASE 4 ON 1.0", "ACK 4"):
+            self.assertIsNone(parse_request(message), message)
+
+    def test_ranges_round_trip(self):
+        seqs = [0, 1, 2, 5, 8, 9, 100, 101, 102, 103, 250]
+        ranges, base, stamp = self.client.parse_request(f"REQ {self.server.format_ranges(seqs)} BASE 0 AT 1.0")
+        self.assertEqual(self.expand(ranges), seqs)
+        self.assertEqual((base, stamp), (0, 1.0))
+
+    def test_split_ranges(self):
+        # Every other packet missing: the longest range text there is
+        seqs = list(range(100000, 104000, 2))
+        ranges = self.server.format_ranges(seqs)
+        pieces = self.server.split_ranges(ranges)
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(",".join(pieces), ranges)
+        received = []
+        for piece in pieces:
+            self.assertLess(len(piece), self.server.MAX_REQUEST)
+            message = f"REQ {piece} BASE 4000000000 AT 1712345678.123456"
+            # The sender reads requests with recvfrom(1024)
+            self.assertLessEqual(len(message.encode()), 1024)
+            received.extend(self.expand(self.client.parse_request(message)[0]))
+        self.assertEqual(received, seqs)
+        self.assertEqual(self.server.split_ranges("4-6,9"), ["4-6,9"])
+        self.assertEqual(self.server.split_ranges(""), [])
+
+    def test_duplicate_check_uses_request_stamps(self):
+        state = self.client.TransferState()
+        state.answered[5] = state.answered[6] = 1.0
+        state.sent_once.update((5, 6))
+        # The request showing packet 5 arrived was stamped 0.04 after the one it answered
+        state.advance(6, 1.04, 100)
+        self.assertEqual(state.acked, 6)
+        self.assertAlmostEqual(state.min_rtt, 0.04)
+        # Asked again before the copy could have arrived: a duplicate
+        self.assertTrue(state.is_duplicate(6, 1.02))
+        # Asked again a full RTT later: the copy was lost, however soon after
+        # sending it the request reaches us
+        self.assertFalse(state.is_duplicate(6, 1.05))
+        self.assertFalse(state.is_duplicate(7, 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
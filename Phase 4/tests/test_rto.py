@@ -0,0 +1,62 @@
+import unittest
+from src.rto import RtoEstimator
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class TestRtoEstimator(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.rto = RtoEstimator(initial=0.05, min_rto=0.002, max_rto=1.0, clock=self.clock)
+
+    def test_first_sample(self):
+        self.rto.on_rtt_sample(0.010)
+        self.assertAlmostEqual(self.rto.srtt, 0.010)
+        self.assertAlmostEqual(self.rto.rttvar, 0.005)
+        self.assertAlmostEqual(self.rto.timeout, 0.030)
+
+    def test_converges_to_stable_path(self):
+        for _ in range(200):
+            self.rto.on_rtt_sample(0.004)
+        self.assertAlmostEqual(self.rto.srtt, 0.004, places=6)
+        self.assertLess(self.rto.timeout, 0.005)
+
+    def test_backoff_and_clamps(self):
+        for _ in range(10):
+            self.rto.on_timeout()
+        self.assertEqual(self.rto.timeout, 1.0)
+        self.rto.on_rtt_sample(0.0)
+        self.assertEqual(self.rto.timeout, 0.002)
+        self.assertEqual(self.rto.backoffs, 0)
+
+    def test_karn_rule(self):
+        self.rto.on_send(0)
+        self.rto.on_send(1)
+        self.clock.now += 0.020
+        self.rto.on_retransmit(0, 2)
+        self.clock.now += 0.001
+        self.rto.on_ack(1)
+        self.assertEqual(self.rto.samples, 0)
+        self.rto.on_send(2)
+        self.clock.now += 0.008
+        self.rto.on_ack(2)
+        self.assertEqual(self.rto.samples, 1)
+        self.assertAlmostEqual(self.rto.srtt, 0.008)
+
+    def test_progress_clears_backoff(self):
+        self.rto.on_rtt_sample(0.010)
+        self.rto.on_send(0)
+        self.rto.on_timeout()
+        self.rto.on_timeout()
+        self.assertAlmostEqual(self.rto.timeout, 0.120)
+        self.rto.on_retransmit(0, 1)
+        self.rto.on_ack(0)
+        self.assertAlmostEqual(self.rto.timeout, 0.030)
+        self.assertEqual(self.rto.backoffs, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import socket
+import threading
+from src import selective_repeat
+from src.selective_repeat import run_selective_repeat_sender, run_selective_repeat_receiver, sr_rcv_ack
+from src.utils import make_packet
+
+class TestSelectiveRepeat(unittest.TestCase):
+    def setUp(self):
+        self.host = 'localhost'
+        self.port = 54400
+        self.input_file = 'test_sr_input.bmp'
+        self.output_file = 'test_sr_output.bmp'
+        self.original_rates = (selective_repeat.DATA_LOSS_RATE, selective_repeat.ACK_LOSS_RATE, selective_repeat.BIT_ERROR_RATE)
+        with open(self.input_file, 'wb') as f:
+            f.write(os.urandom(64 * 1024 + 123))
+
+    def tearDown(self):
+        selective_repeat.DATA_LOSS_RATE, selective_repeat.ACK_LOSS_RATE, selective_repeat.BIT_ERROR_RATE = self.original_rates
+        for path in (self.input_file, self.output_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def transfer(self, loss_rate):
+        selective_repeat.DATA_LOSS_RATE = loss_rate
+        selective_repeat.ACK_LOSS_RATE = loss_rate
+        selective_repeat.BIT_ERROR_RATE = loss_rate
+        receiver_thread = threading.Thread(target=run_selective_repeat_receiver, args=(self.host, self.port, self.output_file, 10))
+        receiver_thread.start()
+        sent = run_selective_repeat_sender(self.host, self.port, self.input_file, 10)
+        receiver_thread.join(timeout=30)
+        self.assertEqual(sent, os.path.getsize(self.input_file))
+        self.assertFalse(receiver_thread.is_alive())
+        with open(self.input_file, 'rb') as f, open(self.output_file, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_transfer_without_loss(self):
+        self.transfer(0.0)
+
+    def test_transfer_with_loss(self):
+        self.transfer(0.2)
+
+    def test_sender_gives_up_without_receiver(self):
+        selective_repeat.DATA_LOSS_RATE = selective_repeat.ACK_LOSS_RATE = selective_repeat.BIT_ERROR_RATE = 0.0
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind((self.host, 0))
+        try:
+            self.assertIsNone(run_selective_repeat_sender(self.host, silent.getsockname()[1], self.input_file, 10))
+        finally:
+            silent.close()
+
+    def test_ack_loss_is_drawn_once(self):
+        # The receiver draws ACK loss when it sends; the sender must not draw it again
+        selective_repeat.ACK_LOSS_RATE = 1.0
+        selective_repeat.BIT_ERROR_RATE = 0.0
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.bind((self.host, 0))
+        sender.settimeout(1.0)
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+                receiver.sendto(make_packet(5, b'', packet_type=selective_repeat.ACK_SIGNAL), sender.getsockname())
+            self.assertEqual(sr_rcv_ack(sender), 5)
+        finally:
+            sender.close()
+
+if __name__ == '__main__':
+    unittest.main()
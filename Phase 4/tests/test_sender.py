@@ -1,9 +1,10 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from src.sender import rdt_send, make_packet
+from src.go_back_n import rdt_send, make_packet
 
 class TestSender(unittest.TestCase):
-    @patch('src.sender.socket.socket')
+    @patch('src.go_back_n.DATA_LOSS_RATE', 0.0)
+    @patch('src.go_back_n.socket.socket')
     def test_rdt_send_success(self, mock_socket):
         mock_sock = mock_socket.return_value
         address = ('localhost', 12345)
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+import unittest
+from src import go_back_n
+from src.session_receiver import serve, run_receiver_daemon, reuse_port_supported
+from src.utils import make_packet
+
+class TestSessionReceiver(unittest.TestCase):
+    def setUp(self):
+        self.host = '127.0.0.1'
+        self.output_dir = 'test_sessions_out'
+        self.original_rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.05
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.inputs = []
+        for i in range(6):
+            path = f'test_session_input_{i}.bin'
+            with open(path, 'wb') as f:
+                f.write(os.urandom(20 * 1024 + i))
+            self.inputs.append(path)
+
+    def tearDown(self):
+        go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = self.original_rates
+        for path in self.inputs:
+            os.remove(path)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def send_all(self, port, session_ids):
+        threads = [threading.Thread(target=go_back_n.run_go_back_n_sender, args=(self.host, port, path, 10, session_id))
+                   for path, session_id in zip(self.inputs, session_ids)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+    def received_files(self):
+        contents = {}
+        for name in os.listdir(self.output_dir):
+            with open(os.path.join(self.output_dir, name), 'rb') as f:
+                contents[name] = f.read()
+        return contents
+
+    def assert_all_received(self):
+        received = sorted(self.received_files().values(), key=len)
+        expected = []
+        for path in self.inputs:
+            with open(path, 'rb') as f:
+                expected.append(f.read())
+        self.assertEqual(received, sorted(expected, key=len))
+
+    def test_concurrent_sessions(self):
+        # Half the senders open a session, the rest use the implicit session 0
+        result = {}
+        server = threading.Thread(target=lambda: result.update(serve(self.host, 54440, self.output_dir, max_sessions=6)))
+        server.start()
+        self.send_all(54440, [11, 12, 13, None, None, None])
+        server.join(timeout=30)
+        self.assertFalse(server.is_alive())
+        self.assertEqual(sorted(session_id for _, session_id in result), [0, 0, 0, 11, 12, 13])
+        self.assert_all_received()
+
+    @unittest.skipUnless(reuse_port_supported(), "SO_REUSEPORT not available")
+    def test_sharded_workers(self):
+        stop = multiprocessing.Event()
+        result = {}
+        daemon = threading.Thread(target=lambda: result.update(run_receiver_daemon(self.host, 54441, self.output_dir, 2, stop)))
+        daemon.start()
+        try:
+            # Give both workers time to bind before the first sender starts
+            stop.wait(0.5)
+            self.send_all(54441, range(1, 7))
+        finally:
+            stop.set()
+            daemon.join(timeout=30)
+        self.assertEqual(len(self.received_files()), 6)
+        self.assert_all_received()
+        # Every worker's sessions come back to the caller
+        self.assertEqual(sorted(session_id for _, session_id in result), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(sorted(result.values()), sorted(os.path.getsize(path) for path in self.inputs))
+
+    def test_late_start_reply_is_not_an_ack(self):
+        # A duplicate reply to a retried SYN that arrives once data is flowing
+        # must not be read as a cumulative ACK of packets 0..session_id
+        go_back_n.BIT_ERROR_RATE = 0.0
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.bind((self.host, 0))
+        sender.settimeout(1.0)
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+                receiver.sendto(make_packet(42, b'', packet_type=go_back_n.START_SIGNAL), sender.getsockname())
+                receiver.sendto(make_packet(3, b'', packet_type=go_back_n.ACK_SIGNAL), sender.getsockname())
+            self.assertEqual(go_back_n.rdt_rcv_sack(sender), (None, []))
+            self.assertEqual(go_back_n.rdt_rcv_ack(sender), 3)
+        finally:
+            sender.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import socket
+import tempfile
+import unittest
+from src import go_back_n, receiver
+from src.emulator import LinkRule
+from src.simulation import Simulator, simulate_go_back_n, simulate_rdt3, simulate_receiver_driven
+
+class TestSimulator(unittest.TestCase):
+    def test_virtual_timeouts_and_delay(self):
+        sim = Simulator(forward=LinkRule(delay=0.5), reverse=LinkRule(delay=0.5))
+        log = []
+
+        def server():
+            sock = sim.socket()
+            sock.bind(('127.0.0.1', 9000))
+            sock.settimeout(30)
+            data, address = sock.recvfrom(100)
+            log.append(("server got", data, sim.now))
+            sock.sendto(b'pong', address)
+
+        def client():
+            sock = sim.socket()
+            sock.settimeout(2)
+            sim.sleep(1)
+            sock.sendto(b'ping', ('localhost', 9000))
+            data, _ = sock.recvfrom(100)
+            log.append(("client got", data, sim.now))
+            sock.settimeout(3)
+            with self.assertRaises(socket.timeout):
+                sock.recvfrom(100)
+            log.append(("timeout", None, sim.now))
+
+        sim.spawn(server)
+        sim.spawn(client)
+        sim.run()
+        self.assertEqual(log, [("server got", b'ping', 1.5), ("client got", b'pong', 2.0), ("timeout", None, 5.0)])
+
+    def test_blocked_process_is_aborted(self):
+        sim = Simulator()
+        finished = []
+
+        def waiter():
+            sock = sim.socket()
+            sock.bind(('127.0.0.1', 9001))
+            try:
+                sock.recvfrom(100)
+            finally:
+                finished.append(sim.now)
+
+        process = sim.spawn(waiter)
+        self.assertEqual(sim.run(until=50), 50)
+        self.assertTrue(process.aborted)
+        self.assertEqual(finished, [50])
+
+class TestProtocolSimulation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp.name, "input.bin")
+        self.output_file = os.path.join(self.tmp.name, "output.bin")
+        with open(self.input_file, "wb") as f:
+            f.write(os.urandom(40 * 1024 + 123))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_go_back_n_high_loss(self):
+        rates = (go_back_n.DATA_LOSS_RATE, go_back_n.time, go_back_n.socket)
+        result = simulate_go_back_n(self.input_file, self.output_file, N=10, loss=0.5, seed=3)
+        self.assertTrue(result["ok"])
+        self.assertGreater(result["sender"]["retransmissions"], 0)
+        # Timeouts cost virtual time only
+        self.assertGreater(result["virtual_time"], 10 * result["wall_time"])
+        self.assertEqual((go_back_n.DATA_LOSS_RATE, go_back_n.time, go_back_n.socket), rates)
+
+    def test_go_back_n_terminates_at_70_percent_loss(self):
+        # These seeds used to leave the sender retransmitting forever after
+        # the receiver had timed out
+        for seed in (4, 7, 12):
+            result = simulate_go_back_n(self.input_file, self.output_file, N=10, loss=0.7, seed=seed, until=5000)
+            self.assertIsNotNone(result["virtual_time"])
+            self.assertLess(result["virtual_time"], 5000)
+            if result["ok"]:
+                self.assertTrue(result["sender"]["completed"])
+
+    def test_go_back_n_sender_gives_up_without_receiver(self):
+        sim = Simulator()
+        with sim.patched(go_back_n):
+            sender = sim.spawn(go_back_n.run_go_back_n_sender, '127.0.0.1', 9100, self.input_file, 10)
+            sim.run(until=5000)
+        self.assertTrue(sender.done)
+        self.assertFalse(sender.aborted)
+        self.assertIsNone(sender.result)
+        self.assertFalse(go_back_n.last_sender_stats["completed"])
+
+    def test_standalone_receiver_confirms_end(self):
+        # A corrupted END ACK used to leave the sender retrying END against a
+        # closed port and reporting a failed transfer
+        rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        try:
+            go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = 0.0
+            go_back_n.BIT_ERROR_RATE = 0.5
+            for seed in range(10):
+                sim = Simulator(seed=seed)
+                with sim.patched(go_back_n):
+                    sim.spawn(receiver.run_go_back_n_receiver, '127.0.0.1', 9200, self.output_file)
+                    sender = sim.spawn(go_back_n.run_go_back_n_sender, '127.0.0.1', 9200, self.input_file, 10)
+                    sim.run(until=5000)
+                self.assertEqual(sender.result, os.path.getsize(self.input_file), seed)
+        finally:
+            go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = rates
+
+    def test_go_back_n_same_seed_same_run(self):
+        runs = [simulate_go_back_n(self.input_file, self.output_file, loss=0.2, seed=seed,
+                                   forward=LinkRule(delay=0.01, jitter=0.002, loss=0.05)) for seed in (1, 1, 2)]
+        self.assertTrue(all(run["ok"] for run in runs))
+        self.assertEqual(runs[0]["virtual_time"], runs[1]["virtual_time"])
+        self.assertEqual(runs[0]["sender"], runs[1]["sender"])
+        self.assertEqual(runs[0]["channel"], runs[1]["channel"])
+        self.assertNotEqual(runs[0]["virtual_time"], runs[2]["virtual_time"])
+
+    def test_rdt3(self):
+        clean = simulate_rdt3(self.input_file, self.output_file, option=1, seed=1)
+        self.assertTrue(clean["ok"])
+        self.assertEqual(clean["sender"]["data_retransmissions"], 0)
+        lossy = simulate_rdt3(self.input_file, self.output_file, option=5, loss=0.3, seed=1)
+        self.assertTrue(lossy["ok"])
+        self.assertGreater(lossy["sender"]["data_retransmissions"], 0)
+        self.assertGreater(lossy["virtual_time"], clean["virtual_time"])
+
+    def test_receiver_driven_with_loss(self):
+        clean = simulate_receiver_driven(self.input_file, self.output_file, option=1, seed=1)
+        self.assertTrue(clean["ok"])
+        self.assertEqual(clean["sender"]["retransmissions"], 0)
+        # Packets dropped at the receiver (option 5) and at the sender (option 2),
+        # requests and packets lost on a jittery link
+        link = LinkRule(delay=0.01, jitter=0.005, loss=0.05)
+        for option in (5, 2):
+            for window in (1, 32):
+                lossy = simulate_receiver_driven(self.input_file, self.output_file, window, option, loss=0.3,
+                                                 seed=2, forward=link, until=3000)
+                self.assertTrue(lossy["ok"], (option, window))
+                self.assertGreater(lossy["sender"]["retransmissions"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
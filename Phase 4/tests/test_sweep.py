@@ -0,0 +1,52 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from src import go_back_n
+from src.sweep import expand, run_sweep, summarize, write_csv
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp.name, "input.bin")
+        with open(self.input_file, "wb") as f:
+            f.write(os.urandom(60 * 1024))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand(self):
+        runs = expand({"loss": [0.0, 0.1], "window": [5, 10], "options": {"SACK": [False, True]}, "trials": 2})
+        self.assertEqual(len(runs), 2 * 2 * 2 * 2)
+        self.assertEqual(runs[0], {"loss": 0.0, "timeout": None, "window": 5, "protocol": "gbn",
+                                   "options": {"SACK": False}, "trial": 0})
+        self.assertEqual(len({json.dumps(run, sort_keys=True) for run in runs}), len(runs))
+
+    def test_parallel_sweep(self):
+        matrix = {"loss": [0.0, 0.1], "timeout": [None, 0.02], "window": [10],
+                  "protocol": ["gbn", "sr"], "options": {"SACK": [True]}, "trials": 1}
+        results = run_sweep(matrix, self.input_file, workers=4, base_port=54460)
+        self.assertEqual(len(results), 8)
+        self.assertEqual([r["port"] for r in results], list(range(54460, 54468)))
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertTrue(all(r["completion_time"] > 0 for r in results))
+        self.assertIsNotNone(results[0]["retransmissions"])
+        # Workers change only their own copy of the module
+        self.assertFalse(go_back_n.SACK)
+
+        summary = summarize(results)
+        self.assertEqual(len(summary), 8)
+        path = os.path.join(self.tmp.name, "results.csv")
+        write_csv(path, results)
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(json.loads(rows[0]["options"]), {"SACK": True})
+
+    def test_unknown_option(self):
+        with self.assertRaises(ValueError):
+            run_sweep({"loss": [0.0], "options": {"NO_SUCH_SETTING": [1]}}, self.input_file, workers=1, base_port=54470)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from src.timers import TimerWheel
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10 ** 12
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += int(seconds * 1e9)
+
+class TestTimerWheel(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.001, slots=64, clock=self.clock)
+
+    def test_expiry_order_and_removal(self):
+        self.wheel.start('a', 0.010)
+        self.wheel.start('b', 0.020)
+        self.clock.advance(0.015)
+        self.assertEqual(self.wheel.expired(), ['a'])
+        self.assertNotIn('a', self.wheel)
+        self.clock.advance(0.010)
+        self.assertEqual(self.wheel.expired(), ['b'])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_stop_and_restart(self):
+        self.wheel.start(1, 0.010)
+        self.wheel.start(2, 0.010)
+        self.wheel.stop(1)
+        self.clock.advance(0.005)
+        self.wheel.restart(2)
+        self.clock.advance(0.008)
+        self.assertEqual(self.wheel.expired(), [])
+        self.clock.advance(0.003)
+        self.assertEqual(self.wheel.expired(), [2])
+
+    def test_deadlines_beyond_one_revolution(self):
+        self.wheel.start('far', 0.100)
+        self.wheel.start('near', 0.036)
+        self.clock.advance(0.040)
+        self.assertEqual(self.wheel.expired(), ['near'])
+        self.assertAlmostEqual(self.wheel.next_timeout(), 0.060, places=6)
+        self.clock.advance(0.070)
+        self.assertEqual(self.wheel.expired(), ['far'])
+        self.assertIsNone(self.wheel.next_timeout())
+
+    def test_many_timers(self):
+        for seq in range(5000):
+            self.wheel.start(seq, 0.001 * (seq % 50 + 1))
+        self.assertAlmostEqual(self.wheel.next_timeout(), 0.001, places=6)
+        self.clock.advance(0.025)
+        self.assertEqual(len(self.wheel.expired()), 2500)
+        self.clock.advance(1.0)
+        self.assertEqual(len(self.wheel.expired()), 2500)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+from src import go_back_n, receiver, tracing
+from src.simulation import simulate_go_back_n
+from src.tracing import Tracer, load, decode
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.5
+        return self.now
+
+class TestTracer(unittest.TestCase):
+    def test_ring_buffer_wraps(self):
+        tracer = Tracer(capacity=4, clock=FakeClock())
+        for seq in range(6):
+            tracer.record(tracing.SEND, seq, 0, seq + 1, 10)
+        self.assertEqual(len(tracer), 4)
+        self.assertEqual(tracer.overwritten, 2)
+        self.assertEqual([event[2] for event in tracer.events()], [2, 3, 4, 5])
+        self.assertEqual(tracer.events()[0], (1.5, tracing.SEND, 2, 0, 3, 10))
+        self.assertEqual(len(tracer.buffer), 4 * tracing.RECORD_SIZE)
+
+    def test_dump_and_decode(self):
+        tracer = Tracer(clock=FakeClock())
+        tracer.record(tracing.SEND, 0, 0, 1, 10)
+        tracer.record(tracing.TIMEOUT, 0, 0, 1, 1)
+        tracer.record(tracing.ACK_RECEIVED, -1, 0, 1, 0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.trace")
+            tracer.dump(path)
+            events, overwritten = load(path)
+        self.assertEqual(events, tracer.events())
+        self.assertEqual(overwritten, 0)
+        lines = decode(events)
+        self.assertEqual(len(lines), 3)
+        self.assertIn("timeout", lines[1])
+        self.assertIn("seq=-1", lines[2])
+        self.assertTrue(lines[1].strip().startswith("0.500000"))
+
+    def test_not_a_trace(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"not a trace")
+        try:
+            with self.assertRaises(ValueError):
+                load(f.name)
+        finally:
+            os.remove(f.name)
+
+class TestTracedTransfer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.tmp.name, "input.bin")
+        self.output_file = os.path.join(self.tmp.name, "output.bin")
+        with open(self.input_file, "wb") as f:
+            f.write(os.urandom(30 * 1024))
+
+    def tearDown(self):
+        go_back_n.TRACER = None
+        self.tmp.cleanup()
+
+    def test_go_back_n_events(self):
+        go_back_n.TRACER = Tracer()
+        result = simulate_go_back_n(self.input_file, self.output_file, N=8, loss=0.2, seed=5)
+        self.assertTrue(result["ok"])
+        kinds = [event[1] for event in go_back_n.TRACER.events()]
+        self.assertEqual(kinds.count(tracing.RETRANSMIT), result["sender"]["retransmissions"])
+        sent = kinds.count(tracing.SEND) + kinds.count(tracing.SEND_LOST)
+        self.assertEqual(sent, result["sender"]["packets"])
+        for kind in (tracing.TIMEOUT, tracing.ACK_RECEIVED, tracing.RECEIVED, tracing.ACK_SENT):
+            self.assertIn(kind, kinds)
+        # Window state never runs past the window
+        for _, kind, seq, base, nextseq, window in go_back_n.TRACER.events():
+            if kind == tracing.SEND:
+                self.assertLess(seq - base, window)
+
+    def test_receiver_events(self):
+        rates = (go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE)
+        go_back_n.DATA_LOSS_RATE = go_back_n.ACK_LOSS_RATE = go_back_n.BIT_ERROR_RATE = 0.0
+        go_back_n.TRACER = Tracer()
+        try:
+            receiver_thread = threading.Thread(target=receiver.run_go_back_n_receiver, args=('localhost', 54490, self.output_file))
+            receiver_thread.start()
+            go_back_n.run_go_back_n_sender('localhost', 54490, self.input_file, 10)
+            receiver_thread.join()
+        finally:
+            go_back_n.DATA_LOSS_RATE, go_back_n.ACK_LOSS_RATE, go_back_n.BIT_ERROR_RATE = rates
+        received = [event[2] for event in go_back_n.TRACER.events() if event[1] == tracing.RECEIVED]
+        self.assertEqual(received, list(range(30)))
+
+if __name__ == '__main__':
+    unittest.main()